@@ -4,8 +4,9 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.repositories.csv_repository import CSVRepository
+from app.repositories.factory import get_repository
 from app.services.user_service import CSVUserService
+from app.services.async_service import AsyncService
 
 #  Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -33,11 +34,11 @@ def decode_token(token: str):
 
 
 def get_user_service() -> CSVUserService:
-    return CSVUserService(CSVRepository())
+    return CSVUserService(get_repository("users"))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme),svc: CSVUserService = Depends(get_user_service),):
+async def get_current_user(token: str = Depends(oauth2_scheme),svc: CSVUserService = Depends(get_user_service),):
     try:
         payload = decode_token(token)
         username = payload.get("sub")
@@ -47,7 +48,7 @@ def get_current_user(token: str = Depends(oauth2_scheme),svc: CSVUserService = D
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_token")
 
-    user = svc.get_by_username(username)
+    user = await AsyncService(svc).get_by_username(username)
     if not user or int(user["id"]) != int(user_id):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="user_not_found")
     return user
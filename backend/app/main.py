@@ -1,16 +1,34 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-from app.utils.search import search_books
+from app.utils.search import MAX_COMPLETIONS, MAX_PAGE_SIZE, autocomplete, ranked_search, search_books
+from app.repositories.async_repository import run_io, shutdown_io_executor
+from app.repositories.memory_repository import snapshot_on_shutdown
 from app.routers.request_router import router as request_router
 from app.routers import auth as auth_router
 from app.routers.rating_router import router as rating_router
 from app.routers.review_router import router as review_router
 from app.routers.readinglist_router import router as readinglist_router
 from app.routers.book_router import router as book_router
+from app.routers.metrics_router import router as metrics_router
 
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        # Build the search indexes before the first request rather than during it.
+        for view in (autocomplete, ranked_search):
+            await run_io(view.load)
+    except OSError:
+        pass
+    yield
+    shutdown_io_executor()
+    snapshot_on_shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,28 +45,46 @@ app.include_router(review_router)
 app.include_router(book_router)
 app.include_router(readinglist_router)
 app.include_router(rating_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to my API!"}
 
 @app.get("/search/{q}")
-def search(q: str):
+async def search(q: str):
     query = q.lower()
-    result = search_books(q)
+    result = await run_io(search_books, q)
     if not result:
         return {"result": [], "message": "No matching books found"}
     return {"results": result}
     
 # For having it search as they type into textfield
-# @app.get("/search")
-# def search(q: str = ""):
-#     query = q.lower()
-#     result = search_books(q)
-#     if not result:
-#         return {"result": [], "message": "No matching books found"}
-#     return {"results":result}
-
+@app.get("/search")
+async def search_as_you_type(q: str = "", limit: int = Query(10, ge=1, le=MAX_COMPLETIONS)):
+    if autocomplete.stale():
+        await run_io(autocomplete.load)
+    # Answered on the event loop: a completion takes microseconds, so an abandoned
+    # keystroke leaves no queued work behind in the IO threads. Only while a book
+    # edit is being applied to the index does it wait, and then in a thread.
+    result = autocomplete.complete(q, limit, blocking=False)
+    if result is None:
+        result = await run_io(autocomplete.complete, q, limit)
+    if not result:
+        return {"result": [], "message": "No matching books found"}
+    return {"results": result}
 
 
+@app.get("/v2/search/{q}")
+async def ranked(
+    q: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    publisher: Optional[str] = None,
+    author: Optional[str] = None,
+    facets: bool = False,
+):
+    return await run_io(ranked_search.search, q, offset, limit, year_from, year_to, publisher, author, facets)
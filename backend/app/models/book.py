@@ -1,4 +1,32 @@
+from app.utils.cover_urls import cover_url, is_standard
+
+
+class _CoverURL:
+    """One cover URL attribute, stored as a ``True`` flag when it is the standard Amazon URL for the ISBN."""
+
+    def __init__(self, column: str):
+        self.column = column
+
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+
+    def __get__(self, book, owner=None):
+        if book is None:
+            return self
+        value = getattr(book, self.slot)
+        return cover_url(book.isbn, self.column) if value is True else value
+
+    def __set__(self, book, value):
+        setattr(book, self.slot, True if is_standard(book.isbn, self.column, value) else value)
+
+
 class Book:
+    __slots__ = ("isbn", "book_title", "author", "year_of_publication", "publisher", "_image_url_s", "_image_url_m", "_image_url_l")
+
+    image_url_s = _CoverURL("Image-URL-S")
+    image_url_m = _CoverURL("Image-URL-M")
+    image_url_l = _CoverURL("Image-URL-L")
+
     def __init__(self, isbn: str, book_title: str, author: str, year_of_publication: str | None = None, publisher: str | None = None, image_url_s: str | None = None, image_url_m: str | None = None, image_url_l: str | None = None):
         self.isbn = isbn
         self.book_title = book_title
@@ -1,6 +1,8 @@
 from datetime import datetime
 
 class Rating:
+    __slots__ = ("user_id", "isbn", "rating")
+
     def __init__(self, user_id: int, isbn: str, rating: int):
         self.user_id = user_id
         self.isbn = isbn
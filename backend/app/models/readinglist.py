@@ -3,6 +3,8 @@ from typing import List, Dict
 from app.schemas.book import BookItem
 
 class ReadingList:
+    __slots__ = ("list_id", "user_id", "name", "books", "is_public")
+
     def __init__(self, list_id: int, user_id: int, name: str, books: List[BookItem] = None, is_public: bool = False):
         self.list_id = list_id
         self.user_id = user_id
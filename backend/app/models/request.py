@@ -1,6 +1,8 @@
 from datetime import datetime
 
 class Request:
+    __slots__ = ("request_id", "user_id", "book_title", "author", "isbn", "time")
+
     def __init__(self, request_id: int, user_id: int, book_title: str, author: str, isbn: str, time: datetime = None):
         self.request_id = request_id
         self.user_id = user_id
@@ -1,6 +1,8 @@
 from datetime import datetime
 
 class Review:
+    __slots__ = ("review_id", "user_id", "isbn", "comment", "time")
+
     def __init__(self, review_id: int, user_id: int, isbn: str, comment: str, time: datetime = None):
         self.review_id = review_id
         self.user_id = user_id
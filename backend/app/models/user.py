@@ -1,6 +1,8 @@
 from datetime import datetime
 
 class User:
+    __slots__ = ("user_id", "username", "email", "hashed_password", "time", "is_admin", "is_suspended", "suspended_until")
+
     def __init__(self, user_id: int, username: str, email: str,
                 hashed_password: str, time: str | None = None,
                 is_admin: bool = False, is_suspended: bool = False,
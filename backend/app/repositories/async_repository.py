@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, TypeVar
+from app.repositories.base_repository import BaseRepository, Where
+from app.repositories.secondary_index import IndexSpec
+
+T = TypeVar("T")
+
+# Threads that run blocking file I/O for async callers, per worker process.
+IO_THREADS = int(os.getenv("IO_THREADS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+if IO_THREADS < 1:
+    raise ValueError(f"IO_THREADS must be at least 1, not {IO_THREADS}")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_guard = threading.Lock()
+
+
+def io_executor() -> ThreadPoolExecutor:
+    """The executor that blocking repository calls run on, created on first use."""
+    global _executor
+    with _executor_guard:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="repo-io")
+        return _executor
+
+
+def shutdown_io_executor():
+    """Wait for queued I/O to finish and drop the executor; the next call starts a new one."""
+    global _executor
+    with _executor_guard:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_io(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run the blocking ``fn`` on the bounded I/O executor and await it without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor(), functools.partial(fn, *args, **kwargs))
+
+
+class AsyncRepository:
+    """Awaitable version of a ``BaseRepository``; its async ``iter_rows`` returns a list."""
+
+    def __init__(self, repo: BaseRepository):
+        self.repo = repo
+
+    async def read_all(self, path: str) -> List[Dict]:
+        return await run_io(self.repo.read_all, path)
+
+    async def write_all(self, path: str, fieldnames: List[str], rows: List[Dict]):
+        return await run_io(self.repo.write_all, path, fieldnames, rows)
+
+    async def append_row(self, path: str, fieldnames: List[str], row: Dict):
+        return await run_io(self.repo.append_row, path, fieldnames, row)
+
+    async def iter_rows(self, path: str, where: Where = None, columns: Optional[Iterable[str]] = None) -> List[Dict]:
+        return await run_io(lambda: list(self.repo.iter_rows(path, where=where, columns=columns)))
+
+    async def lookup(self, path: str, key: Mapping[str, str], columns: Optional[Iterable[str]] = None) -> List[Dict]:
+        return await run_io(self.repo.lookup, path, key, columns)
+
+    async def read_one(self, path: str, column: str, value: str) -> Optional[Dict]:
+        return await run_io(self.repo.read_one, path, column, value)
+
+    async def update_where(self, path: str, key: Where, changes: Mapping[str, object]) -> int:
+        return await run_io(self.repo.update_where, path, key, changes)
+
+    async def delete_where(self, path: str, where: Where) -> int:
+        return await run_io(self.repo.delete_where, path, where)
+
+    def declare_indexes(self, path: str, keys: Iterable[IndexSpec]):
+        # Only records the declaration (SQLite also creates the index), so it stays synchronous.
+        self.repo.declare_indexes(path, keys)
@@ -1,7 +1,14 @@
-from typing import List, Dict
+import os
+from typing import Callable, Iterable, Iterator, List, Dict, Mapping, Optional, Set, Union
 from abc import ABC, abstractmethod
+from app.repositories.secondary_index import IndexKey, IndexSpec, index_key
+
+Where = Union[Mapping[str, str], Callable[[Dict], bool], None]
 
 class BaseRepository(ABC):
+    # Declared indexes per table, keyed by file name so they follow a table to another directory.
+    _declared_indexes: Dict[str, Set[IndexKey]] = {}
+
     @abstractmethod
     def read_all(self, path: str) -> List[Dict]: ...
 
@@ -10,3 +17,83 @@ class BaseRepository(ABC):
 
     @abstractmethod
     def append_row(self, path: str, fieldnames: List[str], row: Dict): ...
+
+    def iter_rows(self, path: str, where: Where = None, columns: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Lazily yield the rows of ``path`` matching ``where`` (a column -> value mapping or a callable), holding only ``columns``."""
+        match = self._matcher(where)
+        for row in self.read_all(path):
+            if match(row):
+                yield self._project(row, columns)
+
+    def iter_records(self, path: str, where: Where = None) -> Iterator[Mapping[str, str]]:
+        """Like ``iter_rows`` without a projection, but the rows are read-only and may be the backend's own."""
+        return self.iter_rows(path, where=where)
+
+    def update_where(self, path: str, key: Where, changes: Mapping[str, object]) -> int:
+        """Apply ``changes`` to every row matching ``key`` under one write lock and return how many rows matched."""
+        rows = self.read_all(path)
+        match = self._matcher(key)
+        count = 0
+        for row in rows:
+            if match(row):
+                row.update((k, v) for k, v in changes.items() if k in row)
+                count += 1
+        if count:
+            fieldnames = self._fieldnames(path, rows)
+            self.write_all(path, fieldnames, [self._normalize(fieldnames, r) for r in rows])
+        return count
+
+    def delete_where(self, path: str, where: Where) -> int:
+        """Remove every row matching ``where`` and return how many were removed."""
+        rows = self.read_all(path)
+        match = self._matcher(where)
+        kept = [row for row in rows if not match(row)]
+        if len(kept) != len(rows):
+            fieldnames = self._fieldnames(path, rows)
+            self.write_all(path, fieldnames, [self._normalize(fieldnames, r) for r in kept])
+        return len(rows) - len(kept)
+
+    def _fieldnames(self, path, rows: List[Dict]) -> List[str]:
+        """The columns of ``path`` for the fallbacks to write back: by default every column seen in ``rows``."""
+        return list(dict.fromkeys(f for row in rows for f in row if f is not None))
+
+    def declare_indexes(self, path: str, keys: Iterable[IndexSpec]):
+        """Ask for hash indexes on ``path``, each on a column name or a tuple of column names."""
+        declared = self._declared_indexes.setdefault(os.path.basename(os.fspath(path)), set())
+        declared.update(index_key(k) for k in keys)
+
+    def _indexes_for(self, path) -> Set[IndexKey]:
+        return self._declared_indexes.get(os.path.basename(os.fspath(path)), set())
+
+    def lookup(self, path: str, key: Mapping[str, str], columns: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Return every row whose columns equal ``key``, e.g. ``{"UserID": "7", "ISBN": "0195153448"}``."""
+        return list(self.iter_rows(path, where=key, columns=columns))
+
+    def read_one(self, path: str, column: str, value: str) -> Optional[Dict]:
+        """Return the first row whose ``column`` equals ``value``, or None."""
+        return next(self.iter_rows(path, where={column: value}), None)
+
+    @staticmethod
+    def _matcher(where: Where) -> Callable[[Dict], bool]:
+        if where is None:
+            return lambda row: True
+        if callable(where):
+            return where
+        items = list(where.items())
+        return lambda row: all(row.get(k) == v for k, v in items)
+
+    @staticmethod
+    def _project(row: Dict, columns: Optional[Iterable[str]]) -> Dict:
+        if columns is None:
+            return dict(row)
+        return {c: row.get(c) for c in columns}
+
+    @staticmethod
+    def _to_text(value) -> str:
+        """Mirror how csv.DictWriter serializes a value, so every backend stores the same text."""
+        if value is None:
+            return ""
+        return str(value)
+
+    def _normalize(self, fieldnames: List[str], row: Dict) -> Dict:
+        return {f: self._to_text(row.get(f, "")) for f in fieldnames}
@@ -1,29 +1,141 @@
-import csv
 import os
+import threading
+from typing import List, Dict, Optional, Tuple
+from app.repositories import durability
+from app.repositories.catalog_snapshot import CatalogSnapshot, load_snapshot, snapshot_path
 from app.repositories.csv_repository import CSVRepository
+from app.repositories.offset_index import OffsetIndex
+from app.utils.cover_urls import COVER_TEMPLATES
 
 class BXBooksCSVAdapter(CSVRepository):
-    """ Adapter for BX_Books.csv (semicolon + Latin-1 encoding). """
+    """Adapter for BX_Books.csv (semicolon + Latin-1 encoding), with ISBN lookups through a byte-offset index."""
+    encoding = "latin-1"
+    delimiter = ";"
+    key_column = "ISBN"
+    # The catalog is by far the largest table; its standard cover URLs are rebuilt from the ISBN.
+    compact_tables = True
+    derived_columns = COVER_TEMPLATES
 
-    def read_all(self, path):
-        if not os.path.exists(path):
-            return []
-        lock = self._get_lock(path)
-        with lock, open(path, "r", encoding="latin-1", newline="") as f:
-            return list(csv.DictReader(f, delimiter=";"))
+    _offset_indexes: Dict[str, OffsetIndex] = {}
+    # Readers share the file lock, but loading an index or remapping the file mutates it.
+    _index_guard = threading.Lock()
+    # (CSV and snapshot signatures, snapshot or None) per catalog, so a missing or stale one is not reopened.
+    # Writes make a snapshot stale; rebuild it offline with ``python -m app.repositories.catalog_snapshot``.
+    _snapshots: Dict[str, Tuple[Tuple, Optional[CatalogSnapshot]]] = {}
 
-    def write_all(self, path, fieldnames, rows):
-        lock = self._get_lock(path)
-        with lock, open(path, "w", encoding="latin-1", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=";")
-            writer.writeheader()
-            writer.writerows(rows)
+    def _offset_index(self, path) -> OffsetIndex:
+        key = os.path.abspath(path)
+        index = self._offset_indexes.get(key)
+        if index is None:
+            index = OffsetIndex(key, self.key_column, self.encoding, self.delimiter)
+            self._offset_indexes[key] = index
+        return index
+
+    def snapshot(self, path) -> Optional[CatalogSnapshot]:
+        """Return the memory-mapped snapshot of ``path``, or None if there is none or it is stale."""
+        key = os.path.abspath(path)
+        try:
+            source = OffsetIndex.signature_of(key)
+        except OSError:
+            return None
+        try:
+            built = OffsetIndex.signature_of(snapshot_path(key))
+        except OSError:
+            built = None
+        cached = self._snapshots.get(key)
+        if cached is not None and cached[0] == (source, built):
+            return cached[1]
+        # A replaced snapshot is not closed here: other threads may still be reading
+        # from it, and the mapping is released once the last reference goes away.
+        snapshot = load_snapshot(key) if built is not None else None
+        self._snapshots[key] = ((source, built), snapshot)
+        return snapshot
 
-    def append_row(self, path, fieldnames, row):
-        file_exists = os.path.exists(path)
+    def read_one(self, path, column: str, value: str) -> Optional[Dict]:
+        if column != self.key_column:
+            return super().read_one(path, column, value)
         lock = self._get_lock(path)
-        with lock, open(path, "a", encoding="latin-1", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=";")
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(row)
+        with lock.shared():
+            # Writers are shut out by the file lock, so once the index and mapping are current
+            # they stay put and the row can be decoded without the guard.
+            with self._index_guard:
+                index = self._offset_index(path)
+                if not index.ensure_current():
+                    return None
+                data = index.mapped()
+            return index.get(value, data)
+
+    def _patch(self, path, table, changed: Dict[int, Dict]) -> bool:
+        """Overwrite a single changed book in place when its new line has the same byte length."""
+        if len(changed) != 1 or not table.fieldnames:
+            return False
+        (i, row), = changed.items()
+        key = self._to_text(table.rows[i].get(self.key_column))
+        if not key or row.get(self.key_column) != key:
+            return False
+
+        with self._index_guard:
+            index = self._offset_index(path)
+            if not index.ensure_current() or index.fieldnames != table.fieldnames:
+                return False
+        # The index points at the first row with this key; it must be the row being changed.
+        if index.get(key) != table.rows[i]:
+            return False
+        offset, length = index.entries[key]
+        line = self._format(table.fieldnames, [row])[1].encode(self.encoding)
+        if len(line) != length:
+            return False
+        before = os.stat(path).st_mtime_ns
+        with open(path, "r+b") as f:
+            f.seek(offset)
+            f.write(line)
+            durability.synced(f, path)
+        # Same size and inode: make sure the mtime moves, or other processes keep their cached copy.
+        st = os.stat(path)
+        if st.st_mtime_ns == before:
+            os.utime(path, ns=(st.st_atime_ns, before + 1))
+            st = os.stat(path)
+        with self._index_guard:
+            index.add([], OffsetIndex.signature_of(path))
+
+        table.rows[i] = self._resident(table.fieldnames, [row])[0]
+        table.signature = self._signature(st)
+        return True
+
+    def _written(self, path, fieldnames: List[str], rows: List[Dict], lines: List[str]):
+        index = self._offset_index(path)
+        index.close()
+        try:
+            signature = OffsetIndex.signature_of(path)
+        except OSError:
+            index.signature = None
+            return
+
+        entries: Dict[str, Tuple[int, int]] = {}
+        offset = len(lines[0].encode(self.encoding))
+        if self.key_column in fieldnames:
+            for row, line in zip(rows, lines[1:]):
+                length = len(line.encode(self.encoding))
+                key = self._to_text(row.get(self.key_column))
+                if key and key not in entries:
+                    entries[key] = (offset, length)
+                offset += length
+        index.reset(list(fieldnames), entries, signature)
+
+    def _appended(self, path, fieldnames: List[str], rows: List[Dict], lines: List[str], previous: Optional[Tuple]):
+        index = self._offset_index(path)
+        if previous is None or index.signature != previous[:2] or index.fieldnames != list(fieldnames):
+            index.signature = None
+            return
+        try:
+            signature = OffsetIndex.signature_of(path)
+        except OSError:
+            index.signature = None
+            return
+        entries = []
+        offset = previous[1]
+        for row, line in zip(rows, lines[1:]):
+            length = len(line.encode(self.encoding))
+            entries.append((self._to_text(row.get(self.key_column)), offset, length))
+            offset += length
+        index.add(entries, signature)
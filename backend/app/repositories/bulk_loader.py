@@ -0,0 +1,125 @@
+import csv
+import io
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Files at least this large are parsed by a process pool; smaller ones are not worth the startup.
+BULK_LOAD_MIN_BYTES = int(os.getenv("BULK_LOAD_MIN_BYTES", str(8 * 1024 * 1024)))
+# One worker, i.e. no pool, unless set: sending the parsed rows back usually costs more than
+# the parse saves. Measure with ``benchmarks.bulk_load_benchmark`` before raising it.
+BULK_LOAD_WORKERS = int(os.getenv("BULK_LOAD_WORKERS", "1"))
+# Chunks per worker; more than one evens out chunks that happen to parse slower.
+CHUNKS_PER_WORKER = 4
+
+
+def _header_end(data: bytes) -> int:
+    """Offset just past the header record, which may itself contain quoted newlines."""
+    end = data.find(b"\n")
+    while end != -1 and data.count(b'"', 0, end) % 2:
+        end = data.find(b"\n", end + 1)
+    return len(data) if end == -1 else end + 1
+
+
+def split_ranges(data: bytes, start: int, parts: int) -> List[Tuple[int, int]]:
+    """Cut ``data[start:]`` into about ``parts`` byte ranges that each hold whole records."""
+    size = len(data)
+    step = max(1, (size - start) // max(1, parts))
+    ranges = []
+    pos = start
+    while pos < size:
+        cut = data.find(b"\n", min(size, pos + step) - 1)
+        quotes = data.count(b'"', pos, size if cut == -1 else cut)
+        while cut != -1 and quotes % 2:
+            nxt = data.find(b"\n", cut + 1)
+            quotes += data.count(b'"', cut, size if nxt == -1 else nxt)
+            cut = nxt
+        end = size if cut == -1 else cut + 1
+        ranges.append((pos, end))
+        pos = end
+    return ranges
+
+
+def quotes_are_structural(data: bytes, start: int, delimiter: bytes) -> bool:
+    """Whether counting quotes in ``data[start:]`` finds the same record boundaries as ``csv``."""
+    candidates = re.compile(b'[^"\r\n' + re.escape(delimiter) + b']"')
+    quotes, counted = 0, start
+    for match in candidates.finditer(data, start):
+        quote = match.end() - 1
+        quotes += data.count(b'"', counted, quote)
+        if quotes % 2 == 0:
+            return False
+        quotes += 1
+        counted = quote + 1
+    return True
+
+
+def _parse_range(path: str, start: int, end: int, encoding: str, delimiter: str) -> List[List[str]]:
+    """Worker: parse the records in one byte range of ``path``."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    reader = csv.reader(io.StringIO(raw.decode(encoding), newline=""), delimiter=delimiter)
+    return [values for values in reader if values]
+
+
+def _parse(raw: bytes, encoding: str, delimiter: str) -> List[List[str]]:
+    return list(csv.reader(io.StringIO(raw.decode(encoding), newline=""), delimiter=delimiter))
+
+
+def read_records(path, encoding: str = "utf-8", delimiter: str = ",",
+                 workers: Optional[int] = None) -> Tuple[List[str], List[List[str]]]:
+    """Return the header and every non-empty record of a CSV file, parsed by ``workers`` processes when it pays."""
+    path = os.fspath(path)
+    workers = BULK_LOAD_WORKERS if workers is None else workers
+    with open(path, "rb") as f:
+        data = f.read()
+    body = _header_end(data)
+    header = next(iter(_parse(data[:body], encoding, delimiter)), [])
+
+    if workers <= 1 or not quotes_are_structural(data, body, delimiter.encode(encoding)):
+        return header, [values for values in _parse(data[body:], encoding, delimiter) if values]
+
+    ranges = split_ranges(data, body, workers * CHUNKS_PER_WORKER)
+    del data
+    records: List[List[str]] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges) or 1),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        chunks = pool.map(
+            _parse_range,
+            [path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [encoding] * len(ranges),
+            [delimiter] * len(ranges),
+        )
+        for chunk in chunks:
+            records.extend(chunk)
+    return header, records
+
+
+def read_rows(path, encoding: str = "utf-8", delimiter: str = ",",
+              workers: Optional[int] = None) -> Tuple[List[str], List[Dict]]:
+    """Like ``read_records``, but rows are the dicts ``csv.DictReader`` would have produced."""
+    header, records = read_records(path, encoding, delimiter, workers)
+    width = len(header)
+    rows = []
+    for values in records:
+        if len(values) == width:
+            rows.append(dict(zip(header, values)))
+            continue
+        row = dict(zip(header, values))
+        if len(values) > width:
+            row[None] = values[width:]
+        else:
+            for name in header[len(values):]:
+                row[name] = None
+        rows.append(row)
+    return header, rows
+
+
+def worth_parallel(size: int) -> bool:
+    """Whether a file of ``size`` bytes should be parsed by the process pool."""
+    return BULK_LOAD_WORKERS > 1 and size >= BULK_LOAD_MIN_BYTES
@@ -0,0 +1,326 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterator, List, Dict, Optional, Tuple
+from app.repositories import bulk_loader
+from app.utils.cover_urls import COVER_TEMPLATES
+
+BX_BOOKS_CSV = Path(__file__).resolve().parents[1] / "data" / "BX_Books.csv"
+
+MAGIC = b"BXSNAP02"
+
+# Columns with few distinct values are dictionary-encoded: one code per row plus a table of unique strings.
+DICTIONARY_COLUMNS = {"Book-Author", "Publisher", "Year-Of-Publication"}
+# Columns usually rebuilt from another column (cover URLs from the ISBN); only the exceptions are stored.
+DERIVED_COLUMNS = COVER_TEMPLATES
+ISBN_COLUMN = "ISBN"
+
+
+def snapshot_path(csv_path) -> str:
+    return f"{os.fspath(csv_path)}.snap"
+
+
+def _source_signature(csv_path) -> Tuple[int, int]:
+    st = os.stat(csv_path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _Strings:
+    """A read-only sequence of strings stored as end offsets plus one UTF-8 blob."""
+    __slots__ = ("offsets", "data")
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> str:
+        start = self.offsets[i - 1] if i else 0
+        return str(self.data[start:self.offsets[i]], "utf-8")
+
+
+class _Dictionary:
+    """A read-only sequence of strings stored as per-row codes into a table of unique values."""
+    __slots__ = ("codes", "values")
+
+    def __init__(self, codes: memoryview, values: _Strings):
+        self.codes = codes
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.values[self.codes[i]]
+
+
+class _Derived:
+    """A column whose value is rebuilt from another column, except on rows with an explicit code."""
+    __slots__ = ("codes", "values", "source", "template")
+
+    def __init__(self, codes: memoryview, values: _Strings, source, template: str):
+        self.codes = codes
+        self.values = values
+        self.source = source
+        self.template = template
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        code = self.codes[i]
+        return self.template.format(self.source[i]) if code == 0 else self.values[code - 1]
+
+
+class CatalogSnapshot:
+    """Memory-mapped, column-oriented copy of BX_Books.csv that decodes strings only when they are read."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_len,) = struct.unpack_from("<I", view, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_len]))
+
+        self.source = tuple(header["source"])
+        self.fieldnames: List[str] = header["fieldnames"]
+        self._view = view
+        self._views: List[memoryview] = []
+        specs = header["columns"]
+        self._columns = {name: self._column(spec) for name, spec in specs.items() if spec["kind"] != "derived"}
+        for name, spec in specs.items():
+            if spec["kind"] == "derived":
+                self._columns[name] = _Derived(
+                    self._array(spec["codes"]), self._strings(spec["values"]),
+                    self._columns[spec["source"]], spec["template"],
+                )
+        self._order = self._array(header["isbn_order"])
+        self._isbns = self._columns.get(ISBN_COLUMN)
+        self._rows = header["rows"]
+
+    def _slice(self, offset: int, length: int) -> memoryview:
+        view = self._view[offset:offset + length]
+        self._views.append(view)
+        return view
+
+    def _array(self, section) -> memoryview:
+        offset, count = section
+        view = self._slice(offset, 4 * count).cast("I")
+        self._views.append(view)
+        return view
+
+    def _strings(self, spec) -> _Strings:
+        offset, length = spec["data"]
+        return _Strings(self._array(spec["offsets"]), self._slice(offset, length))
+
+    def _column(self, spec):
+        if spec["kind"] == "dictionary":
+            return _Dictionary(self._array(spec["codes"]), self._strings(spec["values"]))
+        return self._strings(spec)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def column(self, name: str):
+        """Return the lazily-decoded sequence of values for one column."""
+        return self._columns[name]
+
+    def row(self, i: int) -> Dict[str, str]:
+        return {name: self._columns[name][i] for name in self.fieldnames}
+
+    def rows(self) -> Iterator[Dict[str, str]]:
+        for i in range(self._rows):
+            yield self.row(i)
+
+    def find(self, isbn: str) -> Optional[int]:
+        """Return the row number of the first book with this ISBN, by binary search."""
+        if self._isbns is None:
+            return None
+        isbns, order = self._isbns, self._order
+        pos = bisect_left(range(len(order)), isbn, key=lambda k: isbns[order[k]])
+        if pos < len(order) and isbns[order[pos]] == isbn:
+            return order[pos]
+        return None
+
+    def get(self, isbn: str) -> Optional[Dict[str, str]]:
+        i = self.find(isbn)
+        return None if i is None else self.row(i)
+
+    def close(self):
+        self._columns = {}
+        self._isbns = None
+        self._order = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._view.release()
+        self._map.close()
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+class _Writer:
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> Tuple[int, int]:
+        pad = -self.size % 8
+        if pad:
+            self.chunks.append(b"\0" * pad)
+            self.size += pad
+        offset = self.size
+        self.chunks.append(data)
+        self.size += len(data)
+        return offset, len(data)
+
+    def add_array(self, values: array) -> List[int]:
+        offset, _ = self.add(values.tobytes())
+        return [offset, len(values)]
+
+    def add_strings(self, values: List[str]) -> Dict:
+        ends = array("I")
+        blob = bytearray()
+        for value in values:
+            blob += value.encode("utf-8")
+            ends.append(len(blob))
+        data_offset, data_len = self.add(bytes(blob))
+        return {"kind": "strings", "offsets": self.add_array(ends), "data": [data_offset, data_len]}
+
+    def add_dictionary(self, values: List[str]) -> Dict:
+        codes = array("I")
+        table: Dict[str, int] = {}
+        for value in values:
+            code = table.get(value)
+            if code is None:
+                code = table[value] = len(table)
+            codes.append(code)
+        return {"kind": "dictionary", "codes": self.add_array(codes), "values": self.add_strings(list(table))}
+
+    def add_derived(self, values: List[str], sources: List[str], source: str, template: str) -> Dict:
+        """Store only the values that ``template`` does not rebuild from ``sources``; code 0 means rebuild."""
+        codes = array("I")
+        table: Dict[str, int] = {}
+        for value, key in zip(values, sources):
+            if key and value == template.format(key):
+                codes.append(0)
+                continue
+            code = table.get(value)
+            if code is None:
+                code = table[value] = len(table) + 1
+            codes.append(code)
+        return {
+            "kind": "derived", "source": source, "template": template,
+            "codes": self.add_array(codes), "values": self.add_strings(list(table)),
+        }
+
+
+def build_snapshot(csv_path=BX_BOOKS_CSV, encoding: str = "latin-1", delimiter: str = ";") -> str:
+    """Convert the catalog CSV into a snapshot file next to it and return the snapshot's path."""
+    csv_path = os.fspath(csv_path)
+    source = _source_signature(csv_path)
+    fieldnames, records = bulk_loader.read_records(
+        csv_path, encoding, delimiter, workers=None if bulk_loader.worth_parallel(source[1]) else 1
+    )
+    width = len(fieldnames)
+    records = [(r + [""] * (width - len(r)))[:width] for r in records]
+
+    writer = _Writer()
+    columns = {}
+    for i, name in enumerate(fieldnames):
+        values = [r[i] for r in records]
+        from_column, template = DERIVED_COLUMNS.get(name, (None, None))
+        if from_column in fieldnames:
+            keys = [r[fieldnames.index(from_column)] for r in records]
+            columns[name] = writer.add_derived(values, keys, from_column, template)
+        elif name in DICTIONARY_COLUMNS:
+            columns[name] = writer.add_dictionary(values)
+        else:
+            columns[name] = writer.add_strings(values)
+
+    key = fieldnames.index(ISBN_COLUMN) if ISBN_COLUMN in fieldnames else 0
+    order = array("I", sorted(range(len(records)), key=lambda i: (records[i][key], i)))
+    isbn_order = writer.add_array(order)
+
+    header = {
+        "source": list(source),
+        "fieldnames": fieldnames,
+        "rows": len(records),
+        "columns": columns,
+        "isbn_order": isbn_order,
+    }
+    # Section offsets are relative to the start of the file, so leave room for the header first.
+    # Shifting can lengthen the JSON, so grow the reserved space until it fits.
+    shift = 0
+    while True:
+        header_bytes = json.dumps(_shift(header, shift)).encode("utf-8")
+        needed = len(MAGIC) + 4 + len(header_bytes)
+        if needed <= shift:
+            header_bytes += b" " * (shift - needed)
+            break
+        shift = needed + (-needed % 8)
+
+    target = snapshot_path(csv_path)
+    tmp = f"{target}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for chunk in writer.chunks:
+            f.write(chunk)
+    os.replace(tmp, target)
+    return target
+
+
+def _shift(header: Dict, shift: int) -> Dict:
+    """Move every section offset in ``header`` by ``shift`` bytes."""
+    def move(spec):
+        if isinstance(spec, dict):
+            return {k: (move(v) if k in ("offsets", "data", "codes", "values") else v) for k, v in spec.items()}
+        return [spec[0] + shift, spec[1]]
+
+    header = dict(header)
+    header["columns"] = {name: move(spec) for name, spec in header["columns"].items()}
+    header["isbn_order"] = move(header["isbn_order"])
+    return header
+
+
+def load_snapshot(csv_path=BX_BOOKS_CSV) -> Optional[CatalogSnapshot]:
+    """Open the snapshot for ``csv_path`` if it exists and was built from the file as it is now."""
+    try:
+        source = _source_signature(csv_path)
+        snapshot = CatalogSnapshot(snapshot_path(csv_path))
+    except (OSError, ValueError):
+        return None
+    if snapshot.source != source:
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the columnar snapshot of the book catalog.")
+    parser.add_argument("--csv", default=str(BX_BOOKS_CSV), help="catalog CSV to convert")
+    args = parser.parse_args(argv)
+
+    target = build_snapshot(args.csv)
+    snapshot = CatalogSnapshot(target)
+    print(f"{target}: {len(snapshot)} books, {os.path.getsize(target)} bytes")
+    snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Keep loaded tables as tuple-backed Row records instead of dicts.
+COMPACT_ROWS = os.getenv("COMPACT_ROWS", "0") == "1"
+
+# Column -> (source column, format string): the column's usual value is the format applied to the source.
+Derived = Mapping[str, Tuple[str, str]]
+
+
+class _DerivedValue:
+    """Stored in place of a value that its row can rebuild from another column."""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "DERIVED"
+
+    def __reduce__(self):
+        return "DERIVED"
+
+
+DERIVED = _DerivedValue()
+
+
+class Row(Mapping):
+    """Read-only record for one table row: a tuple of values plus a class-level column map."""
+    __slots__ = ("_values",)
+    _fields: Tuple[str, ...] = ()
+    _positions: Dict[str, int] = {}
+    _derived: Dict[int, Tuple[int, str]] = {}
+    _derived_spec: Tuple = ()
+
+    def __init__(self, values: Tuple):
+        self._values = values
+
+    def __getitem__(self, key):
+        i = self._positions.get(key)
+        if i is None:
+            raise KeyError(key)
+        value = self._values[i]
+        if value is DERIVED:
+            source, template = self._derived[i]
+            return template.format(self._values[source])
+        return value
+
+    def get(self, key, default=None):
+        if key not in self._positions:
+            return default
+        return self[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._positions
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return f"Row({dict(self)!r})"
+
+    def __reduce__(self):
+        return (_rebuild, (self._fields, self._derived_spec, self._values))
+
+
+def _rebuild(fields: Tuple[str, ...], derived: Tuple, values: Tuple) -> Row:
+    return row_type(fields, dict(derived))(values)
+
+
+_row_types: Dict[Tuple, type] = {}
+_row_types_guard = threading.Lock()
+
+
+def row_type(fieldnames: Iterable[str], derived: Optional[Derived] = None) -> type:
+    """The Row subclass for tables with exactly these columns and ``derived`` rules, created once per shape."""
+    fields = tuple(fieldnames)
+    spec = tuple(sorted((c, tuple(s)) for c, s in (derived or {}).items() if c in fields and s[0] in fields))
+    with _row_types_guard:
+        cls = _row_types.get((fields, spec))
+        if cls is None:
+            positions = {name: i for i, name in enumerate(fields)}
+            cls = _row_types[(fields, spec)] = type("Row", (Row,), {
+                "__slots__": (),
+                "_fields": fields,
+                "_positions": positions,
+                "_derived": {positions[c]: (positions[source], template) for c, (source, template) in spec},
+                "_derived_spec": spec,
+            })
+        return cls
+
+
+def compact(fieldnames: Optional[List[str]], rows: Iterable[Mapping], derived: Optional[Derived] = None) -> List[Mapping]:
+    """Turn ``rows`` into Row records, sharing one string object per distinct value."""
+    if not fieldnames or len(set(fieldnames)) != len(fieldnames):
+        return list(rows)
+    make = row_type(fieldnames, derived)
+    rules = list(make._derived.items())
+    width = len(fieldnames)
+    pool: Dict[str, str] = {}
+    intern = pool.setdefault
+    out: List[Mapping] = []
+    for row in rows:
+        if type(row) is make:
+            out.append(row)
+            continue
+        if len(row) != width:
+            out.append(row)
+            continue
+        try:
+            values = [v if v is None else intern(v, v) for v in (row[f] for f in fieldnames)]
+        except (KeyError, TypeError):
+            out.append(row)
+            continue
+        for i, (source, template) in rules:
+            if values[source] and values[i] == template.format(values[source]):
+                values[i] = DERIVED
+        out.append(make(tuple(values)))
+    return out
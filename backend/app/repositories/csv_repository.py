@@ -1,46 +1,378 @@
 import csv
+import io
+import itertools
 import os
-import threading
-from typing import List, Dict
-from app.repositories.base_repository import BaseRepository
+from typing import Iterable, Iterator, List, Dict, Mapping, Optional, Tuple
+from app.repositories.base_repository import BaseRepository, Where
+from app.repositories import bulk_loader, compact_rows, durability
+from app.repositories.file_lock import FileLock, lock_for
+from app.repositories.group_commit import GroupCommitter
+from app.repositories.secondary_index import IndexSet
+
+
+class _CachedTable:
+    """Parsed copy of a CSV file, tagged with the stat signature it was read at."""
+    __slots__ = ("signature", "fieldnames", "rows", "indexes")
+
+    def __init__(self, signature: Tuple, fieldnames: Optional[List[str]], rows: List[Dict]):
+        self.signature = signature
+        self.fieldnames = fieldnames
+        self.rows = rows
+        self.indexes = IndexSet()
+
 
 class CSVRepository(BaseRepository):
-    """Thread-safe CSV handler shared across all models."""
-    _locks: Dict[str, threading.Lock] = {}
+    """Thread- and process-safe CSV handler shared across all models, keeping each table it reads in memory."""
+    encoding = "utf-8"
+    delimiter = ","
+    # With CSV_CACHE=0 nothing is kept resident and ``iter_rows`` streams from the file.
+    cache_tables = os.getenv("CSV_CACHE", "1") != "0"
+    compact_tables = compact_rows.COMPACT_ROWS
+    # Columns compact rows may rebuild instead of storing (see ``compact_rows.row_type``).
+    derived_columns: compact_rows.Derived = {}
+    # Appends to one file arriving within this many milliseconds are committed together; ``write_all`` never is.
+    group_commit_ms = float(os.getenv("GROUP_COMMIT_MS", "0"))
+    # Parse large files in a process pool (see ``bulk_loader``); only the offline tools set it.
+    bulk_load = False
+    # Records ``iter_rows`` reads per lock acquisition when streaming with ``CSV_CACHE=0``.
+    stream_batch_rows = 1024
+
+    _cache: Dict[Tuple, _CachedTable] = {}
+    _committer = GroupCommitter()
+
+    def _get_lock(self, path: str) -> FileLock:
+        return lock_for(path)
+
+    # -----------------------------------------------------------------------
+    # Table cache
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _signature(st: os.stat_result) -> Tuple:
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _cache_key(self, path) -> Tuple:
+        return (os.path.abspath(path), self.encoding, self.delimiter)
+
+    def _load(self, path) -> _CachedTable:
+        """Return the cached table for ``path``, re-parsing it if the file changed. Caller holds the lock."""
+        key = self._cache_key(path)
+        with open(path, "r", newline="", encoding=self.encoding) as f:
+            signature = self._signature(os.fstat(f.fileno()))
+            cached = self._cache.get(key)
+            if cached is not None and cached.signature == signature:
+                return cached
+            if self.bulk_load and bulk_loader.worth_parallel(signature[1]):
+                header, rows = bulk_loader.read_rows(path, self.encoding, self.delimiter)
+                table = _CachedTable(signature, header or None, self._resident(header, rows))
+            else:
+                reader = csv.DictReader(f, delimiter=self.delimiter)
+                rows = self._resident(reader.fieldnames, reader)
+                table = _CachedTable(signature, reader.fieldnames, rows)
+        self._cache[key] = table
+        return table
+
+    def _resident(self, fieldnames: Optional[List[str]], rows: Iterable[Dict]) -> List[Dict]:
+        """The rows as they are kept in the cache: Row records in compact mode, else the dicts themselves."""
+        if self.compact_tables:
+            return compact_rows.compact(fieldnames, rows, self.derived_columns)
+        return rows if isinstance(rows, list) else list(rows)
+
+    def _remember(self, path, fieldnames: List[str], rows: List[Dict]):
+        """Store rows that were just written as the cached copy of ``path``."""
+        key = self._cache_key(path)
+        try:
+            signature = self._signature(os.stat(path))
+        except OSError:
+            self._cache.pop(key, None)
+            return
+        self._cache[key] = _CachedTable(signature, list(fieldnames), self._resident(fieldnames, rows))
 
-    def _get_lock(self, path: str) -> threading.Lock:
-        if path not in self._locks:
-            self._locks[path] = threading.Lock()
-        return self._locks[path]
+    def _remember_append(self, path, fieldnames: List[str], rows: List[Dict], previous: Optional[Tuple]):
+        """Extend the cached copy after an append, if it was current before the write."""
+        key = self._cache_key(path)
+        cached = self._cache.get(key)
+        if cached is None or cached.signature != previous or cached.fieldnames != list(fieldnames):
+            self._cache.pop(key, None)
+            return
+        try:
+            cached.signature = self._signature(os.stat(path))
+        except OSError:
+            self._cache.pop(key, None)
+            return
+        start = len(cached.rows)
+        cached.rows.extend(self._resident(fieldnames, [self._normalize(fieldnames, r) for r in rows]))
+        cached.indexes.extend(cached.rows, start)
+
+    # -----------------------------------------------------------------------
+    # BaseRepository
+    # -----------------------------------------------------------------------
 
     def read_all(self, path: str) -> List[Dict]:
         """
         Reads all rows from a CSV file and returns them as a list of dictionaries.
         """
-        if not os.path.exists(path):
+        lock = self._get_lock(path)
+        try:
+            with lock.shared():
+                table = self._load(path)
+        except FileNotFoundError:
             return []
+        return [dict(r) for r in table.rows]
+
+    def iter_rows(self, path: str, where: Where = None, columns: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """
+        Yields matching rows, projected to ``columns``, without copying the table.
+        """
+        if not self.cache_tables:
+            yield from self._stream(path, where, columns)
+            return
+        for row in self._scan(path, where):
+            yield self._project(row, columns)
+
+    def iter_records(self, path: str, where: Where = None) -> Iterator[Mapping[str, str]]:
+        """Yields the cached rows themselves; they must not be modified."""
+        if not self.cache_tables:
+            yield from self._stream(path, where, None)
+            return
+        yield from self._scan(path, where)
+
+    def _scan(self, path, where: Where) -> Iterator[Dict]:
+        lock = self._get_lock(path)
+        try:
+            with lock.shared():
+                table = self._load(path)
+                # write_all swaps in a new list and append_row only adds to the end,
+                # so the first ``count`` entries of this list cannot change under us.
+                rows, count = table.rows, len(table.rows)
+                positions = None
+                if where is not None and not callable(where):
+                    positions = table.indexes.positions(self._indexes_for(path), rows, where)
+        except FileNotFoundError:
+            return
+
+        match = self._matcher(where)
+        for i in (range(count) if positions is None else positions):
+            if i >= count:
+                break
+            row = rows[i]
+            if match(row):
+                yield row
+
+    def _stream(self, path, where: Where, columns: Optional[Iterable[str]]) -> Iterator[Dict]:
+        """Parse the file lazily, testing equality filters on raw fields before any dict is built."""
+        # The lock is held only while a batch of records is read, never across a yield, so a
+        # consumer that stops early does not keep writers out.
         lock = self._get_lock(path)
-        with lock, open(path, 'r', newline='', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
+        with lock.shared():
+            try:
+                f = open(path, "r", newline="", encoding=self.encoding)
+            except FileNotFoundError:
+                return
+        with f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            with lock.shared():
+                header = next(reader, None)
+            if header is None:
+                return
+            position = {name: i for i, name in reversed(list(enumerate(header)))}
+
+            def field(values, name):
+                i = position.get(name)
+                return values[i] if i is not None and i < len(values) else None
+
+            checks = []
+            if where is not None and not callable(where):
+                checks = list(where.items())
+                where = None
+            columns = list(columns) if columns is not None else None
+
+            while True:
+                with lock.shared():
+                    batch = list(itertools.islice(reader, self.stream_batch_rows))
+                if not batch:
+                    return
+                for values in batch:
+                    if not values:
+                        continue
+                    if any(field(values, k) != v for k, v in checks):
+                        continue
+                    if columns is not None and where is None:
+                        yield {c: field(values, c) for c in columns}
+                        continue
+                    row = self._row_from(header, values)
+                    if where is None or where(row):
+                        yield self._project(row, columns)
+
+    @staticmethod
+    def _row_from(header: List[str], values: List[str]) -> Dict:
+        """Build the dict csv.DictReader would produce for one record."""
+        row = dict(zip(header, values))
+        if len(values) > len(header):
+            row[None] = values[len(header):]
+        elif len(values) < len(header):
+            for name in header[len(values):]:
+                row[name] = None
+        return row
 
     def write_all(self, path: str, fieldnames: List[str], rows: List[Dict]):
         """
         Overwrites the entire CSV file with the given rows.
         """
         lock = self._get_lock(path)
-        with lock, open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
+        with lock.exclusive():
+            self._write_locked(path, fieldnames, rows)
 
     def append_row(self, path: str, fieldnames: List[str], row: Dict):
         """
         Add a single row to the CSV file safely.
-        """        
+        """
+        if self.group_commit_ms > 0:
+            self._check_fields(fieldnames, [row])
+            self._submit(path, (list(fieldnames), row))
+            return
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            self._append_locked(path, fieldnames, [row])
+
+    def _write_locked(self, path, fieldnames: List[str], rows: List[Dict], sync: bool = False):
+        lines = self._format(fieldnames, rows)
+        durability.atomic_write(path, "".join(lines), self.encoding, force_sync=sync)
+        self._remember(path, fieldnames, [self._normalize(fieldnames, r) for r in rows])
+        self._written(path, fieldnames, rows, lines)
+
+    def _append_locked(self, path, fieldnames: List[str], rows: List[Dict], sync: bool = False):
         file_exists = os.path.exists(path)
+        previous = self._signature(os.stat(path)) if file_exists else None
+        lines = self._format(fieldnames, rows)
+        # An empty file gets a header too, as if it had not existed.
+        with_header = previous is None or previous[1] == 0
+        with open(path, 'a', newline='', encoding=self.encoding) as f:
+            f.write("".join(lines if with_header else lines[1:]))
+            durability.synced(f, path, force=sync)
+        if not with_header:
+            self._remember_append(path, fieldnames, rows, previous)
+        else:
+            self._remember(path, fieldnames, [self._normalize(fieldnames, r) for r in rows])
+        self._appended(path, fieldnames, rows, lines, previous)
+
+    @staticmethod
+    def _check_fields(fieldnames: List[str], rows: List[Dict]):
+        """Raise the error csv.DictWriter would, before the row is queued behind other writers."""
+        allowed = set(fieldnames)
+        for row in rows:
+            extra = row.keys() - allowed
+            if extra:
+                raise ValueError("dict contains fields not in fieldnames: " + ", ".join(repr(x) for x in extra))
+
+    # -----------------------------------------------------------------------
+    # Row-level changes
+    # -----------------------------------------------------------------------
+
+    def _matching(self, path, table: _CachedTable, where: Where) -> List[int]:
+        """Positions of the cached rows matching ``where``, through an index when one is declared."""
+        positions = None
+        if where is not None and not callable(where):
+            positions = table.indexes.positions(self._indexes_for(path), table.rows, where)
+        candidates = range(len(table.rows)) if positions is None else list(positions)
+        match = self._matcher(where)
+        return [i for i in candidates if match(table.rows[i])]
+
+    def _writable(self, fieldnames: List[str], rows: List[Dict]) -> List[Dict]:
+        """A copy of ``rows`` that csv.DictWriter accepts: rows with surplus fields are trimmed."""
+        return [r if None not in r else self._normalize(fieldnames, r) for r in rows]
+
+    def update_where(self, path: str, key: Where, changes: Mapping[str, object]) -> int:
+        """Change matching rows in place when a subclass can patch their bytes (see ``_patch``), otherwise rewrite the file."""
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            try:
+                table = self._load(path)
+            except FileNotFoundError:
+                return 0
+            positions = self._matching(path, table, key)
+            if not positions:
+                return 0
+
+            fieldnames = list(table.fieldnames)
+            changed = {}
+            for i in positions:
+                row = self._normalize(fieldnames, table.rows[i])
+                row.update((k, self._to_text(v)) for k, v in changes.items() if k in row)
+                changed[i] = row
+            if not self._patch(path, table, changed):
+                rows = self._writable(fieldnames, table.rows)
+                for i, row in changed.items():
+                    rows[i] = row
+                self._write_locked(path, fieldnames, rows)
+
+            # Positions did not move, so the indexes survive unless an indexed column changed.
+            cached = self._cache.get(self._cache_key(path))
+            if cached is not None:
+                kept = not any(set(changes) & set(k) for k in self._indexes_for(path))
+                cached.indexes = table.indexes if kept else IndexSet()
+            return len(positions)
+
+    def delete_where(self, path: str, where: Where) -> int:
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            try:
+                table = self._load(path)
+            except FileNotFoundError:
+                return 0
+            positions = set(self._matching(path, table, where))
+            if not positions:
+                return 0
+            fieldnames = list(table.fieldnames)
+            rows = self._writable(fieldnames, [r for i, r in enumerate(table.rows) if i not in positions])
+            self._write_locked(path, fieldnames, rows)
+            return len(positions)
+
+    # -----------------------------------------------------------------------
+    # Group commit
+    # -----------------------------------------------------------------------
+
+    def _submit(self, path, op: Tuple):
+        self._committer.submit(
+            os.path.abspath(path), op, lambda ops: self._commit(path, ops), self.group_commit_ms / 1000
+        )
+
+    def _commit(self, path, ops: List[Tuple]):
+        """Append a batch of queued (fieldnames, row) pairs under one exclusive lock, fsynced per ``FSYNC_POLICY``."""
+        sync = durability.FSYNC_POLICY != "never"
         lock = self._get_lock(path)
-        with lock, open(path, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
+        with lock.exclusive():
+            rest = list(ops)
+            while rest:
+                fieldnames = rest[0][0]
+                rows = []
+                while rest and rest[0][0] == fieldnames:
+                    rows.append(rest.pop(0)[1])
+                self._append_locked(path, fieldnames, rows, sync=sync)
+
+    # -----------------------------------------------------------------------
+    # Write hooks for subclasses that keep extra structures next to the file
+    # -----------------------------------------------------------------------
+
+    def _format(self, fieldnames: List[str], rows: List[Dict]) -> List[str]:
+        """Render the header and rows exactly as csv.DictWriter would, one string per record."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, delimiter=self.delimiter)
+        writer.writeheader()
+        lines = [buffer.getvalue()]
+        for row in rows:
+            buffer.seek(0)
+            buffer.truncate()
             writer.writerow(row)
+            lines.append(buffer.getvalue())
+        return lines
+
+    def _patch(self, path, table: _CachedTable, changed: Dict[int, Dict]) -> bool:
+        """Write each ``changed[i]`` over the bytes of ``table.rows[i]``; return False to have the file rewritten instead."""
+        return False
+
+    def _written(self, path, fieldnames: List[str], rows: List[Dict], lines: List[str]):
+        """Called with the lock held after ``write_all`` replaced the file."""
+
+    def _appended(self, path, fieldnames: List[str], rows: List[Dict], lines: List[str], previous: Optional[Tuple]):
+        """Called with the lock held after ``lines`` were appended; ``previous`` is the signature before, or None."""
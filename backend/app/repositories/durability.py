@@ -0,0 +1,111 @@
+import atexit
+import os
+import threading
+import time
+from typing import Set
+
+# always:  fsync every write before returning.
+# batched: return at once; a background thread fsyncs written files every FSYNC_INTERVAL_MS.
+# never:   leave it to the operating system.
+FSYNC_POLICIES = ("always", "batched", "never")
+FSYNC_POLICY = os.getenv("FSYNC_POLICY", "batched")
+FSYNC_INTERVAL_MS = int(os.getenv("FSYNC_INTERVAL_MS", "1000"))
+
+if FSYNC_POLICY not in FSYNC_POLICIES:
+    raise ValueError(f"FSYNC_POLICY must be one of {', '.join(FSYNC_POLICIES)}, not {FSYNC_POLICY!r}")
+
+
+def _fsync_path(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: str):
+    """Make a rename in the directory of ``path`` durable. Not every platform can open a directory."""
+    try:
+        _fsync_path(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        pass
+
+
+class _Flusher:
+    """Background thread that fsyncs files written under the "batched" policy."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._dirty: Set[str] = set()
+        self._guard = threading.Lock()
+        self._thread = None
+
+    def mark(self, path: str):
+        with self._guard:
+            self._dirty.add(os.path.abspath(path))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="fsync-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        with self._guard:
+            dirty, self._dirty = self._dirty, set()
+        for path in dirty:
+            try:
+                _fsync_path(path)
+            except OSError:
+                continue
+        # Renamed files also need their directory entry on disk; one fsync per directory.
+        one_per_directory = {os.path.dirname(p): p for p in dirty}
+        for path in one_per_directory.values():
+            _fsync_dir(path)
+
+
+flusher = _Flusher(FSYNC_INTERVAL_MS / 1000)
+atexit.register(flusher.flush)
+
+
+def synced(f, path: str, force: bool = False):
+    """Apply the fsync policy to ``f``, an open file just written at ``path``."""
+    if force or FSYNC_POLICY == "always":
+        f.flush()
+        os.fsync(f.fileno())
+    elif FSYNC_POLICY == "batched":
+        flusher.mark(path)
+
+
+def temp_path(path: str) -> str:
+    """A temporary name next to ``path`` that no other thread or process will pick."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def atomic_write(path: str, data: str, encoding: str, force_sync: bool = False):
+    """Replace ``path`` with ``data`` so that readers see either the old or the new file, never a part."""
+    tmp = temp_path(path)
+    sync = force_sync or FSYNC_POLICY == "always"
+    try:
+        with open(tmp, "w", newline="", encoding=encoding) as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if sync:
+        _fsync_dir(path)
+    elif FSYNC_POLICY == "batched":
+        flusher.mark(path)
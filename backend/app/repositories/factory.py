@@ -0,0 +1,38 @@
+import os
+import threading
+from typing import Dict, Tuple, Type
+from app.repositories.base_repository import BaseRepository
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.journal_repository import JournaledRepository
+from app.repositories.memory_repository import InMemoryRepository
+from app.repositories.sqlite_repository import SQLiteRepository
+
+# One repository per (backend, file dialect), shared by every service and request that uses it.
+_repositories: Dict[Tuple[str, Type[CSVRepository]], BaseRepository] = {}
+_guard = threading.Lock()
+
+
+def get_repository(name: str, csv_class: Type[CSVRepository] = CSVRepository) -> BaseRepository:
+    """The shared storage backend for one service, from ``STORAGE_BACKEND_<NAME>`` or ``STORAGE_BACKEND``."""
+    backend = os.getenv(f"STORAGE_BACKEND_{name.upper()}") or os.getenv("STORAGE_BACKEND", "csv")
+    backend = backend.strip().lower()
+    key = (backend, csv_class)
+    repo = _repositories.get(key)
+    if repo is None:
+        with _guard:
+            repo = _repositories.get(key)
+            if repo is None:
+                repo = _repositories[key] = _build(backend, csv_class)
+    return repo
+
+
+def _build(backend: str, csv_class: Type[CSVRepository]) -> BaseRepository:
+    if backend == "csv":
+        return csv_class()
+    if backend == "journal":
+        return JournaledRepository(csv_class())
+    if backend == "sqlite":
+        return SQLiteRepository()
+    if backend == "memory":
+        return InMemoryRepository(csv_class())
+    raise ValueError(f"Unknown storage backend: {backend}")
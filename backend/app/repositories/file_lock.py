@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+from app.repositories.rwlock import RWLock
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+SHARED = "shared"
+EXCLUSIVE = "exclusive"
+
+
+class LockStats:
+    """Wait and hold times for one lock, split by mode."""
+    __slots__ = ("acquired", "contended", "wait_total", "wait_max", "held_total")
+
+    def __init__(self):
+        self.acquired = {SHARED: 0, EXCLUSIVE: 0}
+        self.contended = {SHARED: 0, EXCLUSIVE: 0}
+        self.wait_total = {SHARED: 0.0, EXCLUSIVE: 0.0}
+        self.wait_max = {SHARED: 0.0, EXCLUSIVE: 0.0}
+        self.held_total = {SHARED: 0.0, EXCLUSIVE: 0.0}
+
+    def record_wait(self, mode: str, waited: float, contended: bool):
+        self.acquired[mode] += 1
+        if contended:
+            self.contended[mode] += 1
+        self.wait_total[mode] += waited
+        if waited > self.wait_max[mode]:
+            self.wait_max[mode] = waited
+
+    def record_hold(self, mode: str, held: float):
+        self.held_total[mode] += held
+
+    def to_dict(self) -> Dict:
+        result = {}
+        for mode in (SHARED, EXCLUSIVE):
+            count = self.acquired[mode]
+            result[mode] = {
+                "acquired": count,
+                "contended": self.contended[mode],
+                "wait_ms_total": round(self.wait_total[mode] * 1000, 3),
+                "wait_ms_max": round(self.wait_max[mode] * 1000, 3),
+                "wait_ms_avg": round(self.wait_total[mode] * 1000 / count, 3) if count else 0.0,
+                "held_ms_total": round(self.held_total[mode] * 1000, 3),
+            }
+        return result
+
+
+class FileLock:
+    """Reader-writer lock for one data file, across threads and, through ``fcntl.flock``, across processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.local = RWLock()
+        self.stats = LockStats()
+        self._stats_guard = threading.Lock()
+
+    def _open(self):
+        if fcntl is None:
+            return None
+        try:
+            return os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            return None
+
+    @contextmanager
+    def _hold(self, mode: str) -> Iterator[None]:
+        started = time.perf_counter()
+        acquire, release = (
+            (self.local.acquire_read, self.local.release_read) if mode == SHARED
+            else (self.local.acquire_write, self.local.release_write)
+        )
+        contended = not acquire(blocking=False)
+        if contended:
+            acquire()
+        fd = None
+        try:
+            fd = self._open()
+            if fd is not None:
+                operation = fcntl.LOCK_SH if mode == SHARED else fcntl.LOCK_EX
+                try:
+                    fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    contended = True
+                    fcntl.flock(fd, operation)
+            acquired = time.perf_counter()
+            with self._stats_guard:
+                self.stats.record_wait(mode, acquired - started, contended)
+            try:
+                yield
+            finally:
+                with self._stats_guard:
+                    self.stats.record_hold(mode, time.perf_counter() - acquired)
+        finally:
+            if fd is not None:
+                os.close(fd)  # closing the descriptor releases the flock
+            release()
+
+    def shared(self):
+        """Hold the lock for reading: other readers, in any process, may hold it too."""
+        return self._hold(SHARED)
+
+    def exclusive(self):
+        """Hold the lock for writing: no other reader or writer, in any process, holds it."""
+        return self._hold(EXCLUSIVE)
+
+
+_registry: Dict[str, FileLock] = {}
+_registry_guard = threading.Lock()
+
+
+def lock_for(path) -> FileLock:
+    """Return the one FileLock this process uses for ``path``."""
+    key = os.path.abspath(os.fspath(path))
+    with _registry_guard:
+        lock = _registry.get(key)
+        if lock is None:
+            lock = _registry[key] = FileLock(key)
+        return lock
+
+
+def lock_metrics() -> Dict[str, Dict]:
+    """Lock-wait statistics for every file this process has locked, keyed by path."""
+    with _registry_guard:
+        locks = list(_registry.values())
+    metrics = {}
+    for lock in locks:
+        with lock._stats_guard:
+            metrics[lock.path] = lock.stats.to_dict()
+    return metrics
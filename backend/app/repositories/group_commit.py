@@ -0,0 +1,44 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _Batch:
+    __slots__ = ("ops", "done", "error")
+
+    def __init__(self):
+        self.ops: List[Any] = []
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommitter:
+    """Merges writes to the same key that arrive within ``window`` seconds into one commit."""
+
+    def __init__(self):
+        self._open: Dict[Any, _Batch] = {}
+        self._guard = threading.Lock()
+
+    def submit(self, key, op, commit: Callable[[List], None], window: float):
+        with self._guard:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+            batch.ops.append(op)
+
+        if leader:
+            time.sleep(window)
+            with self._guard:
+                del self._open[key]
+            try:
+                commit(batch.ops)
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
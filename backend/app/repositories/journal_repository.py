@@ -0,0 +1,319 @@
+import json
+import os
+import threading
+from typing import Iterable, Iterator, List, Dict, Mapping, Optional, Tuple
+from app.repositories.base_repository import BaseRepository, Where
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.file_lock import FileLock, lock_for
+from app.repositories.secondary_index import IndexSet
+
+COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(4 * 1024 * 1024)))
+
+
+class _JournalState:
+    """Current view of one table: the base CSV with every journal record applied."""
+    __slots__ = ("fieldnames", "rows", "indexes", "base_signature", "journal_size", "compacting")
+
+    def __init__(self, fieldnames: List[str], rows: List[Dict], base_signature: List[int]):
+        self.fieldnames = fieldnames
+        self.rows = rows
+        self.indexes = IndexSet()
+        self.base_signature = base_signature
+        self.journal_size = 0
+        self.compacting = False
+
+
+class JournaledRepository(BaseRepository):
+    """CSV storage that appends changed row slices to ``<path>.journal`` instead of rewriting the file, compacting in the background."""
+    _states: Dict[str, _JournalState] = {}
+    # Readers share the journal lock but may both replay into the same state; one guard per table.
+    _replay_guards: Dict[str, threading.Lock] = {}
+    _replay_guards_guard = threading.Lock()
+
+    def __init__(self, base: Optional[CSVRepository] = None, compact_bytes: int = COMPACT_BYTES):
+        self.base = base or CSVRepository()
+        self.compact_bytes = compact_bytes
+
+    # -----------------------------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------------------------
+
+    def _get_lock(self, path) -> FileLock:
+        return lock_for(self._journal_path(path))
+
+    def _replay_guard(self, path) -> threading.Lock:
+        key = os.path.abspath(path)
+        with self._replay_guards_guard:
+            guard = self._replay_guards.get(key)
+            if guard is None:
+                guard = self._replay_guards[key] = threading.Lock()
+            return guard
+
+    @staticmethod
+    def _journal_path(path) -> str:
+        return f"{os.fspath(path)}.journal"
+
+    @staticmethod
+    def _base_signature(path) -> Optional[List[int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    @staticmethod
+    def _apply(rows: List[Dict], fieldnames: List[str], record: Dict):
+        rows[record["start"]:record["stop"]] = [dict(zip(fieldnames, values)) for values in record["rows"]]
+
+    def _replay(self, path, state: _JournalState, writer: bool = False):
+        """Apply journal records written since ``state`` was last brought up to date; only a ``writer`` repairs the journal."""
+        journal = self._journal_path(path)
+        try:
+            size = os.path.getsize(journal)
+        except FileNotFoundError:
+            size = 0
+        if size == state.journal_size:
+            return
+        if size < state.journal_size:
+            raise _StaleState()
+
+        torn = None
+        with open(journal, "rb") as f:
+            if state.journal_size == 0:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    torn = 0
+                else:
+                    header = json.loads(line)
+                    if header.get("base") != state.base_signature or header.get("fieldnames") != state.fieldnames:
+                        torn = 0
+            else:
+                f.seek(state.journal_size)
+            if torn is None:
+                offset = f.tell()
+                # Apply to a copy: readers iterating the current list must not see it change.
+                rows = list(state.rows)
+                for line in iter(f.readline, b""):
+                    if not line.endswith(b"\n"):
+                        # Torn write from a crash: the partial record is ignored.
+                        torn = offset
+                        break
+                    self._apply(rows, state.fieldnames, json.loads(line))
+                    offset += len(line)
+                if offset != state.journal_size:
+                    state.rows = rows
+                    state.indexes = IndexSet()
+                    state.journal_size = offset
+
+        if torn is not None and writer:
+            try:
+                if torn == 0:
+                    os.remove(journal)
+                else:
+                    os.truncate(journal, torn)
+            except FileNotFoundError:
+                pass
+
+    def _state(self, path, writer: bool = False) -> Optional[_JournalState]:
+        """Return the up-to-date state for ``path``, or None if the base CSV does not exist."""
+        key = os.path.abspath(path)
+        state = self._states.get(key)
+        base_signature = self._base_signature(path)
+        if base_signature is None:
+            self._states.pop(key, None)
+            return None
+
+        if state is not None and state.base_signature == base_signature:
+            try:
+                self._replay(path, state, writer)
+                return state
+            except _StaleState:
+                pass
+
+        try:
+            with self.base._get_lock(path).shared():
+                table = self.base._load(path)
+        except FileNotFoundError:
+            self._states.pop(key, None)
+            return None
+        state = _JournalState(list(table.fieldnames or []), [dict(r) for r in table.rows], base_signature)
+        self._replay(path, state, writer)
+        self._states[key] = state
+        return state
+
+    def _log(self, path, state: _JournalState, start: int, stop: int, rows: List[Dict]):
+        """Append one splice record to the journal and apply it to ``state``."""
+        journal = self._journal_path(path)
+        lines = []
+        if state.journal_size == 0:
+            lines.append(json.dumps({"base": state.base_signature, "fieldnames": state.fieldnames}))
+        record = {
+            "start": start,
+            "stop": stop,
+            "rows": [[r[f] for f in state.fieldnames] for r in rows],
+        }
+        lines.append(json.dumps(record))
+        with open(journal, "ab") as f:
+            f.write(("\n".join(lines) + "\n").encode("utf-8"))
+            state.journal_size = f.tell()
+        if start == stop == len(state.rows):
+            # Appends only add to the end, which readers allow for, and keep the indexes valid.
+            state.rows.extend(rows)
+            state.indexes.extend(state.rows, start)
+        else:
+            state.rows = state.rows[:start] + rows + state.rows[stop:]
+            state.indexes = IndexSet()
+
+        if state.journal_size >= self.compact_bytes and not state.compacting:
+            state.compacting = True
+            threading.Thread(target=self.compact, args=(path,), name="journal-compaction", daemon=True).start()
+
+    def _rewrite(self, path, fieldnames: List[str], rows: List[Dict]):
+        """Write the table straight to the base CSV and start a fresh, empty journal."""
+        self.base.write_all(path, fieldnames, rows)
+        try:
+            os.remove(self._journal_path(path))
+        except FileNotFoundError:
+            pass
+        normalized = [self._normalize(fieldnames, r) for r in rows]
+        self._states[os.path.abspath(path)] = _JournalState(
+            list(fieldnames), normalized, self._base_signature(path)
+        )
+
+    # -----------------------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------------------
+
+    def compact(self, path):
+        """Fold the journal for ``path`` back into the base CSV."""
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            state = self._state(path, writer=True)
+            if state is None:
+                return
+            state.compacting = False
+            if state.journal_size == 0:
+                return
+            self._rewrite(path, state.fieldnames, state.rows)
+
+    def read_all(self, path: str) -> List[Dict]:
+        lock = self._get_lock(path)
+        with lock.shared():
+            with self._replay_guard(path):
+                state = self._state(path)
+            if state is None:
+                return []
+            return [dict(r) for r in state.rows]
+
+    def iter_rows(self, path: str, where: Where = None, columns: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        for row in self._scan(path, where):
+            yield self._project(row, columns)
+
+    def iter_records(self, path: str, where: Where = None) -> Iterator[Mapping[str, str]]:
+        return self._scan(path, where)
+
+    def _scan(self, path, where: Where) -> Iterator[Dict]:
+        lock = self._get_lock(path)
+        with lock.shared():
+            with self._replay_guard(path):
+                state = self._state(path)
+                if state is None:
+                    return
+                # Splices replace the list and appends only add to its end,
+                # so the first ``count`` rows cannot change under us.
+                rows, count = state.rows, len(state.rows)
+                positions = None
+                if where is not None and not callable(where):
+                    positions = state.indexes.positions(self._indexes_for(path), rows, where)
+        match = self._matcher(where)
+        for i in (range(count) if positions is None else positions):
+            if i >= count:
+                break
+            row = rows[i]
+            if match(row):
+                yield row
+
+    def write_all(self, path: str, fieldnames: List[str], rows: List[Dict]):
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            state = self._state(path, writer=True)
+            if state is None or state.fieldnames != list(fieldnames):
+                self._rewrite(path, fieldnames, rows)
+                return
+
+            new = [self._normalize(fieldnames, r) for r in rows]
+            old = state.rows
+            start = 0
+            limit = min(len(old), len(new))
+            while start < limit and old[start] == new[start]:
+                start += 1
+            tail = 0
+            while tail < limit - start and old[-1 - tail] == new[-1 - tail]:
+                tail += 1
+            if start == len(old) == len(new):
+                return
+
+            self._log(path, state, start, len(old) - tail, new[start:len(new) - tail])
+
+    def _matching(self, path, state: _JournalState, where: Where) -> List[int]:
+        positions = None
+        if where is not None and not callable(where):
+            positions = state.indexes.positions(self._indexes_for(path), state.rows, where)
+        candidates = range(len(state.rows)) if positions is None else list(positions)
+        match = self._matcher(where)
+        return [i for i in candidates if match(state.rows[i])]
+
+    @staticmethod
+    def _runs(positions: List[int]) -> List[Tuple[int, int]]:
+        """Group ascending positions into ``(start, stop)`` ranges of consecutive rows."""
+        runs: List[Tuple[int, int]] = []
+        for i in positions:
+            if runs and runs[-1][1] == i:
+                runs[-1] = (runs[-1][0], i + 1)
+            else:
+                runs.append((i, i + 1))
+        return runs
+
+    def update_where(self, path: str, key: Where, changes: Mapping[str, object]) -> int:
+        """Logs one record per run of consecutive changed rows."""
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            state = self._state(path, writer=True)
+            if state is None:
+                return 0
+            positions = self._matching(path, state, key)
+            for start, stop in self._runs(positions):
+                changed = []
+                for row in state.rows[start:stop]:
+                    row = dict(row)
+                    row.update((k, self._to_text(v)) for k, v in changes.items() if k in row)
+                    changed.append(row)
+                self._log(path, state, start, stop, changed)
+            return len(positions)
+
+    def delete_where(self, path: str, where: Where) -> int:
+        """Logs one empty splice per run of consecutive deleted rows, last run first."""
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            state = self._state(path, writer=True)
+            if state is None:
+                return 0
+            positions = self._matching(path, state, where)
+            for start, stop in reversed(self._runs(positions)):
+                self._log(path, state, start, stop, [])
+            return len(positions)
+
+    def append_row(self, path: str, fieldnames: List[str], row: Dict):
+        lock = self._get_lock(path)
+        with lock.exclusive():
+            state = self._state(path, writer=True)
+            if state is None or state.fieldnames != list(fieldnames):
+                self.base.append_row(path, fieldnames, row)
+                self._states.pop(os.path.abspath(path), None)
+                return
+            end = len(state.rows)
+            self._log(path, state, end, end, [self._normalize(fieldnames, row)])
+
+
+class _StaleState(Exception):
+    """Raised when the journal shrank underneath a cached state and it must be rebuilt."""
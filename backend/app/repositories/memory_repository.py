@@ -0,0 +1,201 @@
+import atexit
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+from app.repositories import compact_rows
+from app.repositories.base_repository import BaseRepository, Where
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.rwlock import RWLock
+from app.repositories.secondary_index import IndexSet
+
+# Write tables that changed back to their CSV files when the process shuts down.
+SNAPSHOT_ON_SHUTDOWN = os.getenv("MEMORY_SNAPSHOT", "0") == "1"
+
+
+class _MemoryTable:
+    """One table held in memory, with the CSV repository it was seeded from and is snapshotted to."""
+    __slots__ = ("fieldnames", "rows", "indexes", "seed", "dirty", "lock")
+
+    def __init__(self, fieldnames: List[str], rows: List[Dict], seed: CSVRepository):
+        self.fieldnames = fieldnames
+        self.rows = rows
+        self.indexes = IndexSet()
+        self.seed = seed
+        self.dirty = False
+        self.lock = RWLock()
+
+
+class InMemoryRepository(BaseRepository):
+    """Repository that keeps every table in process memory, seeded from its CSV file on first use."""
+    _tables: Dict[str, _MemoryTable] = {}
+    _tables_guard = threading.Lock()
+    compact_tables = compact_rows.COMPACT_ROWS
+
+    def __init__(self, seed: Optional[CSVRepository] = None):
+        self.seed = seed or CSVRepository()
+
+    # -----------------------------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------------------------
+
+    def _table(self, path) -> _MemoryTable:
+        key = os.path.abspath(path)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        # Seeded without the guard, so loading one table does not hold up the others;
+        # if two threads seed the same table, the first one stored wins.
+        table = self._seeded(path)
+        with self._tables_guard:
+            return self._tables.setdefault(key, table)
+
+    def _seeded(self, path) -> _MemoryTable:
+        try:
+            with self.seed._get_lock(path).shared():
+                loaded = self.seed._load(path)
+        except FileNotFoundError:
+            return _MemoryTable([], [], self.seed)
+        # This table is the copy from now on; the seed need not keep its own.
+        self.seed._cache.pop(self.seed._cache_key(path), None)
+        fieldnames = list(loaded.fieldnames or [])
+        # The seed's cached dicts may still be handed out; compact records are immutable and can be shared.
+        rows = loaded.rows if self.compact_tables or self.seed.compact_tables else [dict(r) for r in loaded.rows]
+        return _MemoryTable(fieldnames, self._resident(fieldnames, rows), self.seed)
+
+    def _matching(self, path, table: _MemoryTable, where: Where) -> List[int]:
+        positions = None
+        if where is not None and not callable(where):
+            positions = table.indexes.positions(self._indexes_for(path), table.rows, where)
+        candidates = range(len(table.rows)) if positions is None else list(positions)
+        match = self._matcher(where)
+        return [i for i in candidates if match(table.rows[i])]
+
+    def _resident(self, fieldnames: List[str], rows: List[Dict]) -> List[Dict]:
+        """Rows as this backend keeps them: Row records in compact mode, else the dicts themselves."""
+        if self.compact_tables or self.seed.compact_tables:
+            return compact_rows.compact(fieldnames, rows, self.seed.derived_columns)
+        return list(rows)
+
+    def _replace(self, table: _MemoryTable, fieldnames: List[str], rows: List[Dict]):
+        """Swap in a new row list; readers iterating the old one are not affected."""
+        table.fieldnames = list(fieldnames)
+        table.rows = self._resident(table.fieldnames, rows)
+        table.indexes = IndexSet()
+        table.dirty = True
+
+    # -----------------------------------------------------------------------
+    # BaseRepository
+    # -----------------------------------------------------------------------
+
+    def read_all(self, path: str) -> List[Dict]:
+        table = self._table(path)
+        with table.lock.read():
+            return [dict(r) for r in table.rows]
+
+    def iter_rows(self, path: str, where: Where = None, columns: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        for row in self._scan(path, where):
+            yield self._project(row, columns)
+
+    def iter_records(self, path: str, where: Where = None) -> Iterator[Mapping[str, str]]:
+        return self._scan(path, where)
+
+    def _scan(self, path, where: Where) -> Iterator[Dict]:
+        table = self._table(path)
+        with table.lock.read():
+            # Appends only add to the end, updates replace single rows and other writes
+            # swap the list, as in CSVRepository.
+            rows, count = table.rows, len(table.rows)
+            positions = None
+            if where is not None and not callable(where):
+                positions = table.indexes.positions(self._indexes_for(path), rows, where)
+        match = self._matcher(where)
+        for i in (range(count) if positions is None else positions):
+            if i >= count:
+                break
+            row = rows[i]
+            if match(row):
+                yield row
+
+    def write_all(self, path: str, fieldnames: List[str], rows: List[Dict]):
+        CSVRepository._check_fields(fieldnames, rows)
+        table = self._table(path)
+        with table.lock.write():
+            self._replace(table, fieldnames, [self._normalize(fieldnames, r) for r in rows])
+
+    def append_row(self, path: str, fieldnames: List[str], row: Dict):
+        CSVRepository._check_fields(fieldnames, [row])
+        table = self._table(path)
+        with table.lock.write():
+            row = self._normalize(fieldnames, row)
+            if not table.fieldnames:
+                self._replace(table, fieldnames, [row])
+                return
+            if table.fieldnames != list(fieldnames):
+                # The file would keep its old header, so the values are read back under it.
+                row = CSVRepository._row_from(table.fieldnames, [row[f] for f in fieldnames])
+            start = len(table.rows)
+            table.rows.extend(self._resident(table.fieldnames, [row]))
+            table.indexes.extend(table.rows, start)
+            table.dirty = True
+
+    def update_where(self, path: str, key: Where, changes: Mapping[str, object]) -> int:
+        table = self._table(path)
+        with table.lock.write():
+            positions = self._matching(path, table, key)
+            if not positions:
+                return 0
+            for i in positions:
+                row = dict(table.rows[i])
+                row.update((k, self._to_text(v)) for k, v in changes.items() if k in row)
+                table.rows[i] = self._resident(table.fieldnames, [row])[0]
+            if any(set(changes) & set(k) for k in self._indexes_for(path)):
+                table.indexes = IndexSet()
+            table.dirty = True
+            return len(positions)
+
+    def delete_where(self, path: str, where: Where) -> int:
+        table = self._table(path)
+        with table.lock.write():
+            positions = set(self._matching(path, table, where))
+            if positions:
+                self._replace(table, table.fieldnames, [r for i, r in enumerate(table.rows) if i not in positions])
+            return len(positions)
+
+    # -----------------------------------------------------------------------
+    # Snapshots
+    # -----------------------------------------------------------------------
+
+    @classmethod
+    def snapshot(cls, path=None) -> List[str]:
+        """Write changed tables (or just ``path``) back to their CSV files and return the paths written."""
+        with cls._tables_guard:
+            if path is None:
+                tables = list(cls._tables.items())
+            else:
+                key = os.path.abspath(path)
+                tables = [(key, cls._tables[key])] if key in cls._tables else []
+        written = []
+        for key, table in tables:
+            with table.lock.write():
+                if not table.dirty:
+                    continue
+                fieldnames, rows = table.fieldnames, table.rows[:]
+                table.dirty = False
+            table.seed.write_all(key, fieldnames, rows)
+            written.append(key)
+        return written
+
+    @classmethod
+    def discard(cls):
+        """Forget every table, so the next use seeds it from disk again."""
+        with cls._tables_guard:
+            cls._tables.clear()
+
+
+def snapshot_on_shutdown():
+    """Snapshot changed tables if ``MEMORY_SNAPSHOT=1``; called from the app's shutdown and at exit."""
+    if SNAPSHOT_ON_SHUTDOWN:
+        InMemoryRepository.snapshot()
+
+
+atexit.register(snapshot_on_shutdown)
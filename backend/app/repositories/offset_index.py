@@ -0,0 +1,214 @@
+import csv
+import mmap
+import os
+from typing import List, Dict, Optional, Tuple
+from app.repositories.bulk_loader import quotes_are_structural
+from app.repositories.durability import atomic_write
+
+
+class OffsetIndex:
+    """Maps the value of one key column to the byte offset and length of its row, kept as ``<path>.idx``."""
+
+    def __init__(self, path: str, key_column: str, encoding: str, delimiter: str):
+        self.path = path
+        self.key_column = key_column
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.signature: Optional[Tuple] = None
+        self.fieldnames: List[str] = []
+        self.entries: Dict[str, Tuple[int, int]] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._map_signature: Optional[Tuple] = None
+
+    @property
+    def sidecar(self) -> str:
+        return f"{self.path}.idx"
+
+    @staticmethod
+    def signature_of(path: str) -> Tuple:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    # -----------------------------------------------------------------------
+    # Building
+    # -----------------------------------------------------------------------
+
+    def _parse(self, raw: bytes) -> List[str]:
+        return next(csv.reader([raw.decode(self.encoding)], delimiter=self.delimiter), [])
+
+    def _key_of(self, raw: bytes, position: int) -> Optional[str]:
+        """Extract the key field from one raw record, without parsing the rest of it when the key comes first."""
+        if position == 0:
+            delimiter = self.delimiter.encode(self.encoding)
+            if raw[:1] == b'"':
+                close = raw.find(b'"', 1)
+                if close != -1 and raw[close + 1:close + 2] in (delimiter, b"\r", b"\n", b""):
+                    return raw[1:close].decode(self.encoding)
+            else:
+                end = raw.find(delimiter)
+                if end != -1:
+                    return raw[:end].decode(self.encoding)
+        fields = self._parse(raw)
+        return fields[position] if len(fields) > position else None
+
+    @staticmethod
+    def records(data, start: int = 0, encoding: str = "utf-8", delimiter: str = ","):
+        """Yield (offset, end) for each record in ``data``, keeping quoted newlines inside their record."""
+        if not quotes_are_structural(data, start, delimiter.encode(encoding)):
+            yield from OffsetIndex._parsed_records(data, start, encoding, delimiter)
+            return
+        size = len(data)
+        pos = start
+        while pos < size:
+            end = data.find(b"\n", pos)
+            end = size if end == -1 else end + 1
+            while data.count(b'"', pos, end) % 2 and end < size:
+                nxt = data.find(b"\n", end)
+                end = size if nxt == -1 else nxt + 1
+            yield pos, end
+            pos = end
+
+    @staticmethod
+    def _parsed_records(data, start: int, encoding: str, delimiter: str):
+        """Like ``records``, but with the boundaries ``csv.reader`` finds, for quotes counting cannot place."""
+        consumed = [start]
+
+        def lines():
+            pos, size = start, len(data)
+            while pos < size:
+                end = data.find(b"\n", pos)
+                end = size if end == -1 else end + 1
+                consumed[0] = end
+                yield data[pos:end].decode(encoding)
+                pos = end
+
+        # The reader pulls lines only until a record is complete, so ``consumed`` is where it ends.
+        pos = start
+        for _ in csv.reader(lines(), delimiter=delimiter):
+            yield pos, consumed[0]
+            pos = consumed[0]
+
+    def build(self):
+        """Scan the whole CSV and rewrite the sidecar."""
+        with open(self.path, "rb") as f:
+            signature = self.signature_of(self.path)
+            data = f.read()
+
+        entries: Dict[str, Tuple[int, int]] = {}
+        fieldnames: List[str] = []
+        records = self.records(data, 0, self.encoding, self.delimiter)
+        for pos, end in records:
+            fieldnames = self._parse(data[pos:end])
+            break
+        if self.key_column in fieldnames:
+            position = fieldnames.index(self.key_column)
+            for pos, end in records:
+                key = self._key_of(data[pos:end], position)
+                if key and key not in entries:
+                    entries[key] = (pos, end - pos)
+
+        self.reset(fieldnames, entries, signature)
+
+    def reset(self, fieldnames: List[str], entries: Dict[str, Tuple[int, int]], signature: Tuple):
+        """Replace the whole index, e.g. after the CSV was rewritten, and persist it."""
+        self.fieldnames = fieldnames
+        self.entries = entries
+        self.signature = signature
+        lines = ["#" + self.delimiter.join(fieldnames)]
+        lines.extend(f"{k}\t{o}\t{n}" for k, (o, n) in entries.items() if self._storable(k))
+        lines.append(f"#{signature[0]} {signature[1]}")
+        try:
+            atomic_write(self.sidecar, "\n".join(lines) + "\n", "utf-8")
+        except OSError:
+            pass
+
+    def add(self, entries: List[Tuple[str, int, int]], signature: Tuple):
+        """Record rows appended at the given ``(key, offset, length)`` without rescanning the file."""
+        self.signature = signature
+        lines = []
+        for key, offset, length in entries:
+            if key and key not in self.entries:
+                self.entries[key] = (offset, length)
+                if self._storable(key):
+                    lines.append(f"{key}\t{offset}\t{length}")
+        lines.append(f"#{signature[0]} {signature[1]}")
+        try:
+            with open(self.sidecar, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError:
+            pass
+
+    @staticmethod
+    def _storable(key: str) -> bool:
+        return "\t" not in key and "\n" not in key and "\r" not in key and not key.startswith("#")
+
+    def load(self, signature: Tuple) -> bool:
+        """Load the sidecar if it describes the CSV as it is now."""
+        try:
+            with open(self.sidecar, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return False
+        if len(lines) < 2 or not lines[0].startswith("#") or lines[-1] != f"#{signature[0]} {signature[1]}":
+            return False
+
+        entries = {}
+        for line in lines[1:]:
+            if line.startswith("#"):
+                continue
+            key, offset, length = line.split("\t")
+            entries.setdefault(key, (int(offset), int(length)))
+        self.fieldnames = lines[0][1:].split(self.delimiter) if lines[0] != "#" else []
+        self.entries = entries
+        self.signature = signature
+        return True
+
+    def ensure_current(self) -> bool:
+        """Make sure the index matches the file on disk. Returns False if the CSV does not exist."""
+        try:
+            signature = self.signature_of(self.path)
+        except FileNotFoundError:
+            return False
+        if signature != self.signature and not self.load(signature):
+            self.build()
+        return True
+
+    # -----------------------------------------------------------------------
+    # Lookup
+    # -----------------------------------------------------------------------
+
+    def mapped(self) -> Optional[mmap.mmap]:
+        """The CSV mapped into memory as the index describes it, or None if it is empty."""
+        if self._map is not None and self._map_signature == self.signature:
+            return self._map
+        self.close()
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map_signature = self.signature
+        return self._map
+
+    def get(self, key: str, data: Optional[mmap.mmap] = None) -> Optional[Dict]:
+        """Return the row for ``key`` as csv.DictReader would, or None; ``data`` defaults to ``mapped()``."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if data is None:
+            data = self.mapped()
+        if data is None:
+            return None
+        offset, length = entry
+        fields = self._parse(data[offset:offset + length])
+        row = dict(zip(self.fieldnames, fields))
+        if len(fields) > len(self.fieldnames):
+            row[None] = fields[len(self.fieldnames):]
+        for name in self.fieldnames[len(fields):]:
+            row[name] = None
+        return row
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._map_signature = None
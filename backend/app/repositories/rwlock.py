@@ -0,0 +1,68 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class RWLock:
+    """Writer-preferring, non-reentrant reader-writer lock for threads in one process."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self, blocking: bool = True) -> bool:
+        with self._cond:
+            if self._writer or self._writers_waiting:
+                if not blocking:
+                    return False
+                while self._writer or self._writers_waiting:
+                    self._cond.wait()
+            self._readers += 1
+            return True
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self, blocking: bool = True) -> bool:
+        with self._cond:
+            if self._writer or self._readers:
+                if not blocking:
+                    return False
+                self._writers_waiting += 1
+                try:
+                    while self._writer or self._readers:
+                        self._cond.wait()
+                except BaseException:
+                    # Readers queued behind this writer must not wait for it any longer.
+                    self._cond.notify_all()
+                    raise
+                finally:
+                    self._writers_waiting -= 1
+            self._writer = True
+            return True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,41 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+IndexKey = Tuple[str, ...]
+IndexSpec = Union[str, Iterable[str]]
+
+
+def index_key(spec: IndexSpec) -> IndexKey:
+    """``"ISBN"`` -> ``("ISBN",)``; ``("UserID", "ISBN")`` stays a tuple."""
+    return (spec,) if isinstance(spec, str) else tuple(spec)
+
+
+class IndexSet:
+    """Hash indexes over one in-memory table, from key values to ascending row positions."""
+    __slots__ = ("_indexes",)
+
+    def __init__(self):
+        self._indexes: Dict[IndexKey, Dict[Tuple, List[int]]] = {}
+
+    @staticmethod
+    def _build(key: IndexKey, rows: List[Dict]) -> Dict[Tuple, List[int]]:
+        index: Dict[Tuple, List[int]] = {}
+        for i, row in enumerate(rows):
+            index.setdefault(tuple(row.get(c) for c in key), []).append(i)
+        return index
+
+    def positions(self, declared: Set[IndexKey], rows: List[Dict], where: Mapping[str, str]) -> Optional[List[int]]:
+        """Positions of the rows that can match ``where``, or None if no declared index covers it."""
+        usable = [key for key in declared if all(c in where for c in key)]
+        if not usable:
+            return None
+        key = max(usable, key=len)
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = self._build(key, rows)
+        return index.get(tuple(where[c] for c in key), [])
+
+    def extend(self, rows: List[Dict], start: int):
+        """Index ``rows[start:]``, which were just appended."""
+        for key, index in self._indexes.items():
+            for i in range(start, len(rows)):
+                index.setdefault(tuple(rows[i].get(c) for c in key), []).append(i)
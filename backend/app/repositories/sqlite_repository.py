@@ -0,0 +1,254 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Dict, Mapping, Optional, Tuple
+from app.repositories.base_repository import BaseRepository, Where
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+DB_PATH = os.getenv("SQLITE_PATH", str(DATA_DIR / "app.db"))
+
+# Columns that services look rows up by. Any table that has one of these gets an index on it.
+INDEXED_COLUMNS = ["ISBN", "UserID", "id", "username", "ListID", "RequestID", "ReviewID"]
+COMPOSITE_INDEXES = [("UserID", "ISBN")]
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLiteRepository(BaseRepository):
+    """SQLite implementation of the repository interface, one table per CSV file stem."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+
+    # -----------------------------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _table(path) -> str:
+        return re.sub(r"\W", "_", Path(path).stem)
+
+    def _columns(self, conn: sqlite3.Connection, table: str) -> Optional[List[str]]:
+        rows = conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+        if not rows:
+            return None
+        return [r[1] for r in sorted(rows, key=lambda r: r[0])]
+
+    def _create(self, conn: sqlite3.Connection, table: str, fieldnames: List[str], path):
+        columns = ", ".join(f"{_quote(f)} TEXT" for f in fieldnames)
+        conn.execute(f"CREATE TABLE {_quote(table)} ({columns})")
+        keys = [(c,) for c in INDEXED_COLUMNS] + COMPOSITE_INDEXES + sorted(self._indexes_for(path))
+        self._create_indexes(conn, table, fieldnames, keys)
+
+    def _create_indexes(self, conn: sqlite3.Connection, table: str, fieldnames: List[str], keys):
+        for key in keys:
+            if all(c in fieldnames for c in key):
+                name = "ix_" + "_".join((table,) + tuple(key))
+                cols = ", ".join(_quote(c) for c in key)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} ({cols})")
+
+    def _insert(self, conn: sqlite3.Connection, table: str, fieldnames: List[str], rows: List[Dict]):
+        cols = ", ".join(_quote(f) for f in fieldnames)
+        marks = ", ".join("?" for _ in fieldnames)
+        conn.executemany(
+            f"INSERT INTO {_quote(table)} ({cols}) VALUES ({marks})",
+            ([self._to_text(r.get(f, "")) for f in fieldnames] for r in rows),
+        )
+
+    # -----------------------------------------------------------------------
+    # BaseRepository
+    # -----------------------------------------------------------------------
+
+    def declare_indexes(self, path: str, keys):
+        super().declare_indexes(path, keys)
+        conn = self._connect()
+        table = self._table(path)
+        columns = self._columns(conn, table)
+        if columns is not None:
+            self._create_indexes(conn, table, columns, self._indexes_for(path))
+
+    def read_all(self, path: str) -> List[Dict]:
+        conn = self._connect()
+        table = self._table(path)
+        columns = self._columns(conn, table)
+        if columns is None:
+            return []
+        cursor = conn.execute(f"SELECT * FROM {_quote(table)} ORDER BY rowid")
+        return [dict(zip(columns, values)) for values in cursor]
+
+    def iter_rows(self, path: str, where: Where = None, columns: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        conn = self._connect()
+        table = self._table(path)
+        table_columns = self._columns(conn, table)
+        if table_columns is None:
+            return
+        if callable(where):
+            for row in self.read_all(path):
+                if where(row):
+                    yield self._project(row, columns)
+            return
+
+        condition = self._condition(table_columns, where)
+        if condition is None:
+            return
+        clause, params = condition
+        wanted = list(columns) if columns is not None else table_columns
+        selected = [c for c in wanted if c in table_columns] or ["rowid"]
+        sql = f"SELECT {', '.join(_quote(c) for c in selected)} FROM {_quote(table)}{clause} ORDER BY rowid"
+
+        for values in conn.execute(sql, params):
+            found = dict(zip(selected, values))
+            yield {c: found.get(c) for c in wanted}
+
+    @staticmethod
+    def _condition(table_columns: List[str], where: Mapping[str, str]) -> Optional[Tuple[str, List]]:
+        """Turn an equality filter into a WHERE clause, or None if it names a column the table lacks."""
+        clauses, params = [], []
+        for column, value in (where or {}).items():
+            if column not in table_columns:
+                return None
+            clauses.append(f"{_quote(column)} = ?")
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _rowid_condition(self, conn: sqlite3.Connection, table: str, table_columns: List[str], where: Where):
+        """Like ``_condition``, but a callable filter is evaluated here and becomes a rowid list."""
+        if not callable(where):
+            return self._condition(table_columns, where)
+        cursor = conn.execute(f"SELECT rowid, * FROM {_quote(table)} ORDER BY rowid")
+        rowids = [values[0] for values in cursor if where(dict(zip(table_columns, values[1:])))]
+        if not rowids:
+            return None
+        return f" WHERE rowid IN ({', '.join('?' for _ in rowids)})", rowids
+
+    def update_where(self, path: str, key: Where, changes: Mapping[str, object]) -> int:
+        conn = self._connect()
+        table = self._table(path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            table_columns = self._columns(conn, table)
+            condition = None if table_columns is None else self._rowid_condition(conn, table, table_columns, key)
+            if condition is None:
+                conn.execute("COMMIT")
+                return 0
+            clause, params = condition
+            sets = [(c, self._to_text(v)) for c, v in changes.items() if c in table_columns]
+            if sets:
+                assignments = ", ".join(f"{_quote(c)} = ?" for c, _ in sets)
+                cursor = conn.execute(
+                    f"UPDATE {_quote(table)} SET {assignments}{clause}", [v for _, v in sets] + params
+                )
+                count = cursor.rowcount
+            else:
+                count = conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}{clause}", params).fetchone()[0]
+            conn.execute("COMMIT")
+            return count
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete_where(self, path: str, where: Where) -> int:
+        conn = self._connect()
+        table = self._table(path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            table_columns = self._columns(conn, table)
+            condition = None if table_columns is None else self._rowid_condition(conn, table, table_columns, where)
+            if condition is None:
+                conn.execute("COMMIT")
+                return 0
+            clause, params = condition
+            count = conn.execute(f"DELETE FROM {_quote(table)}{clause}", params).rowcount
+            conn.execute("COMMIT")
+            return count
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def write_all(self, path: str, fieldnames: List[str], rows: List[Dict]):
+        conn = self._connect()
+        table = self._table(path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = self._columns(conn, table)
+            if columns != list(fieldnames):
+                if columns is not None:
+                    conn.execute(f"DROP TABLE {_quote(table)}")
+                self._create(conn, table, fieldnames, path)
+            else:
+                conn.execute(f"DELETE FROM {_quote(table)}")
+            self._insert(conn, table, fieldnames, rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def append_row(self, path: str, fieldnames: List[str], row: Dict):
+        conn = self._connect()
+        table = self._table(path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = self._columns(conn, table)
+            if columns is None:
+                self._create(conn, table, fieldnames, path)
+            else:
+                for f in fieldnames:
+                    if f not in columns:
+                        conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(f)} TEXT DEFAULT ''")
+            self._insert(conn, table, fieldnames, [row])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+# ---------------------------------------------------------------------------
+# One-shot migration from the CSV data directory
+# ---------------------------------------------------------------------------
+
+def import_csv_directory(data_dir: str = str(DATA_DIR), db_path: str = DB_PATH) -> Dict[str, int]:
+    """Copy every CSV file in ``data_dir`` into the SQLite database and return the rows imported per table."""
+    from app.repositories.books_adapter import BXBooksCSVAdapter
+    from app.repositories.csv_repository import CSVRepository
+
+    target = SQLiteRepository(db_path)
+    imported = {}
+    for path in sorted(Path(data_dir).glob("*.csv")):
+        source = BXBooksCSVAdapter() if path.name == "BX_Books.csv" else CSVRepository()
+        source.bulk_load = True
+        with source._get_lock(str(path)).shared():
+            table = source._load(str(path))
+        if not table.fieldnames:
+            continue
+        target.write_all(str(path), table.fieldnames, table.rows)
+        imported[target._table(path)] = len(table.rows)
+    return imported
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Import the CSV data directory into SQLite.")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="directory holding the CSV files")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database to create or update")
+    args = parser.parse_args(argv)
+
+    for table, count in import_csv_directory(args.data_dir, args.db).items():
+        print(f"{table}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
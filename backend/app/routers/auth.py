@@ -4,6 +4,8 @@ from pydantic import BaseModel, EmailStr
 from typing import List
 
 from app.services.user_service import CSVUserService
+from app.services.async_service import AsyncService
+from app.repositories.async_repository import run_io
 from app.deps import get_user_service, pwd_context, create_access_token, get_current_user
 from app.schemas.user import UserCreate, UserOut, Token, UserUpdate
 
@@ -29,12 +31,12 @@ class UserOut(BaseModel):
     response_model=UserOut,
     status_code=status.HTTP_201_CREATED,
 )
-def register(payload: UserCreateRequest, svc: CSVUserService = Depends(get_user_service)):
+async def register(payload: UserCreateRequest, svc: CSVUserService = Depends(get_user_service)):
     try:
-        user = svc.create_user(
+        user = await AsyncService(svc).create_user(
             username=payload.username,
             email=payload.email,
-            password_hash=pwd_context.hash(payload.password),
+            password_hash=await run_io(pwd_context.hash, payload.password),
             is_admin=False,
         )
         return UserOut(
@@ -54,9 +56,9 @@ def register(payload: UserCreateRequest, svc: CSVUserService = Depends(get_user_
 
 
 @router.post("/token")
-def login(form: OAuth2PasswordRequestForm = Depends(), svc: CSVUserService = Depends(get_user_service)):
-    user = svc.get_by_username(form.username)
-    if not user or not pwd_context.verify(form.password, user["password_hash"]):
+async def login(form: OAuth2PasswordRequestForm = Depends(), svc: CSVUserService = Depends(get_user_service)):
+    user = await AsyncService(svc).get_by_username(form.username)
+    if not user or not await run_io(pwd_context.verify, form.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="invalid_credentials",
@@ -79,7 +81,7 @@ def login(form: OAuth2PasswordRequestForm = Depends(), svc: CSVUserService = Dep
 
 
 @router.get("/me", response_model=UserOut)
-def me(curr=Depends(get_current_user)):
+async def me(curr=Depends(get_current_user)):
     return UserOut(
         id=curr["id"],
         username=curr["username"],
@@ -89,7 +91,7 @@ def me(curr=Depends(get_current_user)):
 
 
 @router.get("/users", response_model=List[UserOut])
-def list_users(
+async def list_users(
     curr=Depends(get_current_user),
     svc: CSVUserService = Depends(get_user_service),
 ):
@@ -99,7 +101,7 @@ def list_users(
             detail="Admin privileges required",
         )
 
-    rows = svc.repo.read_all(svc.path)
+    rows = await run_io(svc.repo.read_all, svc.path)
     users_out = []
 
     for row in rows:
@@ -119,7 +121,7 @@ def list_users(
     return users_out
 
 @router.post("/suspend/{user_id}")
-def suspend_user_route(
+async def suspend_user_route(
     user_id: int,
     duration_minutes: int,
     curr=Depends(get_current_user),
@@ -129,7 +131,7 @@ def suspend_user_route(
         raise HTTPException(403, "Admin privileges required")
 
     try:
-        suspended_user = svc.suspend_user(
+        suspended_user = await AsyncService(svc).suspend_user(
             admin_id=curr["id"],
             target_id=user_id,
             duration_minutes=duration_minutes,
@@ -142,7 +144,7 @@ def suspend_user_route(
         raise HTTPException(404, "User not found")
 
 @router.post("/unsuspend/{user_id}")
-def unsuspend_user_route(
+async def unsuspend_user_route(
     user_id: int,
     curr=Depends(get_current_user),
     svc: CSVUserService = Depends(get_user_service),
@@ -152,7 +154,7 @@ def unsuspend_user_route(
         raise HTTPException(403, "Admin privileges required")
 
     try:
-        svc.unsuspend_user(curr["id"], user_id)
+        await AsyncService(svc).unsuspend_user(curr["id"], user_id)
         return {"message": f"User {user_id} is no longer suspended."}
 
     except ValueError:
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from app.repositories.file_lock import lock_metrics
+from app.utils.search import search_cache_metrics
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/locks")
+async def get_lock_metrics():
+    """Lock acquisitions and wait times per data file, for this worker process."""
+    return lock_metrics()
+
+
+@router.get("/search-cache")
+async def get_search_cache_metrics():
+    """Search result cache hits, misses and evictions, for this worker process."""
+    return search_cache_metrics()
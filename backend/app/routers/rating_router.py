@@ -1,37 +1,39 @@
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.rating import RatingCreate, RatingRead, AvgRatingRead
 from app.services.rating_service import RatingService
+from app.services.async_service import AsyncService
 
 router = APIRouter(prefix = "/ratings", tags = ["Ratings"])
 service = RatingService()
+aservice = AsyncService(service)
 
 
 @router.post("/books/{isbn}", response_model=RatingRead)
-def add_rating(isbn: str, payload: RatingCreate, user_id: int):
-    return service.create_rating(user_id, isbn, payload.rating)
+async def add_rating(isbn: str, payload: RatingCreate, user_id: int):
+    return await aservice.create_rating(user_id, isbn, payload.rating)
 
 @router.get("/", response_model = list[RatingRead])
-def get_all_ratings():
-    return service.get_all_ratings()
+async def get_all_ratings():
+    return await aservice.get_all_ratings()
 
 
 @router.get("/books/{isbn}", response_model = list[RatingRead])
-def get_ratings_by_isbn(isbn: str):
-    return service.get_ratings_by_isbn(isbn)
+async def get_ratings_by_isbn(isbn: str):
+    return await aservice.get_ratings_by_isbn(isbn)
 
 
 @router.get("/books/{isbn}/average", response_model = AvgRatingRead)
-def get_avg_rating(isbn: str):
-    return service.get_avg_rating(isbn)
+async def get_avg_rating(isbn: str):
+    return await aservice.get_avg_rating(isbn)
 
 
 @router.get("/users/{user_id}/books/{isbn}", response_model = RatingRead | None)
-def get_user_rating(user_id: int, isbn: str):
-    return service.get_user_rating(user_id, isbn)
+async def get_user_rating(user_id: int, isbn: str):
+    return await aservice.get_user_rating(user_id, isbn)
 
 
 @router.delete("/", status_code = 204)
-def delete_rating(user_id: int, isbn: str):
-    ok = service.delete_rating(user_id, isbn)
+async def delete_rating(user_id: int, isbn: str):
+    ok = await aservice.delete_rating(user_id, isbn)
     if not ok:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "Rating not found")
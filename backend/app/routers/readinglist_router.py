@@ -1,38 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.schemas.readinglist import ReadingListCreate, ReadingListRename
 from app.services.readinglist_service import ReadingListService
-from app.repositories.csv_repository import CSVRepository
+from app.services.async_service import AsyncService
+from app.repositories.factory import get_repository
 from app.repositories.book_repository import BookRepository
 
 router = APIRouter(prefix="/readinglist", tags=["ReadingList"])
 
-service = ReadingListService(repo=CSVRepository(), book_repo = BookRepository())
+service = ReadingListService(repo=get_repository("readinglists"), book_repo = BookRepository())
+aservice = AsyncService(service)
 
 @router.post("/")
-def create_list(list: ReadingListCreate, user_id: int):
+async def create_list(list: ReadingListCreate, user_id: int):
     """Creates a new reading list for a user."""
     try:
-        return service.create_list(user_id = user_id, data = list)
+        return await aservice.create_list(user_id = user_id, data = list)
     except ValueError as e:
         raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail = str(e))
 
 @router.delete("/{list_id}")
-def delete_list( list_id: int, user_id: int):
+async def delete_list( list_id: int, user_id: int):
     """Delete a specific readinglist by ID."""
-    if not service.delete_list(list_id = list_id, user_id = user_id):
+    if not await aservice.delete_list(list_id = list_id, user_id = user_id):
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, 
                             detail = "ReadingList not found")
     return {"message": "ReadingList deleted successfully"}
 
 @router.put("/{list_id}")
-def rename_readinglist(
+async def rename_readinglist(
     list_id: int, 
     user_id: int, 
     data: ReadingListRename,
 ):
     """Renames an existing reading list."""
     try:
-        if not service.rename(list_id = list_id, 
+        if not await aservice.rename(list_id = list_id, 
                               user_id = user_id, 
                               new_name = data.new_name):
             raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, 
@@ -42,18 +44,18 @@ def rename_readinglist(
         raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail = str(e))
 
 @router.put("/{list_id}/visibility")
-def toggle_visibility(list_id: int, user_id: int):
+async def toggle_visibility(list_id: int, user_id: int):
     """Toggles a reading list's public/private visibility."""
-    result = service.toggle_visibility(list_id = list_id, user_id = user_id)
+    result = await aservice.toggle_visibility(list_id = list_id, user_id = user_id)
     if result is False:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "ReadingList not found")
     return result
 
 @router.post("/{list_id}/books/{isbn}")
-def add_book_to_readinglist(list_id: int, isbn: str, user_id: int):
+async def add_book_to_readinglist(list_id: int, isbn: str, user_id: int):
     """Adds a book to a reading list."""
     try:
-        result = service.add_book(list_id = list_id, user_id = user_id, isbn = isbn)
+        result = await aservice.add_book(list_id = list_id, user_id = user_id, isbn = isbn)
         if not result:
             raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "ReadingList not found")
         return {"message": "Book added successfully"}
@@ -61,10 +63,10 @@ def add_book_to_readinglist(list_id: int, isbn: str, user_id: int):
         raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail = str(e))
 
 @router.delete("/{list_id}/books/{isbn}")
-def remove_book_from_readinglist(list_id: int, isbn: str, user_id: int):
+async def remove_book_from_readinglist(list_id: int, isbn: str, user_id: int):
     """Removes a book from a reading list."""
     try:
-        result = service.remove_book(list_id = list_id, user_id = user_id, isbn = isbn)
+        result = await aservice.remove_book(list_id = list_id, user_id = user_id, isbn = isbn)
         if not result:
             raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, 
                                 detail = "ReadingList not found")
@@ -73,14 +75,14 @@ def remove_book_from_readinglist(list_id: int, isbn: str, user_id: int):
         raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail = str(e))
 
 @router.get("/public/{user_id}")
-def get_user_public(user_id: int):
+async def get_user_public(user_id: int):
     """Returns all public reading lists for a user."""
-    return service.get_user_public_readinglists(user_id = user_id)
+    return await aservice.get_user_public_readinglists(user_id = user_id)
 
 @router.get("/{list_id}")
-def get_readinglist_detail(list_id: int, user_id: int):
+async def get_readinglist_detail(list_id: int, user_id: int):
     """Returns detailed information about a reading list."""
-    detail = service.get_list_detail(list_id = list_id, user_id = user_id)
+    detail = await aservice.get_list_detail(list_id = list_id, user_id = user_id)
     if not detail:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "ReadingList not found")
     return detail
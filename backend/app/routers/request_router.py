@@ -1,27 +1,29 @@
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.request import RequestCreate
 from app.services.request_service import RequestService
+from app.services.async_service import AsyncService
 
 router = APIRouter(prefix="/requests", tags=["Requests"])
 service = RequestService()
+aservice = AsyncService(service)
 
 @router.post("/")
-def create_request(
+async def create_request(
     request: RequestCreate, user_id: int):
     try:
-        return service.create_request(user_id=user_id, data=request)
+        return await aservice.create_request(user_id=user_id, data=request)
     except ValueError as e:
         raise HTTPException(status = status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/")
-def get_all_requests():
+async def get_all_requests():
     """List all book requests."""
-    return service.get_all_requests()
+    return await aservice.get_all_requests()
 
 @router.delete("/{request_id}")
-def delete_request( request_id: int):
+async def delete_request( request_id: int):
     """Delete a specific request by ID."""
-    if not service.delete_request(request_id=request_id):
+    if not await aservice.delete_request(request_id=request_id):
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail="Request not found")
     return {"message": "Request deleted successfully"}
     
@@ -1,34 +1,36 @@
 from fastapi import APIRouter, HTTPException, status
 from app.schemas.review import ReviewCreate, ReviewRead, ReviewUpdate
 from app.services.review_service import ReviewService
+from app.services.async_service import AsyncService
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 service = ReviewService()
+aservice = AsyncService(service)
 
 
 @router.post("/")
-def create_review(review: ReviewCreate, user_id: int, isbn: str):
+async def create_review(review: ReviewCreate, user_id: int, isbn: str):
     try:
-        return service.create_review(user_id = user_id, data = review, isbn = isbn)
+        return await aservice.create_review(user_id = user_id, data = review, isbn = isbn)
     except ValueError as e:
         raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/{isbn}")
-def get_all_reviews(isbn: str):
-    return service.get_all_reviews(isbn = isbn)
+async def get_all_reviews(isbn: str):
+    return await aservice.get_all_reviews(isbn = isbn)
 
 
 @router.put("/{review_id}")
-def edit_review(review_id: int, review: ReviewUpdate):
+async def edit_review(review_id: int, review: ReviewUpdate):
     try:
-        return service.edit_review(review_id = review_id, data = review)
+        return await aservice.edit_review(review_id = review_id, data = review)
     except ValueError as e:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = str(e))
 
 
 @router.delete("/{review_id}")
-def delete_review(review_id: int):
-    if not service.delete_review(review_id = review_id):
+async def delete_review(review_id: int):
+    if not await aservice.delete_review(review_id = review_id):
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "Review not found")
     return {"message": "Review deleted successfully"}
@@ -0,0 +1,20 @@
+import functools
+from app.repositories.async_repository import run_io
+
+
+class AsyncService:
+    """Awaitable view of a service, for ``async def`` routes."""
+
+    def __init__(self, service):
+        self._service = service
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await run_io(attr, *args, **kwargs)
+
+        return call
@@ -1,12 +1,14 @@
 from pathlib import Path
 from app.models.book import Book
 from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.factory import get_repository
 from app.schemas.book import BookCreate, BookRead, BookUpdate
+from app.utils.catalog_events import CREATED, DELETED, UPDATED, writing
 
 class BookService:
     def __init__(self):
         """Initialize the service with a CSV repository and define the CSV path and fields."""
-        self.repo = BXBooksCSVAdapter()
+        self.repo = get_repository("books", BXBooksCSVAdapter)
         self.path = str(Path(__file__).resolve().parents[1] / "data" / "BX_Books.csv")
         self.fields = ["ISBN", 
                        "Book-Title",
@@ -17,24 +19,30 @@ class BookService:
                        "Image-URL-M", 
                        "Image-URL-L"
                     ]
+        self.repo.declare_indexes(self.path, ["ISBN"])
         
 
+    def __snapshot(self):
+        """Return the columnar catalog snapshot if the books are kept in the CSV file and it has a current one, else None."""
+        if not isinstance(self.repo, BXBooksCSVAdapter):
+            return None
+        return self.repo.snapshot(self.path)
+
     def __book_exists(self, isbn: str) -> bool:
         """Check if a book with the given ISBN exists in the CSV database."""
-        rows = self.repo.read_all(self.path)
-        return any(r["ISBN"] == isbn for r in rows)
+        return self.__load_book_or_none(isbn) is not None
 
     def __load_book_or_none(self, isbn: str):
         """Load a book by ISBN from the CSV, or return None if it does not exist."""
-        rows = self.repo.read_all(self.path)
-        for row in rows:
-            if row["ISBN"] == isbn:
-                return row
-        return None
+        snapshot = self.__snapshot()
+        if snapshot is not None:
+            return snapshot.get(isbn)
+        return self.repo.read_one(self.path, "ISBN", isbn)
     
     def get_all_books(self) -> list[BookRead]:
         """Retrieve all books from the CSV as a list of BookRead objects."""
-        rows = self.repo.read_all(self.path)
+        snapshot = self.__snapshot()
+        rows = snapshot.rows() if snapshot is not None else self.repo.iter_records(self.path)
         return [
             BookRead(**Book.from_dict(r).to_api_dict())
             for r in rows
@@ -63,13 +71,15 @@ class BookService:
             image_url_l = data.image_url_l
         )
 
-        self.repo.append_row(self.path, self.fields, book.to_csv_dict())
+        row = book.to_csv_dict()
+        with writing(self.path) as write:
+            self.repo.append_row(self.path, self.fields, row)
+            write.publish(CREATED, book.isbn, row)
 
         return BookRead(**book.to_api_dict())
 
     def update_book(self, isbn: str, data: BookUpdate):
         """Update an existing book's details. Returns None if the book is not found."""
-        rows = self.repo.read_all(self.path)
         update_data = data.model_dump(exclude_unset = True)
 
         FIELD_MAP = {
@@ -82,29 +92,19 @@ class BookService:
             "image_url_l": "Image-URL-L"
         }
 
-        updated = False
-        for r in rows:
-            if r["ISBN"] == isbn:
-                for key, csv_key in FIELD_MAP.items():
-                    if key in update_data:
-                        r[csv_key] = update_data[key]
-                updated = True
-                break
-
-        if not updated:
-            return None
+        changes = {csv_key: update_data[key] for key, csv_key in FIELD_MAP.items() if key in update_data}
+        with writing(self.path) as write:
+            if not self.repo.update_where(self.path, {"ISBN": isbn}, changes):
+                return None
+            write.publish(UPDATED, isbn, changes)
 
-        self.repo.write_all(self.path, self.fields, rows)
         row = self.__load_book_or_none(isbn)
         return BookRead(**Book.from_dict(row).to_api_dict())
 
     def delete_book(self, isbn: str) -> bool:
         """Delete a book by ISBN. Returns True if deleted, False if not found."""
-        rows = self.repo.read_all(self.path)
-        new_rows = [r for r in rows if r["ISBN"] != isbn]
-
-        if len(new_rows) == len(rows):
-            return False  
-
-        self.repo.write_all(self.path, self.fields, new_rows)
+        with writing(self.path) as write:
+            if self.repo.delete_where(self.path, {"ISBN": isbn}) == 0:
+                return False
+            write.publish(DELETED, isbn)
         return True
@@ -1,28 +1,42 @@
+import threading
+from collections import Counter
 from pathlib import Path
 from statistics import mean
 from app.models.rating import Rating
-from app.repositories.csv_repository import CSVRepository
+from app.repositories.factory import get_repository
 from app.schemas.rating import RatingRead, AvgRatingRead
 
+_version = 0
+_version_guard = threading.Lock()
+
+
+def ratings_version() -> int:
+    """Moves on every rating created, changed or deleted through RatingService in this process."""
+    return _version
+
+
+def _bump_ratings_version():
+    global _version
+    with _version_guard:
+        _version += 1
+
 
 class RatingService:
     def __init__(self):
-        self.repo = CSVRepository()
+        self.repo = get_repository("ratings")
         self.ratings_path = str(Path(__file__).resolve().parents[1] / "data" / "Ratings.csv")
         self.fields = ["UserID", "ISBN", "Book-Rating"]
+        self.repo.declare_indexes(self.ratings_path, ["ISBN", ("UserID", "ISBN")])
 
     # -----------------------------------------------------------------------
     # Internal helpers
     # -----------------------------------------------------------------------
 
-    def __read(self):
-        return self.repo.read_all(self.ratings_path)
+    def __iter(self, where = None, columns = None):
+        return self.repo.iter_rows(self.ratings_path, where = where, columns = columns)
 
-    def __write(self, rows):
-        self.repo.write_all(self.ratings_path, self.fields, rows)
-
-    def __match(self, row, user_id, isbn):
-        return row["UserID"] == str(user_id) and row["ISBN"] == isbn
+    def __key(self, user_id, isbn):
+        return {"UserID": str(user_id), "ISBN": isbn}
 
     def __to_read_model(self, row):
         return RatingRead(
@@ -37,51 +51,42 @@ class RatingService:
 
     def create_rating(self, user_id: int, isbn: str, rating_value: int) -> RatingRead:
         """Create or update a rating for the specified user/book."""
-        rows = self.__read()
-
-        for row in rows:
-            if self.__match(row, user_id, isbn):
-                row["Book-Rating"] = str(rating_value)
-                self.__write(rows)
-                return self.__to_read_model(row)
+        if self.repo.update_where(self.ratings_path, self.__key(user_id, isbn), {"Book-Rating": str(rating_value)}):
+            _bump_ratings_version()
+            return RatingRead(user_id = user_id, isbn = isbn, rating = rating_value)
 
         rating = Rating(user_id, isbn, rating_value)
         self.repo.append_row(self.ratings_path, self.fields, rating.to_csv_dict())
+        _bump_ratings_version()
         return self.__to_read_model(rating.to_csv_dict())
 
     def get_user_rating(self, user_id: int, isbn: str) -> RatingRead | None:
         """Return a user's rating for a specific book, or None if not found."""
-        for row in self.__read():
-            if self.__match(row, user_id, isbn):
-                return self.__to_read_model(row)
-        return None
+        row = next(self.__iter(self.__key(user_id, isbn)), None)
+        return self.__to_read_model(row) if row else None
 
     def get_all_ratings(self) -> list[RatingRead]:
-        return [self.__to_read_model(r) for r in self.__read()]
+        return [self.__to_read_model(r) for r in self.repo.iter_records(self.ratings_path)]
 
     def delete_rating(self, user_id: int, isbn: str) -> bool:
-        rows = self.__read()
-        filtered = [r for r in rows if not self.__match(r, user_id, isbn)]
-
-        if len(filtered) == len(rows):
+        if self.repo.delete_where(self.ratings_path, self.__key(user_id, isbn)) == 0:
             return False
-
-        self.__write(filtered)
+        _bump_ratings_version()
         return True
 
     def get_ratings_by_isbn(self, isbn: str) -> list[RatingRead]:
-        return [
-            self.__to_read_model(r)
-            for r in self.__read()
-            if r["ISBN"] == isbn
-        ]
+        return [self.__to_read_model(r) for r in self.repo.iter_records(self.ratings_path, where = {"ISBN": isbn})]
 
     def get_avg_rating(self, isbn: str) -> AvgRatingRead:
         """Compute the average rating for a book."""
-        ratings = self.get_ratings_by_isbn(isbn)
+        ratings = [int(r["Book-Rating"]) for r in self.__iter({"ISBN": isbn}, ["Book-Rating"])]
 
         if not ratings:
             return AvgRatingRead(isbn = isbn, avg_rating = 0.0, count = 0)
 
-        avg = mean(r.rating for r in ratings)
+        avg = mean(ratings)
         return AvgRatingRead(isbn = isbn, avg_rating = round(avg, 2), count = len(ratings))
+
+    def rating_counts(self) -> Counter:
+        """Number of ratings per ISBN."""
+        return Counter(r["ISBN"] for r in self.__iter(columns = ["ISBN"]))
@@ -13,40 +13,33 @@ class ReadingListService:
         self.book_repo = book_repo
         self.path = Path(__file__).resolve().parents[1] / "data" / "ReadingLists.csv"
         self.fields = ["ListID", "UserID", "Name", "ISBNs", "IsPublic"]
+        self.repo.declare_indexes(self.path, ["ListID", "UserID"])
         
     def __generate_next_id(self) -> int:
         """Generates the next available reading list ID."""
-        rows = self.repo.read_all(self.path)
-        if not rows:
-            return 1
+        rows = self.repo.iter_rows(self.path, columns = ["ListID"])
         ids = [int(r["ListID"]) for r in rows if r["ListID"].isdigit()]
         return max(ids, default = 0) + 1
     
     def __number_of_readinglist(self, user_id)-> int:
         """Counts how many reading lists a user currently has."""
-        rows = self.repo.read_all(self.path)
-        count = 0
-        for row in rows:
-            if str(user_id) == row["UserID"]: 
-                count += 1
-        
-        return count
+        rows = self.repo.iter_rows(self.path, where = {"UserID": str(user_id)}, columns = ["ListID"])
+        return sum(1 for _ in rows)
     
     def get_all_readinglist(self, user_id: int) -> List[ReadingListSummary]:
         """Returns all reading lists belonging to a user."""
-        rows = self.repo.read_all(self.path)
+        rows = self.repo.iter_rows(self.path, where = {"UserID": str(user_id)})
         result = []
         for r in rows:
-            if r["UserID"] == str(user_id):
-                rl = ReadingList.from_dict(r)
-                result.append(
-                    ReadingListSummary(
-                        list_id = rl.list_id,
-                        name = rl.name,
-                        total_books = len(rl.books),
-                        is_public = rl.is_public
-                    )
+            rl = ReadingList.from_dict(r)
+            result.append(
+                ReadingListSummary(
+                    list_id = rl.list_id,
+                    name = rl.name,
+                    total_books = len(rl.books),
+                    is_public = rl.is_public
                 )
+            )
 
         return result
     
@@ -55,9 +48,9 @@ class ReadingListService:
         if self.__number_of_readinglist(user_id) >= 10:
             raise ValueError("You can only have 10 reading lists")
 
-        rows = self.repo.read_all(self.path)
+        rows = self.repo.iter_rows(self.path, where = {"UserID": str(user_id)}, columns = ["Name"])
         for r in rows:
-            if r["UserID"] == str(user_id) and r["Name"].lower() == data.name.lower():
+            if r["Name"].lower() == data.name.lower():
                 raise ValueError(f'A reading list named "{data.name}" already exists.')
 
         next_id = self.__generate_next_id()
@@ -86,106 +79,84 @@ class ReadingListService:
         
         return True
 
+    def __list_key(self, list_id: int, user_id: int) -> dict:
+        return {"ListID": str(list_id), "UserID": str(user_id)}
+
+    def __load_list(self, list_id: int, user_id: int):
+        row = next(self.repo.iter_rows(self.path, where = self.__list_key(list_id, user_id)), None)
+        return ReadingList.from_dict(row) if row else None
+
     def rename(self, list_id: int, user_id: int, new_name: str) -> bool:
         """Renames an existing reading list."""
-        rows = self.repo.read_all(self.path)
-        all_names = [r["Name"].lower() for r in rows 
-                     if r["UserID"] == str(user_id) and r["ListID"] != str(list_id)]
+        rows = self.repo.iter_rows(self.path, where = {"UserID": str(user_id)}, columns = ["ListID", "Name"])
+        all_names = [r["Name"].lower() for r in rows if r["ListID"] != str(list_id)]
         
         if new_name.lower() in all_names:
             raise ValueError(f'A reading list named "{new_name}" already exists.')
         
-        renamed = False
-        for r in rows:
-            if r["UserID"] == str(user_id) and r["ListID"] == str(list_id):
-                readinglist = ReadingList.from_dict(r)
-                readinglist.rename(new_name)
-                r.update(readinglist.to_csv_dict())
-                renamed = True
-                break
-            
-        if not renamed:
+        readinglist = self.__load_list(list_id, user_id)
+        if readinglist is None:
             return False
-        self.repo.write_all(self.path, self.fields, rows)
+
+        readinglist.rename(new_name)
+        self.repo.update_where(self.path, self.__list_key(list_id, user_id), {"Name": readinglist.name})
         return True
 
     def toggle_visibility(self, list_id: int, user_id: int):
         """Toggles a reading list’s public visibility setting."""
-        rows = self.repo.read_all(self.path)
+        rl = self.__load_list(list_id, user_id)
+        if rl is None:
+            return False
 
-        for r in rows:
-            if r["ListID"] == str(list_id) and r["UserID"] == str(user_id):
-                rl = ReadingList.from_dict(r)
-                rl.is_public = not rl.is_public
-                r.update(rl.to_csv_dict())
-                self.repo.write_all(self.path, self.fields, rows)
-                return {
-                    "list_id": list_id,
-                    "is_public": rl.is_public,
-                    "message": "Visibility toggled successfully",
-                }
-        return False
+        rl.is_public = not rl.is_public
+        self.repo.update_where(self.path, self.__list_key(list_id, user_id), {"IsPublic": rl.to_csv_dict()["IsPublic"]})
+        return {
+            "list_id": list_id,
+            "is_public": rl.is_public,
+            "message": "Visibility toggled successfully",
+        }
 
     def add_book(self, list_id: int, user_id: int, isbn: str) -> bool:
         """Adds a book to a reading list."""
-        rows = self.repo.read_all(self.path)
-
-        for r in rows:
-            if r["ListID"] == str(list_id) and r["UserID"] == str(user_id):
-
-                rl = ReadingList.from_dict(r)
-
-                if isbn in rl.books:
-                    raise ValueError(f"Book {isbn} already in the reading list.")
-
-                rl.add_book(isbn)
-
-                r.update(rl.to_csv_dict())
+        rl = self.__load_list(list_id, user_id)
+        if rl is None:
+            return False
 
-                self.repo.write_all(self.path, self.fields, rows)
-                return True
+        if isbn in rl.books:
+            raise ValueError(f"Book {isbn} already in the reading list.")
 
-        return False
+        rl.add_book(isbn)
+        self.repo.update_where(self.path, self.__list_key(list_id, user_id), {"ISBNs": rl.to_csv_dict()["ISBNs"]})
+        return True
 
     def remove_book(self, list_id: int, user_id: int, isbn: str) -> bool:
         """Removes a book from a reading list."""
-        rows = self.repo.read_all(self.path)
-
-        for r in rows:
-            if r["ListID"] == str(list_id) and r["UserID"] == str(user_id):
-                rl = ReadingList.from_dict(r)
-
-                if isbn not in rl.books:
-                    raise ValueError(f"Book {isbn} not found in the reading list.")
-
-                rl.remove_book(isbn)
-
-                r.update(rl.to_csv_dict())
+        rl = self.__load_list(list_id, user_id)
+        if rl is None:
+            return False
 
-                self.repo.write_all(self.path, self.fields, rows)
-                return True
+        if isbn not in rl.books:
+            raise ValueError(f"Book {isbn} not found in the reading list.")
 
-        return False
+        rl.remove_book(isbn)
+        self.repo.update_where(self.path, self.__list_key(list_id, user_id), {"ISBNs": rl.to_csv_dict()["ISBNs"]})
+        return True
 
     def get_user_public_readinglists(self, user_id: int) -> Optional[ReadingListSummary]:
         """Returns all of a user's reading lists that are marked public."""
-        rows = self.repo.read_all(self.path)
+        rows = self.repo.iter_rows(self.path, where = {"UserID": str(user_id), "IsPublic": "true"})
         result = []
 
         for r in rows:
-            if (
-                r["UserID"] == str(user_id) and 
-                r.get("IsPublic", "false") == "true"
-            ):
-                rl = ReadingList.from_dict(r)
-                result.append(
-                    ReadingListSummary(
-                        list_id = rl.list_id,
-                        name = rl.name,
-                        total_books = len(rl.books),
-                        is_public = rl.is_public
-                    )
+            rl = ReadingList.from_dict(r)
+            result.append(
+                ReadingListSummary(
+                    list_id = rl.list_id,
+                    name = rl.name,
+                    total_books = len(rl.books),
+                    is_public = rl.is_public
                 )
+            )
 
         if not result:
             return {"message": "User has no public reading lists"}
@@ -194,12 +165,10 @@ class ReadingListService:
 
     def get_list_detail(self, list_id: int, user_id: int) -> Optional[ReadingListDetail]:
         """Returns full details for a specific reading list."""
-        rows = self.repo.read_all(self.path)
-
-        for r in rows:
-            if r["ListID"] == str(list_id) and r["UserID"] == str(user_id):
-                rl = ReadingList.from_dict(r)
-                books_info = self.book_repo.get_books_by_isbn(rl.books)
-                return ReadingListDetail(**rl.to_api_dict(books_info))
+        r = next(self.repo.iter_rows(self.path, where = {"ListID": str(list_id), "UserID": str(user_id)}), None)
+        if r is None:
+            return None
 
-        return None
+        rl = ReadingList.from_dict(r)
+        books_info = self.book_repo.get_books_by_isbn(rl.books)
+        return ReadingListDetail(**rl.to_api_dict(books_info))
@@ -1,61 +1,54 @@
 from pathlib import Path
 from app.models.request import Request
 from app.schemas.request import RequestCreate, RequestRead 
-from app.repositories.csv_repository import CSVRepository 
+from app.repositories.factory import get_repository
 
 class RequestService:
     def __init__(self):
-        self.repo = CSVRepository()
+        self.repo = get_repository("requests")
         self.path = Path(__file__).resolve().parents[1] / "data" / "Requests.csv"
         self.totalpath = Path(__file__).resolve().parents[1] / "data" / "Total_Requested.csv"
         self.fields = ["RequestID", "UserID", "Book Title", "Author", "ISBN"]
         self.total_fields = ["ISBN", "Total Requested"]
+        self.repo.declare_indexes(self.path, [("UserID", "ISBN")])
+        self.repo.declare_indexes(self.totalpath, ["ISBN"])
 
 
     def __generate_next_id(self) -> int:
         """Generate the next RequestID number."""
-        rows = self.repo.read_all(self.path)
-        if not rows:
-            return 1
+        rows = self.repo.iter_rows(self.path, columns = ["RequestID"])
         ids = [int(r["RequestID"]) for r in rows if r["RequestID"].isdigit()]
         return max(ids, default=0) + 1
 
     def __already_requested(self, user_id: int, isbn: str) -> bool:
         """Checks if this user has already requested the same book"""
-        rows = self.repo.read_all(self.path)
-        return any(r["UserID"] == str(user_id) and r["ISBN"] == isbn for r in rows)
+        rows = self.repo.iter_rows(self.path, where = {"UserID": str(user_id), "ISBN": isbn}, columns = ["RequestID"])
+        return any(rows)
+
+    def __total_requested(self, isbn: str):
+        row = next(self.repo.iter_rows(self.totalpath, where = {"ISBN": isbn}), None)
+        return int(row["Total Requested"]) if row else None
 
     def __decrease_count(self, isbn:str):
-        rows = self.repo.read_all(self.totalpath)
-        for r in rows:
-            if r["ISBN"] == isbn:
-                new_count = int(r["Total Requested"]) - 1
-                if new_count<=0: rows.remove(r)
-                else: 
-                    r["Total Requested"] = str(new_count)
-                    break
-        
-        self.repo.write_all(self.totalpath, self.total_fields, rows)
+        total = self.__total_requested(isbn)
+        if total is None:
+            return
+        if total - 1 <= 0:
+            self.repo.delete_where(self.totalpath, {"ISBN": isbn})
+        else:
+            self.repo.update_where(self.totalpath, {"ISBN": isbn}, {"Total Requested": str(total - 1)})
 
     
     def __update_total_requested(self, isbn: str):
-        rows = self.repo.read_all(self.totalpath)
-        found = False
-
-        for r in rows:
-            if r["ISBN"] == isbn:
-                r["Total Requested"] = str(int(r["Total Requested"]) + 1)
-                found = True
-                break
-
-        if not found:
-            rows.append({"ISBN": isbn, "Total Requested": "1"})
-
-        self.repo.write_all(self.totalpath, self.total_fields, rows)
+        total = self.__total_requested(isbn)
+        if total is None:
+            self.repo.append_row(self.totalpath, self.total_fields, {"ISBN": isbn, "Total Requested": "1"})
+        else:
+            self.repo.update_where(self.totalpath, {"ISBN": isbn}, {"Total Requested": str(total + 1)})
         
     def get_all_requests(self) -> list[RequestRead]:
         """Retrieve all requests from the requests.csv file."""
-        rows = self.repo.read_all(self.path)
+        rows = self.repo.iter_rows(self.path)
         return [RequestRead(**Request.from_dict(r).to_api_dict()) for r in rows]    
         
     def create_request(self, user_id: int, data: RequestCreate) -> RequestRead:
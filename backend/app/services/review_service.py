@@ -1,31 +1,31 @@
 from pathlib import Path
 from app.models.review import Review
-from app.repositories.csv_repository import CSVRepository
+from app.repositories.factory import get_repository
 from app.schemas.review import ReviewCreate, ReviewRead, ReviewUpdate
 
 
 class ReviewService:
     def __init__(self):
-        self.repo = CSVRepository()
+        self.repo = get_repository("reviews")
         self.path = Path(__file__).resolve().parents[1] / "data" / "Reviews.csv"
         self.fields = ["ReviewID", "UserID", "ISBN", "Comment", "Time"]
+        self.repo.declare_indexes(self.path, ["ISBN", ("UserID", "ISBN")])
 
     def __read_rows(self):
         return self.repo.read_all(self.path)
 
+    def __iter_rows(self, where = None, columns = None):
+        return self.repo.iter_rows(self.path, where = where, columns = columns)
+
     def __write_rows(self, rows):
         self.repo.write_all(self.path, self.fields, rows)
 
     def __generate_next_id(self) -> int:
-        rows = self.__read_rows()
-        if not rows:
-            return 1
-        ids = [int(r["ReviewID"]) for r in rows if r["ReviewID"].isdigit()]
+        ids = [int(r["ReviewID"]) for r in self.__iter_rows(columns = ["ReviewID"]) if r["ReviewID"].isdigit()]
         return max(ids, default=0) + 1
 
     def __already_reviewed(self, user_id: int, isbn: str) -> bool:
-        rows = self.__read_rows()
-        return any(r["UserID"] == str(user_id) and r["ISBN"] == isbn for r in rows)
+        return any(self.__iter_rows({"UserID": str(user_id), "ISBN": isbn}, ["ReviewID"]))
 
     def create_review(self, user_id: int, data: ReviewCreate, isbn: str) -> ReviewRead:
         """
@@ -47,25 +47,18 @@ class ReviewService:
         return ReviewRead(**review.to_api_dict())
 
     def get_all_reviews(self, isbn: str) -> list[ReviewRead]:
-        rows = self.__read_rows()
-        filtered = [r for r in rows if r["ISBN"] == isbn]
-        return [ReviewRead(**Review.from_dict(r).to_api_dict()) for r in filtered]
+        return [ReviewRead(**Review.from_dict(r).to_api_dict()) for r in self.repo.iter_records(self.path, where = {"ISBN": isbn})]
 
     def edit_review(self, review_id: int, data: ReviewUpdate) -> ReviewRead:
-        rows = self.__read_rows()
-        found_row = None
-
-        for r in rows:
-            if r["ReviewID"] == str(review_id):
-                r["Comment"] = data.comment
-                found_row = r
-                break
-
-        if not found_row:
+        key = {"ReviewID": str(review_id)}
+        if not self.repo.update_where(self.path, key, {"Comment": data.comment}):
             raise ValueError("Review not found")
 
-        self.__write_rows(rows)
-        updated_review = Review.from_dict(found_row)
+        row = next(self.__iter_rows(key), None)
+        if row is None:
+            # Deleted between the update and this read.
+            raise ValueError("Review not found")
+        updated_review = Review.from_dict(row)
         return ReviewRead(**updated_review.to_api_dict())
 
     def delete_review(self, review_id: int) -> bool:
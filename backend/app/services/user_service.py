@@ -1,17 +1,17 @@
-import csv
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Dict
-from app.repositories.csv_repository import CSVRepository
+from app.repositories.base_repository import BaseRepository
 
 USER_CSV = Path(__file__).resolve().parents[1] / "data" / "Users.csv"
 
 FIELDNAMES = ["id", "username", "email", "password_hash", "is_admin", "is_suspended", "suspended_until"]
 
 class CSVUserService:
-    def __init__(self, repo: CSVRepository, path: str = USER_CSV):
+    def __init__(self, repo: BaseRepository, path: str = USER_CSV):
         self.repo = repo
         self.path = path
+        self.repo.declare_indexes(self.path, ["id"])
 
     def _norm(self, s: str) -> str:
         return s.strip().lower()
@@ -22,11 +22,12 @@ class CSVUserService:
 
         raw_flag = r.get("is_admin", "False")
 
+    def _key(self, user_id: int) -> Dict:
+        return {"id": str(int(user_id))}
+
     def _get_next_id(self) -> int:
-        rows = self.repo.read_all(self.path)
-        if not rows:
-            return 1
-        return max(int(r["id"]) for r in rows) + 1
+        rows = self.repo.iter_rows(self.path, columns = ["id"])
+        return max((int(r["id"]) for r in rows), default = 0) + 1
 
          
     def _check_suspension_expired(self, user: dict) -> dict:
@@ -39,44 +40,28 @@ class CSVUserService:
             user["is_suspended"] = "false"
             user["suspended_until"] = ""
 
-            rows = self.repo.read_all(self.path)
-            for r in rows:
-                if int(r["id"]) == user["id"]:
-                    r["is_suspended"] = "false"
-                    r["suspended_until"] = ""
-                    break
-
-            with open(self.path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-                writer.writeheader()
-                writer.writerows(rows)
+            self.repo.update_where(self.path, self._key(user["id"]), {"is_suspended": "false", "suspended_until": ""})
 
         return user
 
     def _is_admin(self, user_id: int) -> bool:
-        rows = self.repo.read_all(self.path)
-
-        for r in rows:
-            if int(r["id"]) == int(user_id):
-                return str(r.get("is_admin", "False")).strip().lower() in {"true", "1", "yes"}
+        r = next(self.repo.iter_rows(self.path, where = self._key(user_id), columns = ["is_admin"]), None)
+        if r is None:
+            return False
 
-        return False
+        return str(r.get("is_admin") or "False").strip().lower() in {"true", "1", "yes"}
 
     def get_by_username(self, username: str) -> Optional[Dict]:
         username_norm = self._norm(username)
+        row = next(self.repo.iter_rows(self.path, where = lambda r: self._norm(r["username"]) == username_norm), None)
+        if row is None:
+            return None
 
-        for row in self.repo.read_all(self.path):
-            if self._norm(row["username"]) == username_norm:
-
-                row["id"] = int(row["id"])
-                row["is_admin"] = row["is_admin"].lower() == "true"
-                row["is_suspended"] = row["is_suspended"].lower() == "true"
-
-                row = self._check_suspension_expired(row)
+        row["id"] = int(row["id"])
+        row["is_admin"] = row["is_admin"].lower() == "true"
+        row["is_suspended"] = row["is_suspended"].lower() == "true"
 
-                return row
-
-        return None
+        return self._check_suspension_expired(row)
 
     def create_user(
         self,
@@ -85,12 +70,10 @@ class CSVUserService:
         password_hash: str,
         is_admin: bool = False,
     ) -> Dict:
-        users = self.repo.read_all(self.path)
-
         username_norm = self._norm(username)
         email_norm = self._norm(email)
 
-        for u in users:
+        for u in self.repo.iter_rows(self.path, columns = ["username", "email"]):
             if self._norm(u["username"]) == username_norm:
                 raise ValueError("username_taken")
             if self._norm(u["email"]) == email_norm:
@@ -107,12 +90,7 @@ class CSVUserService:
             "is_suspended": False,
         }
 
-        users.append(user)
-
-        with open(self.path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-            writer.writerows(users)
+        self.repo.append_row(self.path, FIELDNAMES, user)
 
         return user
 
@@ -124,39 +102,35 @@ class CSVUserService:
         is_admin: bool | None = None,
     ) -> Dict:
 
-        users = self.repo.read_all(self.path)
-        updated_user = None
-
-        for u in users:
-            if int(u["id"]) == int(user_id):
+        updated_user = next(self.repo.iter_rows(self.path, where = self._key(user_id)), None)
+        if updated_user is None:
+            raise ValueError("user_not_found")
 
-                if username is not None:
-                    new_norm = self._norm(username)
-                    for other in users:
-                        if int(other["id"]) != int(user_id) and self._norm(other["username"]) == new_norm:
-                            raise ValueError("username_taken")
-                    u["username"] = username
+        def others(r):
+            return int(r["id"]) != int(user_id)
 
-                if email is not None:
-                    new_norm = self._norm(email)
-                    for other in users:
-                        if int(other["id"]) != int(user_id) and self._norm(other["email"]) == new_norm:
-                            raise ValueError("email_taken")
-                    u["email"] = email
+        changes = {}
 
-                if is_admin is not None:
-                    u["is_admin"] = "true" if is_admin else "false"
+        if username is not None:
+            new_norm = self._norm(username)
+            for other in self.repo.iter_rows(self.path, where = others, columns = ["username"]):
+                if self._norm(other["username"]) == new_norm:
+                    raise ValueError("username_taken")
+            changes["username"] = username
 
-                updated_user = u
-                break
+        if email is not None:
+            new_norm = self._norm(email)
+            for other in self.repo.iter_rows(self.path, where = others, columns = ["email"]):
+                if self._norm(other["email"]) == new_norm:
+                    raise ValueError("email_taken")
+            changes["email"] = email
 
-        if updated_user is None:
-            raise ValueError("user_not_found")
+        if is_admin is not None:
+            changes["is_admin"] = "true" if is_admin else "false"
 
-        with open(self.path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-            writer.writerows(users)
+        if changes:
+            self.repo.update_where(self.path, self._key(user_id), changes)
+        updated_user.update(changes)
             
         updated_user["id"] = int(updated_user["id"])
         updated_user["is_admin"] = str(updated_user.get("is_admin", "false")).lower() in {"true", "1", "yes"}
@@ -169,49 +143,21 @@ class CSVUserService:
         if not self._is_admin(admin_id):
             raise PermissionError("Admin privileges required")
 
-        rows = self.repo.read_all(self.path)
-        target = None
-
         suspended_until_dt = datetime.now() + timedelta(minutes=duration_minutes)
         suspended_until_str = suspended_until_dt.isoformat()
 
-        for u in rows:
-            if int(u["id"]) == int(target_id):
-                u["is_suspended"] = "true"
-                u["suspended_until"] = suspended_until_str
-                target = u
-                break
-
-        if target is None:
+        changes = {"is_suspended": "true", "suspended_until": suspended_until_str}
+        if not self.repo.update_where(self.path, self._key(target_id), changes):
             raise ValueError("user_not_found")
 
-        with open(self.path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-            writer.writerows(rows)
-
-        return target
+        return next(self.repo.iter_rows(self.path, where = self._key(target_id)))
     
     def unsuspend_user(self, admin_id: int, target_id: int) -> Dict:
         if not self._is_admin(admin_id):
             raise PermissionError("Admin privileges required")
 
-        users = self.repo.read_all(self.path)
-        unsuspended_user = None
-
-        for u in users:
-            if int(u["id"]) == int(target_id):
-                u["is_suspended"] = "false"
-                u["suspended_until"] = ""    
-                unsuspended_user = u
-                break
-
-        if unsuspended_user is None:
+        changes = {"is_suspended": "false", "suspended_until": ""}
+        if not self.repo.update_where(self.path, self._key(target_id), changes):
             raise ValueError("user_not_found")
 
-        with open(self.path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-            writer.writerows(users)
-
-        return unsuspended_user
+        return next(self.repo.iter_rows(self.path, where = self._key(target_id)))
@@ -0,0 +1,95 @@
+"""Catalog version counter and change events: both move on every change made to the book catalog through BookService."""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+from app.repositories.offset_index import OffsetIndex
+
+_version = 0
+_guard = threading.Lock()
+# Per catalog file: held by a writer from before it writes until its change is published.
+_writing: Dict[str, threading.Lock] = {}
+_listeners: List[Callable[["CatalogChange"], None]] = []
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+class CatalogChange:
+    """One book written to the catalog, with its changed columns and the file's signature before and after the write."""
+    __slots__ = ("kind", "isbn", "values", "source")
+
+    def __init__(self, kind: str, isbn: str, values: Optional[Mapping[str, str]] = None,
+                 source: Optional[Tuple[Optional[Tuple], Optional[Tuple]]] = None):
+        self.kind = kind
+        self.isbn = isbn
+        self.values = dict(values or {})
+        self.source = source
+
+
+class CatalogWrite:
+    """A writer's turn at the catalog file at ``path``, handed out by ``writing``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.before = _signature(path)
+
+    def publish(self, kind: str, isbn: str, values: Optional[Mapping[str, str]] = None) -> int:
+        """Publish the change just written, with the file's signature before and after it."""
+        return publish(CatalogChange(kind, isbn, values, (self.before, _signature(self.path))))
+
+
+def _signature(path: str) -> Optional[Tuple]:
+    try:
+        return OffsetIndex.signature_of(path)
+    except OSError:
+        return None
+
+
+def _writer_lock(path: str) -> threading.Lock:
+    key = os.path.abspath(path)
+    with _guard:
+        return _writing.setdefault(key, threading.Lock())
+
+
+@contextmanager
+def writing(path: str) -> Iterator[CatalogWrite]:
+    """Write to the catalog at ``path`` and publish the change with no other write to that file in between."""
+    with _writer_lock(path):
+        yield CatalogWrite(path)
+
+
+def write_in_progress(path: str) -> bool:
+    """Whether a writer of the catalog at ``path`` is between writing a change and publishing it."""
+    lock = _writing.get(os.path.abspath(path))
+    return lock is not None and lock.locked()
+
+
+def catalog_version() -> int:
+    """The current catalog version; anything derived from the catalog at an older version is out of date."""
+    return _version
+
+
+def bump_catalog_version() -> int:
+    """Record that the catalog changed, and return the new version."""
+    global _version
+    with _guard:
+        _version += 1
+        return _version
+
+
+def subscribe(listener: Callable[[CatalogChange], None]):
+    """Call ``listener`` with every change published from now on, in the writer's thread."""
+    _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[CatalogChange], None]):
+    _listeners.remove(listener)
+
+
+def publish(change: CatalogChange) -> int:
+    """Hand ``change``, already written, to every listener, then bump the version and return it."""
+    for listener in list(_listeners):
+        listener(change)
+    return bump_catalog_version()
@@ -0,0 +1,307 @@
+import csv
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from app.repositories.base_repository import BaseRepository
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.factory import get_repository
+from app.repositories.offset_index import OffsetIndex
+from app.repositories.rwlock import RWLock
+from app.utils.catalog_events import CREATED, DELETED, CatalogChange, catalog_version, write_in_progress
+from app.utils.query_cache import QueryCache, normalize_query
+from app.utils.search_index import TrigramIndex
+
+BX_BOOKS_CSV = Path(__file__).resolve().parents[1] / "data" / "BX_Books.csv"
+# The CSV columns behind each position of a catalog tuple.
+CATALOG_COLUMNS = ("ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher")
+# The source of books kept by a backend other than the CSV file, which has no signature to check.
+STORE = ("store",)
+
+
+def _catalog(filepath: Path):
+    """Yield (isbn, title, author, year, publisher) for every book, from the snapshot when it is current."""
+    snapshot = BXBooksCSVAdapter().snapshot(filepath)
+    if snapshot is not None:
+        columns = [snapshot.column(c) for c in CATALOG_COLUMNS]
+        for i in range(len(snapshot)):
+            yield tuple(column[i] for column in columns)
+        return
+
+    with open(filepath, encoding="ISO-8859-1") as file:
+        reader = csv.DictReader(file, delimiter=";")
+        for row in reader:
+            yield (row["ISBN"], row["Book-Title"], row["Book-Author"],
+                   row["Year-Of-Publication"], row["Publisher"])
+
+
+def _matches(query: str, isbn: str, title: str, author: str) -> bool:
+    return query in title.lower() or query in author.lower() or query in isbn
+
+
+def _trigram_fields(book: Tuple) -> Tuple[str, str, str]:
+    return book[0], book[1].lower(), book[2].lower()
+
+
+def _merged(book: Optional[Tuple], values: Mapping[str, Any]) -> Tuple:
+    """``book`` with the columns in ``values`` replaced, or a new book made of them."""
+    old = book or ("",) * len(CATALOG_COLUMNS)
+    return tuple(old[i] if c not in values else "" if values[c] is None else str(values[c])
+                 for i, c in enumerate(CATALOG_COLUMNS))
+
+
+def book_result(isbn, title, author, year, publisher) -> Dict[str, str]:
+    return {
+        "isbn": isbn,
+        "title": title,
+        "author": author,
+        "year": year,
+        "publisher": publisher,
+        # "cover": row.get("Image-URL-M")
+    }
+
+
+class CatalogIndex:
+    """The catalog's books in memory with a trigram index, shared by every request and kept up to date with each write."""
+
+    def __init__(self, path=BX_BOOKS_CSV, repo: Optional[BaseRepository] = None):
+        self.path = path
+        self.repo = repo if repo is not None else get_repository("books", BXBooksCSVAdapter)
+        self.file_backed = isinstance(self.repo, CSVRepository)
+        self._state: Optional[Tuple[Tuple, List[Optional[Tuple]], TrigramIndex]] = None
+        self._guard = threading.Lock()
+        self.lock = RWLock()
+        self.views: List["CatalogView"] = []
+        self.cache = QueryCache()
+        self._pending: List[CatalogChange] = []
+        self._pending_guard = threading.Lock()
+
+    def load(self) -> Tuple[Tuple, List[Optional[Tuple]], TrigramIndex]:
+        """Return (source, books, index), rebuilding them if the catalog file changed."""
+        self.sync()
+        with self.lock.read():
+            return self._load()
+
+    def source(self) -> Tuple:
+        """The catalog file's signature, or STORE for another backend: what a current state was built from."""
+        if self.file_backed:
+            return OffsetIndex.signature_of(os.path.abspath(self.path))
+        return STORE
+
+    def _load(self) -> Tuple[Tuple, List[Optional[Tuple]], TrigramIndex]:
+        # Callers hold the read side of ``lock``.
+        source = self.source()
+        state = self._state
+        if state is not None and state[0] == source:
+            return state
+        with self._guard:
+            state = self._state
+            if state is None or state[0] != source:
+                with self._pending_guard:
+                    # Already written, so the rebuild reads them.
+                    self._pending.clear()
+                version = catalog_version()
+                busy = write_in_progress(self.path)
+                books = list(self._books())
+                if busy or write_in_progress(self.path) or catalog_version() != version:
+                    # A change written meanwhile may or may not be in ``books``: use them, but build again next time.
+                    source = None
+                index = TrigramIndex.build(_trigram_fields(book) for book in books)
+                state = self._state = (source, books, index)
+        return state
+
+    def _books(self):
+        if self.file_backed:
+            return _catalog(self.path)
+        return (tuple(row.get(c) or "" for c in CATALOG_COLUMNS) for row in self.repo.iter_records(self.path))
+
+    def apply(self, change: CatalogChange):
+        """Queue ``change``, already written, and apply it now if no search or rebuild holds ``lock``."""
+        with self._pending_guard:
+            self._pending.append(change)
+        self.sync(blocking=False)
+
+    def sync(self, blocking: bool = True) -> bool:
+        """Apply the queued changes before a read; without ``blocking``, leave them queued if ``lock`` is busy."""
+        while self._pending:
+            if not self.lock.acquire_write(blocking):
+                return False
+            try:
+                with self._pending_guard:
+                    changes, self._pending = self._pending, []
+                for change in changes:
+                    self._follow(change)
+            finally:
+                self.lock.release_write()
+        return True
+
+    def _follow(self, change: CatalogChange):
+        # Callers hold the write side of ``lock``. With the CSV backend the change is applied only on top of
+        # the file as it was just before the write (``change.source``): if the books were rebuilt from the file
+        # after it there is nothing to do, and if the file changed some other way they are left to a rebuild.
+        state = self._state
+        if state is None:
+            return
+        if state[0] is None:
+            self._drop()
+            return
+        source = state[0]
+        if self.file_backed:
+            before, after = change.source or (None, None)
+            if source == after:
+                return
+            if source != before:
+                self._drop()
+                return
+            source = after
+        try:
+            self._apply(state, source, change)
+        except Exception:
+            self._drop()
+
+    def _drop(self):
+        self._state = None
+        for view in self.views:
+            view._state = None
+
+    def _apply(self, state: Tuple, source: Tuple, change: CatalogChange):
+        _, books, index = state
+        docs = index.candidates(change.isbn)
+        if docs is None:
+            docs = range(len(books))
+        # (doc, book before, book after) for every copy of the ISBN, and the new row if one was added.
+        edits = [(doc, books[doc], None if change.kind == DELETED else _merged(books[doc], change.values))
+                 for doc in docs if books[doc] is not None and books[doc][0] == change.isbn]
+        if change.kind == CREATED:
+            edits.append((len(books), None, _merged(None, change.values)))
+            books.append(None)
+
+        for doc, old, new in edits:
+            if old == new:
+                continue
+            if old is not None:
+                index.remove(doc, _trigram_fields(old))
+            if new is not None:
+                index.add(doc, _trigram_fields(new))
+            books[doc] = new
+
+        current = self._state = (source, books, index)
+        # Views index the first copy of each ISBN only.
+        before = next(((doc, old) for doc, old, _ in edits if old is not None), None)
+        after = next(((doc, new) for doc, _, new in edits if new is not None), None)
+        for view in self.views:
+            view._changed(state, current, before, after)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Same answer as ``scan_books`` for the normalized query, from the index instead of the file."""
+        query = normalize_query(query)
+        if not query:
+            return []
+        self.sync()
+        with self.lock.read():
+            state = self._load()
+            version = (catalog_version(), state[0])
+            results = self.cache.get((query, limit), version)
+            if results is None:
+                results = self._search(state, query, limit)
+                self.cache.put((query, limit), results, version)
+        return results
+
+    def _search(self, state: Tuple, query: str, limit: int) -> List[Dict[str, str]]:
+        _, books, index = state
+        candidates = index.candidates(query)
+        if candidates is None:
+            candidates = range(len(books))
+
+        results = []
+        seen_isbn = set()
+        for i in candidates:
+            book = books[i]
+            if book is None or book[0] in seen_isbn:
+                continue
+            if _matches(query, book[0], book[1], book[2]):
+                results.append(book_result(*book))
+                seen_isbn.add(book[0])
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class CatalogView:
+    """Something built from the catalog's books, such as an index, and rebuilt when the catalog reloads."""
+
+    def __init__(self, catalog: CatalogIndex):
+        self.catalog = catalog
+        self._state: Optional[Tuple[Tuple, Any]] = None
+        self._guard = threading.Lock()
+        catalog.views.append(self)
+
+    def _build(self, books: List[Optional[Tuple]]) -> Any:
+        raise NotImplementedError
+
+    def _update(self, built: Any, catalog: Tuple,
+                before: Optional[Tuple[int, Tuple]], after: Optional[Tuple[int, Tuple]]):
+        """Change ``built`` in place for one ISBN's edit; ``before`` and ``after`` are (doc, book) of its first copy, or None."""
+        raise NotImplementedError
+
+    def _changed(self, previous: Tuple, current: Tuple,
+                 before: Optional[Tuple[int, Tuple]], after: Optional[Tuple[int, Tuple]]):
+        # Called by CatalogIndex.sync under its write lock.
+        state = self._state
+        if state is None or state[0] is not previous:
+            # Not built from the catalog as it was; the next load builds it from the new one.
+            return
+        if before != after:
+            self._update(state[1], current, before, after)
+        self._state = (current, state[1])
+
+    def _outdated(self) -> bool:
+        """Whether what was built is due a rebuild for a reason other than the catalog, such as its ratings."""
+        return False
+
+    def stale(self) -> bool:
+        """Whether the next ``load`` would have to (re)build, e.g. to do that off the event loop first."""
+        state = self._state
+        try:
+            return state is None or state[0][0] != self.catalog.source() or self._outdated()
+        except OSError:
+            return True
+
+    def _current(self) -> Tuple[Tuple, Any]:
+        # Callers hold the read side of the catalog's lock.
+        catalog = self.catalog._load()
+        state = self._state
+        if state is not None and state[0] is catalog and not self._outdated():
+            return state
+        with self._guard:
+            state = self._state
+            if state is None or state[0] is not catalog or self._outdated():
+                state = self._state = (catalog, self._build(catalog[1]))
+        return state
+
+    def load(self) -> Any:
+        self.catalog.sync()
+        with self.catalog.lock.read():
+            return self._current()[1]
+
+
+def scan_books(query: str, filepath: Path = BX_BOOKS_CSV):
+    """The original search: read the whole catalog and test every row. Kept as the reference for ``search_books``."""
+    if not query:
+        return []
+
+    query = query.lower()
+    results = []
+    seen_isbn = set()
+    for isbn, title, author, year, publisher in _catalog(filepath):
+        if isbn in seen_isbn:
+            continue
+
+        if _matches(query, isbn, title, author):
+            results.append(book_result(isbn, title, author, year, publisher))
+            seen_isbn.add(isbn)
+        if len(results)>=10:
+            break
+
+    return results
@@ -0,0 +1,188 @@
+import os
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from app.services.rating_service import ratings_version
+from app.utils.catalog_index import CatalogIndex, CatalogView
+from app.utils.search_index import SearchIndex, has_terms, split_query, tokenize
+
+# Most completions a request may ask for, and the prefix length up to which they are precomputed.
+MAX_COMPLETIONS = 50
+SHORT_PREFIX = 2
+# Once ratings have been written, completions are re-ranked with fresh counts at most this often.
+RATINGS_REFRESH_SECONDS = float(os.getenv("RATINGS_REFRESH_SECONDS", "60"))
+
+
+def _completions(books: List[Tuple], ratings: Mapping[str, int]) -> List[Tuple]:
+    """(field, text, ratings, isbn) for every distinct title and author, most-rated first."""
+    entries: Dict[Tuple[str, str], List] = {}
+    seen_isbn = set()
+    for book in books:
+        if book is None or book[0] in seen_isbn:
+            continue
+        isbn, title, author = book[:3]
+        seen_isbn.add(isbn)
+        count = ratings.get(isbn, 0)
+        for field, text in (("title", title), ("author", author)):
+            if not text:
+                continue
+            entry = entries.get((field, text))
+            if entry is None:
+                entries[(field, text)] = [count, count, isbn if field == "title" else None]
+                continue
+            entry[0] += count
+            if field == "title" and count > entry[1]:
+                entry[1:] = [count, isbn]
+    ranked = sorted(entries.items(), key=lambda e: (-e[1][0], e[0][1].lower(), e[0][0]))
+    return [(field, text, count, isbn) for (field, text), (count, _, isbn) in ranked]
+
+
+def _short_prefixes(entries: List[Tuple]) -> Dict[str, List[int]]:
+    """The first ``MAX_COMPLETIONS`` completion ids with a word starting with each one- or two-letter prefix."""
+    top: Dict[str, List[int]] = {}
+    for i, (_, text, _, _) in enumerate(entries):
+        for prefix in {token[:n] for token in tokenize(text) for n in range(1, SHORT_PREFIX + 1)}:
+            ids = top.get(prefix)
+            if ids is None:
+                top[prefix] = [i]
+            elif len(ids) < MAX_COMPLETIONS:
+                ids.append(i)
+    return top
+
+
+def _first_copy(catalog: Tuple, doc: int) -> bool:
+    """Whether ``doc`` is the first book in the catalog with its ISBN, the one searches index."""
+    _, books, index = catalog
+    isbn = books[doc][0]
+    docs = index.candidates(isbn)
+    if docs is None:
+        docs = range(doc)
+    return next((d for d in docs if books[d] is not None and books[d][0] == isbn), doc) == doc
+
+
+def _tally(catalog: Tuple, ratings: Mapping[str, int], field: str, text: str) -> Tuple[int, Optional[str]]:
+    """The ratings of the books with ``text`` as their ``field``, and the most rated ISBN, or None if there are none."""
+    _, books, index = catalog
+    position = 1 if field == "title" else 2
+    docs = index.candidates(text.lower())
+    if docs is None:
+        docs = range(len(books))
+    total, best, isbn = 0, -1, None
+    for doc in docs:
+        book = books[doc]
+        if book is None or book[position] != text or not _first_copy(catalog, doc):
+            continue
+        count = ratings.get(book[0], 0)
+        total += count
+        if count > best:
+            best, isbn = count, book[0]
+    return total, isbn
+
+
+def _find(entries: List[Optional[Tuple]], index: SearchIndex, field: str, text: str) -> Optional[int]:
+    """The id of the completion for ``text`` as ``field``, or None."""
+    candidates = index.candidates(text + " ")
+    if candidates is None:
+        candidates = range(len(entries))
+    return next((i for i in candidates if entries[i] is not None and entries[i][:2] == (field, text)), None)
+
+
+def _list(short: Dict[str, List[int]], i: int, text: str):
+    """Add the newest completion ``i`` to the short-prefix lists that still have room."""
+    for prefix in {token[:n] for token in tokenize(text) for n in range(1, SHORT_PREFIX + 1)}:
+        ids = short.setdefault(prefix, [])
+        if len(ids) < MAX_COMPLETIONS:
+            ids.append(i)
+
+
+def _unlist(entries: List[Optional[Tuple]], short: Dict[str, List[int]], i: int, text: str):
+    """Take completion ``i`` off the short-prefix lists, moving the next one with the prefix up into a full list."""
+    for prefix in {token[:n] for token in tokenize(text) for n in range(1, SHORT_PREFIX + 1)}:
+        ids = short.get(prefix)
+        if not ids or i not in ids:
+            continue
+        full = len(ids) == MAX_COMPLETIONS
+        ids.remove(i)
+        if full and ids:
+            following = (j for j in range(ids[-1] + 1, len(entries)) if entries[j] is not None
+                         and any(token.startswith(prefix) for token in tokenize(entries[j][1])))
+            j = next(following, None)
+            if j is not None:
+                ids.append(j)
+
+
+class Autocomplete(CatalogView):
+    """Type-ahead completions over the catalog's distinct titles and authors, most rated first."""
+
+    def __init__(self, catalog: CatalogIndex, rating_counts: Callable[[], Mapping[str, int]],
+                 ratings_version: Callable[[], int] = ratings_version, refresh: float = RATINGS_REFRESH_SECONDS):
+        super().__init__(catalog)
+        self.rating_counts = rating_counts
+        self.ratings_version = ratings_version
+        self.refresh = refresh
+        self._counted = (ratings_version(), time.monotonic())
+
+    def _outdated(self) -> bool:
+        version, taken = self._counted
+        return self.ratings_version() != version and time.monotonic() - taken >= self.refresh
+
+    def _build(self, books: List[Optional[Tuple]]) -> Tuple[List[Optional[Tuple]], SearchIndex, Dict[str, List[int]], Mapping[str, int]]:
+        # Taken before the counts, so a rating written while they are read is counted at the next refresh.
+        self._counted = (self.ratings_version(), time.monotonic())
+        ratings = self.rating_counts()
+        entries = _completions(books, ratings)
+        index = SearchIndex.build((text,) for _, text, _, _ in entries)
+        return entries, index, _short_prefixes(entries), ratings
+
+    def _update(self, built: Tuple, catalog: Tuple, before: Optional[Tuple[int, Tuple]], after: Optional[Tuple[int, Tuple]]):
+        # Each title and author the book had or has is recounted from the catalog. A new one
+        # is numbered after the rest, so it ranks last until the next build, like its ratings.
+        entries, index, short, ratings = built
+        texts = set()
+        for edit in (before, after):
+            if edit is not None:
+                texts.update((field, edit[1][position]) for field, position in (("title", 1), ("author", 2))
+                             if edit[1][position])
+        for field, text in sorted(texts):
+            count, isbn = _tally(catalog, ratings, field, text)
+            i = _find(entries, index, field, text)
+            if isbn is None:
+                if i is not None:
+                    entries[i] = None
+                    index.remove(i, (text,))
+                    _unlist(entries, short, i, text)
+            elif i is None:
+                i = len(entries)
+                entries.append((field, text, count, isbn if field == "title" else None))
+                index.add(i, (text,))
+                _list(short, i, text)
+            else:
+                entries[i] = (field, text, count, isbn if field == "title" else None)
+
+    def complete(self, prefix: str, limit: int = 10, blocking: bool = True) -> Optional[List[Dict]]:
+        """The ``limit`` most rated titles and authors matching the prefix; None if not ``blocking`` and the catalog is busy."""
+        complete, partial = split_query(prefix)
+        if not complete and partial is None:
+            return []
+        if not self.catalog.sync(blocking) or not self.catalog.lock.acquire_read(blocking):
+            return None
+        try:
+            entries, index, short, _ = self._current()[1]
+            if not complete and len(partial) <= SHORT_PREFIX and limit <= MAX_COMPLETIONS:
+                candidates = short.get(partial, ())
+            else:
+                candidates = index.candidates(prefix)
+            if candidates is None:
+                candidates = range(len(entries))
+
+            results = []
+            for i in candidates:
+                if entries[i] is None:
+                    continue
+                field, text, count, isbn = entries[i]
+                if has_terms(text, complete, partial):
+                    results.append({"text": text, "field": field, "ratings": count, "isbn": isbn})
+                    if len(results) >= limit:
+                        break
+            return results
+        finally:
+            self.catalog.lock.release_read()
@@ -0,0 +1,24 @@
+"""Book-Crossing cover images follow one Amazon URL pattern per size, so they can be rebuilt from the ISBN."""
+from typing import Dict, Optional, Tuple
+
+COVER_SIZES = {
+    "Image-URL-S": "THUMBZZZ",
+    "Image-URL-M": "MZZZZZZZ",
+    "Image-URL-L": "LZZZZZZZ",
+}
+
+# Column -> (column the URL is built from, format string taking that column's value).
+COVER_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    column: ("ISBN", "http://images.amazon.com/images/P/{}.01." + size + ".jpg")
+    for column, size in COVER_SIZES.items()
+}
+
+
+def cover_url(isbn: str, column: str) -> str:
+    """The standard Amazon URL of one cover size, e.g. ``cover_url("0195153448", "Image-URL-M")``."""
+    return COVER_TEMPLATES[column][1].format(isbn)
+
+
+def is_standard(isbn: Optional[str], column: str, url: Optional[str]) -> bool:
+    """Whether ``url`` is exactly what ``cover_url`` would rebuild, so it need not be stored."""
+    return bool(isbn) and url is not None and url == cover_url(isbn, column)
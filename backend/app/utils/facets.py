@@ -0,0 +1,45 @@
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+from app.utils.search_index import FacetIndex
+
+# Publisher and author facets list this many of their most common values.
+FACET_TOP = 10
+
+
+def _year(text: str) -> int:
+    """The publication year as a number, or 0 where the catalog has none (it uses "0") or an unreadable one."""
+    try:
+        year = int(text)
+    except (TypeError, ValueError):
+        return 0
+    return year if 0 < year < 0xFFFF else 0
+
+
+class Facets:
+    """Per-book facet values of the ranked index: publication year and decade, publisher and author."""
+    __slots__ = ("years", "decade", "publisher", "author")
+
+    def __init__(self, books: List[Tuple], indexed: Callable[[int], bool]):
+        self.years = array("H", (_year(book[3]) if indexed(doc) else 0 for doc, book in enumerate(books)))
+        self.decade = FacetIndex.build(str(y // 10 * 10) if y else None for y in self.years)
+        self.publisher = FacetIndex.build(book[4] if indexed(doc) else None for doc, book in enumerate(books))
+        self.author = FacetIndex.build(book[2] if indexed(doc) else None for doc, book in enumerate(books))
+
+    def set(self, doc: int, book: Optional[Tuple]):
+        """Give ``doc``, a known book or the next one, the values of ``book``, or none."""
+        year = _year(book[3]) if book is not None else 0
+        if doc == len(self.years):
+            self.years.append(year)
+        else:
+            self.years[doc] = year
+        self.decade.set(doc, str(year // 10 * 10) if year else None)
+        self.publisher.set(doc, book[4] if book is not None else None)
+        self.author.set(doc, book[2] if book is not None else None)
+
+    def count(self, docs: List[int]) -> Dict[str, List[Dict]]:
+        decades = sorted(self.decade.count(docs), key=lambda item: int(item[0]))
+        return {
+            "decade": [{"value": v, "count": n} for v, n in decades],
+            "publisher": [{"value": v, "count": n} for v, n in self.publisher.count(docs, FACET_TOP)],
+            "author": [{"value": v, "count": n} for v, n in self.author.count(docs, FACET_TOP)],
+        }
@@ -0,0 +1,71 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Entries kept per search cache; 0 turns caching off.
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+
+
+def normalize_query(query: str) -> str:
+    """The cache key form of ``query``: lower-cased, with runs of whitespace collapsed to one space."""
+    return " ".join(query.lower().split())
+
+
+class QueryCache:
+    """Bounded LRU map from queries to results, valid for one version of the data behind them."""
+
+    def __init__(self, maxsize: int = SEARCH_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._version: Optional[Hashable] = None
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check(self, version: Hashable):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """The result stored for ``key`` at ``version``, or None."""
+        with self._guard:
+            self._check(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: Hashable):
+        """Store ``value`` for ``key``, unless the cache has since moved past ``version``."""
+        if self.maxsize <= 0 or value is None:
+            return
+        with self._guard:
+            if version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._guard:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
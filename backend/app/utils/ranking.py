@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional, Tuple
+from app.utils.catalog_events import catalog_version
+from app.utils.catalog_index import CatalogIndex, CatalogView, book_result
+from app.utils.facets import Facets
+from app.utils.query_cache import QueryCache, normalize_query
+from app.utils.search_index import RankedIndex, SpellingIndex, tokenize
+
+# Ranked search fields, as (position in a catalog tuple, BM25F weight): title, author, publisher.
+RANKED_FIELDS = ((1, 3.0), (2, 2.0), (4, 1.0))
+MAX_PAGE_SIZE = 50
+
+
+class RankedSearch(CatalogView):
+    """Relevance-ranked, paginated BM25F search over title, author and publisher, with filters and facets."""
+
+    def __init__(self, catalog: CatalogIndex):
+        super().__init__(catalog)
+        self.cache = QueryCache()
+
+    def _build(self, books: List[Optional[Tuple]]) -> Tuple[RankedIndex, SpellingIndex, Facets, bytearray]:
+        seen_isbn = set()
+        indexed = bytearray(len(books))
+        for doc, book in enumerate(books):
+            if book is not None and book[0] not in seen_isbn:
+                seen_isbn.add(book[0])
+                indexed[doc] = 1
+
+        documents = ([book[position] for position, _ in RANKED_FIELDS] if indexed[doc] else ()
+                     for doc, book in enumerate(books))
+        index = RankedIndex.build(documents, [weight for _, weight in RANKED_FIELDS])
+        speller = SpellingIndex.build((word, len(ids)) for word, (ids, _, _) in index.postings.items()
+                                      if word.isalpha())
+        return index, speller, Facets(books, indexed.__getitem__), indexed
+
+    def _update(self, built: Tuple, catalog: Tuple, before: Optional[Tuple[int, Tuple]], after: Optional[Tuple[int, Tuple]]):
+        index, speller, facets, indexed = built
+        for doc in range(len(indexed), len(catalog[1])):
+            indexed.append(0)
+            facets.set(doc, None)
+        for edit, delta in ((before, -1), (after, 1)):
+            if edit is None:
+                continue
+            doc, book = edit
+            texts = [book[position] for position, _ in RANKED_FIELDS]
+            if delta < 0:
+                index.remove(doc, texts)
+            else:
+                index.add(doc, texts)
+            for word in {token for text in texts for token in tokenize(text)}:
+                if word.isalpha():
+                    speller.adjust(word, delta)
+            indexed[doc] = delta > 0
+            facets.set(doc, book if delta > 0 else None)
+
+    def search(self, query: str, offset: int = 0, limit: int = 10,
+               year_from: Optional[int] = None, year_to: Optional[int] = None,
+               publisher: Optional[str] = None, author: Optional[str] = None, facets: bool = False) -> Dict:
+        """One page of matches, best first, with the total; ``facets`` adds counts of all matches per decade, publisher and author."""
+        query = normalize_query(query)
+        key = (query, offset, limit, year_from, year_to, publisher, author, facets)
+        self.catalog.sync()
+        with self.catalog.lock.read():
+            state = self._current()
+            version = (catalog_version(), state[0][0])
+            found = self.cache.get(key, version)
+            if found is None:
+                found = self._search(state, query, offset, limit, year_from, year_to, publisher, author, facets)
+                self.cache.put(key, found, version)
+        return found
+
+    def _search(self, state: Tuple, query: str, offset: int, limit: int,
+                year_from: Optional[int], year_to: Optional[int],
+                publisher: Optional[str], author: Optional[str], facets: bool) -> Dict:
+        (_, books, _), (index, speller, facet_index, _) = state
+        restrict = []
+        if publisher is not None:
+            restrict.append(facet_index.publisher.ids(publisher))
+        if author is not None:
+            restrict.append(facet_index.author.ids(author))
+        accept = None
+        if year_from is not None or year_to is not None:
+            years, low, high = facet_index.years, year_from or 1, year_to or 0xFFFF
+            accept = lambda doc: low <= years[doc] <= high
+
+        def run(q: str) -> Tuple[int, List, Optional[List[int]]]:
+            matched = [] if facets else None
+            total, page = index.search(q, offset, limit, restrict, accept, matched)
+            return total, page, matched
+
+        total, page, matched = run(query)
+        did_you_mean = None
+        if not total:
+            did_you_mean = speller.correct(query)
+            if did_you_mean is not None:
+                total, page, matched = run(did_you_mean)
+        found = {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "did_you_mean": did_you_mean,
+            "results": [{**book_result(*books[doc]), "score": round(score, 4)} for doc, score in page],
+        }
+        if facets:
+            found["facets"] = facet_index.count(matched)
+        return found
@@ -1,37 +1,21 @@
-import csv
-from pathlib import Path
+from typing import Dict
+from app.services.rating_service import RatingService
+from app.utils.catalog_events import subscribe
+from app.utils.catalog_index import CatalogIndex, scan_books
+from app.utils.completions import MAX_COMPLETIONS, Autocomplete
+from app.utils.ranking import MAX_PAGE_SIZE, RankedSearch
+
+catalog_index = CatalogIndex()
+autocomplete = Autocomplete(catalog_index, RatingService().rating_counts)
+ranked_search = RankedSearch(catalog_index)
+subscribe(catalog_index.apply)
 
-"""Searches for books whose isbn or author or title matches the query"""
-def search_books(query: str):
-    if not query:
-        return []
-    filepath = Path(__file__).resolve().parents[1] / "data" / "BX_Books.csv"
-    
-    query = query.lower()
-    results = []
-    seen_isbn = set()
-    with open(filepath, encoding="ISO-8859-1") as file:
-        reader = csv.DictReader(file, delimiter=";")
-        for row in reader:
-            title = row['Book-Title'].lower()
-            author = row['Book-Author'].lower()
-            isbn = row['ISBN']
 
-            if isbn in seen_isbn:
-                continue
-            
-            if (query in title or query in author or query in isbn):
-                results.append({
-                    "isbn": row["ISBN"],
-                    "title": row["Book-Title"],
-                    "author": row["Book-Author"],
-                    "year": row["Year-Of-Publication"],
-                    "publisher": row["Publisher"],
-                    # "cover": row.get("Image-URL-M") 
-                })     
-                seen_isbn.add(isbn)
-            if len(results)>=10:
-                break
-        
-    return results
+def search_cache_metrics() -> Dict[str, Dict]:
+    """Hit, miss and eviction counts of the search result caches, for this worker process."""
+    return {"search": catalog_index.cache.stats(), "ranked": ranked_search.cache.stats()}
 
+
+"""Searches for books whose isbn or author or title matches the (normalized) query"""
+def search_books(query: str):
+    return catalog_index.search(query)
@@ -0,0 +1,570 @@
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from heapq import heappush, heapreplace, merge
+from math import log
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+# A last query term that prefixes more tokens than this is cheaper to answer by walking the catalog.
+PREFIX_FANOUT = 64
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens, e.g. ``"Mark P. O. Morford"`` -> ``["mark", "p", "o", "morford"]``."""
+    return _TOKEN.findall(text.lower())
+
+
+def split_query(query: str) -> Tuple[List[str], Optional[str]]:
+    """Split ``query`` into whole terms and the last one if it may still be being typed: "harry pot" -> (["harry"], "pot")."""
+    terms = tokenize(query)
+    if not terms or not _TOKEN.match(query[-1]):
+        return terms, None
+    return terms[:-1], terms[-1]
+
+
+def has_terms(text: str, complete: Sequence[str], partial: Optional[str]) -> bool:
+    """Whether ``text`` has every term in ``complete`` as a token and a token starting with ``partial``."""
+    tokens = tokenize(text)
+    if any(term not in tokens for term in complete):
+        return False
+    return partial is None or any(token.startswith(partial) for token in tokens)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Every run of three consecutive characters in ``text``; empty for shorter texts."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _insert(ids: array, doc: int) -> int:
+    """Insert ``doc`` into the ascending ``ids`` unless present; return its position, or -1 if it was there."""
+    k = bisect_left(ids, doc)
+    if k < len(ids) and ids[k] == doc:
+        return -1
+    ids.insert(k, doc)
+    return k
+
+
+def _delete(ids: array, doc: int) -> int:
+    """Remove ``doc`` from the ascending ``ids``; return the position it had, or -1 if it was not there."""
+    k = bisect_left(ids, doc)
+    if k == len(ids) or ids[k] != doc:
+        return -1
+    del ids[k]
+    return k
+
+
+def intersect(postings: Sequence[Sequence[int]]) -> Iterator[int]:
+    """Yield, in ascending order, the ids present in every one of the ascending ``postings``, driven by the shortest."""
+    if not postings:
+        return
+    lists = sorted(postings, key=len)
+    first, rest = lists[0], lists[1:]
+    starts = [0] * len(rest)
+    for doc in first:
+        for j, other in enumerate(rest):
+            k = bisect_left(other, doc, starts[j])
+            if k == len(other):
+                return
+            starts[j] = k
+            if other[k] != doc:
+                break
+        else:
+            yield doc
+
+
+class SearchIndex:
+    """Inverted index from word tokens to the ascending ids of the documents containing them."""
+
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.tokens: List[str] = []
+        self.size = 0
+
+    @classmethod
+    def build(cls, documents: Iterable[Iterable[str]]) -> "SearchIndex":
+        """Index ``documents``, each given as the texts (fields) it should be found by."""
+        index = cls()
+        postings = index.postings
+        doc = -1
+        for doc, fields in enumerate(documents):
+            seen = set()
+            for text in fields:
+                seen.update(tokenize(text))
+            for token in seen:
+                ids = postings.get(token)
+                if ids is None:
+                    ids = postings[token] = array("I")
+                ids.append(doc)
+        index.size = doc + 1
+        index.tokens = sorted(postings)
+        return index
+
+    def add(self, doc: int, fields: Iterable[str]):
+        """Index one more document, or the new version of one removed with ``remove``."""
+        for token in {t for text in fields for t in tokenize(text)}:
+            ids = self.postings.get(token)
+            if ids is None:
+                self.postings[token] = array("I", [doc])
+                self.tokens.insert(bisect_left(self.tokens, token), token)
+            else:
+                _insert(ids, doc)
+        self.size = max(self.size, doc + 1)
+
+    def remove(self, doc: int, fields: Iterable[str]):
+        """Drop ``doc``, given the fields it was indexed with, from the postings."""
+        for token in {t for text in fields for t in tokenize(text)}:
+            ids = self.postings.get(token)
+            if ids is not None and _delete(ids, doc) >= 0 and not ids:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def _with_prefix(self, prefix: str) -> List[str]:
+        start = bisect_left(self.tokens, prefix)
+        end = start
+        while end < len(self.tokens) and self.tokens[end].startswith(prefix):
+            end += 1
+            if end - start > PREFIX_FANOUT:
+                break
+        return self.tokens[start:end]
+
+    def candidates(self, query: str) -> Optional[Iterator[int]]:
+        """Ids of the documents that can match ``query``, ascending, or None to mean "all of them"."""
+        complete, partial = split_query(query)
+        if not complete and partial is None:
+            return None
+
+        lists = []
+        for term in complete:
+            ids = self.postings.get(term)
+            if ids is None:
+                return iter(())
+            lists.append(ids)
+        if lists:
+            # The partial term is checked by the caller's match rule on the few survivors.
+            return intersect(lists)
+
+        tokens = self._with_prefix(partial)
+        if len(tokens) > PREFIX_FANOUT:
+            return None
+        return _unique(merge(*(self.postings[t] for t in tokens)))
+
+
+class TrigramIndex:
+    """Index from three-character runs to the ids of the documents whose fields contain them."""
+
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.size = 0
+
+    @classmethod
+    def build(cls, documents: Iterable[Iterable[str]]) -> "TrigramIndex":
+        """Index ``documents``, each given as its normalized fields."""
+        index = cls()
+        postings = index.postings
+        doc = -1
+        for doc, fields in enumerate(documents):
+            grams = set()
+            for text in fields:
+                grams.update(trigrams(text))
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array("I")
+                ids.append(doc)
+        index.size = doc + 1
+        return index
+
+    def add(self, doc: int, fields: Iterable[str]):
+        """Index one more document, or the new version of one removed with ``remove``."""
+        for gram in {g for text in fields for g in trigrams(text)}:
+            ids = self.postings.get(gram)
+            if ids is None:
+                self.postings[gram] = array("I", [doc])
+            else:
+                _insert(ids, doc)
+        self.size = max(self.size, doc + 1)
+
+    def remove(self, doc: int, fields: Iterable[str]):
+        """Drop ``doc``, given the fields it was indexed with, from the postings."""
+        for gram in {g for text in fields for g in trigrams(text)}:
+            ids = self.postings.get(gram)
+            if ids is not None and _delete(ids, doc) >= 0 and not ids:
+                del self.postings[gram]
+
+    def candidates(self, query: str) -> Optional[Iterator[int]]:
+        """Ids of the documents with every trigram of ``query``, ascending, or None to mean "all of them"."""
+        grams = trigrams(query)
+        if not grams:
+            return None
+        lists = []
+        for gram in grams:
+            ids = self.postings.get(gram)
+            if ids is None:
+                return iter(())
+            lists.append(ids)
+        return intersect(lists)
+
+
+class RankedIndex:
+    """BM25F index over documents of weighted fields, with each posting's query-independent impact precomputed."""
+
+    K1 = 1.2
+    B = 0.75
+    # Posting lists at least this long also keep their positions sorted best first.
+    ORDERED_POSTINGS = 1024
+
+    def __init__(self, weights: Sequence[float] = (1.0,)):
+        self.postings: Dict[str, Tuple[array, array, Optional[array]]] = {}
+        self.weights = list(weights)
+        # Total length of each field over all documents, for the average lengths.
+        self.totals = [0] * len(self.weights)
+        self.size = 0
+
+    def _term_counts(self, texts: Sequence[str]) -> Tuple[Dict[str, List[int]], List[int]]:
+        """({term: [count in each field]}, [length of each field]) for one document."""
+        tf: Dict[str, List[int]] = {}
+        lengths = []
+        for f in range(len(self.weights)):
+            text = texts[f] if f < len(texts) else ""
+            tokens = tokenize(text) if text else []
+            lengths.append(len(tokens))
+            for token in tokens:
+                per_field = tf.get(token)
+                if per_field is None:
+                    per_field = tf[token] = [0] * len(self.weights)
+                per_field[f] += 1
+        return tf, lengths
+
+    def _impact(self, df: int, per_field: Sequence[int], norms: Sequence[float]) -> float:
+        idf = log(1 + (self.size - df + 0.5) / (df + 0.5))
+        weighted = sum(w * n / norm for w, n, norm in zip(self.weights, per_field, norms) if n)
+        return idf * weighted / (self.K1 + weighted)
+
+    def _norm(self, f: int, length: int) -> float:
+        average = (self.totals[f] / self.size if self.size else 0) or 1
+        return 1 - self.B + self.B * length / average
+
+    @classmethod
+    def build(cls, documents: Iterable[Sequence[str]], weights: Sequence[float]) -> "RankedIndex":
+        """Index ``documents``, each a sequence of field texts matching ``weights``; missing fields are empty."""
+        index = cls(weights)
+        fields = range(len(weights))
+        lengths = [array("I") for _ in fields]
+        counts: Dict[str, Tuple[array, List[array]]] = {}
+        doc = -1
+        for doc, texts in enumerate(documents):
+            tf, doc_lengths = index._term_counts(texts)
+            for f in fields:
+                lengths[f].append(doc_lengths[f])
+            for token, per_field in tf.items():
+                entry = counts.get(token)
+                if entry is None:
+                    entry = counts[token] = (array("I"), [array("H") for _ in fields])
+                entry[0].append(doc)
+                for f in fields:
+                    entry[1][f].append(min(per_field[f], 0xFFFF))
+
+        index.size = doc + 1
+        index.totals = [sum(lengths[f]) for f in fields]
+        norms = [array("f", (index._norm(f, n) for n in lengths[f])) for f in fields]
+        for token, (ids, tfs) in counts.items():
+            impacts = array("f")
+            for j, doc in enumerate(ids):
+                impacts.append(index._impact(len(ids), [tfs[f][j] for f in fields], [norms[f][doc] for f in fields]))
+            order = None
+            if len(ids) >= cls.ORDERED_POSTINGS:
+                order = array("I", sorted(range(len(ids)), key=lambda j: -impacts[j]))
+            index.postings[token] = (ids, impacts, order)
+        return index
+
+    def add(self, doc: int, texts: Sequence[str]):
+        """Index one more document, or the new version of a removed one, with the collection statistics as they are now."""
+        tf, lengths = self._term_counts(texts)
+        self.size = max(self.size, doc + 1)
+        for f, n in enumerate(lengths):
+            self.totals[f] += n
+        norms = [self._norm(f, n) for f, n in enumerate(lengths)]
+        for token, per_field in tf.items():
+            entry = self.postings.get(token)
+            df = len(entry[0]) + 1 if entry else 1
+            impact = self._impact(df, per_field, norms)
+            if entry is None:
+                self.postings[token] = (array("I", [doc]), array("f", [impact]), None)
+                continue
+            ids, impacts, _ = entry
+            k = _insert(ids, doc)
+            if k < 0:
+                impacts[bisect_left(ids, doc)] = impact
+            else:
+                impacts.insert(k, impact)
+            self.postings[token] = (ids, impacts, None)
+
+    def remove(self, doc: int, texts: Sequence[str]):
+        """Drop ``doc``, given the field texts it was indexed with, from the postings and the length totals."""
+        tf, lengths = self._term_counts(texts)
+        for f, n in enumerate(lengths):
+            self.totals[f] -= n
+        for token in tf:
+            entry = self.postings.get(token)
+            if entry is None:
+                continue
+            ids, impacts, _ = entry
+            k = _delete(ids, doc)
+            if k < 0:
+                continue
+            del impacts[k]
+            if ids:
+                self.postings[token] = (ids, impacts, None)
+            else:
+                del self.postings[token]
+
+    def _scored(self, lists: List[Tuple[array, Optional[array], Optional[array]]]) -> Iterator[Tuple[float, int]]:
+        first, rest = lists[0], lists[1:]
+        starts = [0] * len(rest)
+        first_ids, first_impacts = first[0], first[1]
+        for i, doc in enumerate(first_ids):
+            score = first_impacts[i] if first_impacts is not None else 0.0
+            for j, (ids, impacts, _) in enumerate(rest):
+                k = bisect_left(ids, doc, starts[j])
+                if k == len(ids):
+                    return
+                starts[j] = k
+                if ids[k] != doc:
+                    break
+                if impacts is not None:
+                    score += impacts[k]
+            else:
+                yield score, doc
+
+    def search(self, query: str, offset: int = 0, limit: int = 10,
+               restrict: Sequence[Sequence[int]] = (), accept: Optional[Callable[[int], bool]] = None,
+               matched: Optional[List[int]] = None) -> Tuple[int, List[Tuple[int, float]]]:
+        """Return (number of matches, [(doc, score), ...]) for one page of the documents with every word of ``query``."""
+        lists = []
+        for term in dict.fromkeys(tokenize(query)):
+            entry = self.postings.get(term)
+            if entry is None:
+                return 0, []
+            lists.append(entry)
+        if not lists:
+            return 0, []
+        if len(lists) == 1 and lists[0][2] is not None and not restrict and accept is None and matched is None:
+            ids, impacts, order = lists[0]
+            return len(ids), [(ids[j], impacts[j]) for j in order[offset:offset + limit]]
+        lists.extend((ids, None, None) for ids in restrict)
+        lists.sort(key=lambda entry: len(entry[0]))
+
+        keep = offset + limit
+        heap: List[Tuple[float, int]] = []
+        total = 0
+        for score, doc in self._scored(lists):
+            if accept is not None and not accept(doc):
+                continue
+            if matched is not None:
+                matched.append(doc)
+            total += 1
+            item = (score, -doc)
+            if len(heap) < keep:
+                heappush(heap, item)
+            elif heap and item > heap[0]:
+                heapreplace(heap, item)
+        page = sorted(heap, reverse=True)[offset:]
+        return total, [(-doc, score) for score, doc in page]
+
+
+class FacetIndex:
+    """One facet of a document collection (e.g. publisher): each document's value, and each value's documents."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes = array("I")
+        self.postings: Dict[str, array] = {}
+        self._code_of: Dict[str, int] = {}
+
+    def _code(self, value: str) -> int:
+        code = self._code_of.get(value)
+        if code is None:
+            code = self._code_of[value] = len(self.values)
+            self.values.append(value)
+            self.postings[value] = array("I")
+        return code
+
+    @classmethod
+    def build(cls, values: Iterable[Optional[str]]) -> "FacetIndex":
+        """Index each document's value, in document order; None or "" means the document has none."""
+        index = cls()
+        for doc, value in enumerate(values):
+            if not value:
+                index.codes.append(0)
+                continue
+            index.codes.append(index._code(value))
+            index.postings[value].append(doc)
+        return index
+
+    def set(self, doc: int, value: Optional[str]):
+        """Give ``doc``, an indexed document or the next one, the value ``value`` (None or "" for none)."""
+        if doc == len(self.codes):
+            self.codes.append(0)
+        old = self.values[self.codes[doc]]
+        if old is not None:
+            _delete(self.postings[old], doc)
+        if not value:
+            self.codes[doc] = 0
+            return
+        self.codes[doc] = self._code(value)
+        _insert(self.postings[value], doc)
+
+    def ids(self, value: str) -> Sequence[int]:
+        return self.postings.get(value, ())
+
+    def count(self, docs: Iterable[int], top: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(value, number of ``docs`` with it), most common first, for the ``top`` most common values or all."""
+        codes = self.codes
+        tally = Counter(codes[doc] for doc in docs)
+        tally.pop(0, None)
+        ranked = sorted(tally.items(), key=lambda item: (-item[1], item[0]))
+        if top is not None:
+            ranked = ranked[:top]
+        return [(self.values[code], n) for code, n in ranked]
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment distance between ``a`` and ``b``, or ``limit + 1`` once it is known to exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if cost and before is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    found = {word}
+    edge = {word}
+    for _ in range(distance):
+        edge = {w[:i] + w[i + 1:] for w in edge for i in range(len(w)) if len(w) > 1} - found
+        found |= edge
+    return found
+
+
+class SpellingIndex:
+    """Symmetric-delete (SymSpell) spelling suggestions for a vocabulary of words with frequencies."""
+
+    MAX_DISTANCE = 2
+    PREFIX_LENGTH = 7
+    _ID_BITS = 24
+    _HASH_BITS = 39
+    _BUCKET_BITS = 12
+
+    def __init__(self):
+        self.words: List[str] = []
+        self.counts = array("I")
+        self.known: Dict[str, int] = {}
+        self.codes = array("q")
+        self.starts = array("I", [0] * ((1 << self._BUCKET_BITS) + 1))
+        self.added: Dict[int, List[int]] = {}
+
+    @classmethod
+    def _hash(cls, key: str) -> int:
+        return hash(key) & ((1 << cls._HASH_BITS) - 1)
+
+    @classmethod
+    def build(cls, vocabulary: Iterable[Tuple[str, int]]) -> "SpellingIndex":
+        """Index ``vocabulary``, given as (word, frequency) pairs."""
+        index = cls()
+        shift = cls._HASH_BITS - cls._BUCKET_BITS
+        buckets = [array("q") for _ in range(1 << cls._BUCKET_BITS)]
+        for word, count in vocabulary:
+            wid = index.known[word] = len(index.words)
+            if wid >> cls._ID_BITS:
+                raise ValueError("vocabulary too large for a SpellingIndex")
+            index.words.append(word)
+            index.counts.append(count)
+            for key in _deletes(word[:cls.PREFIX_LENGTH], cls.MAX_DISTANCE):
+                h = cls._hash(key)
+                buckets[h >> shift].append(h << cls._ID_BITS | wid)
+        for b, bucket in enumerate(buckets):
+            # Sorted one bucket at a time, so building never holds more than one bucket as a list.
+            index.codes.extend(sorted(bucket))
+            index.starts[b + 1] = len(index.codes)
+            buckets[b] = None
+        return index
+
+    def adjust(self, word: str, delta: int):
+        """Change ``word``'s frequency by ``delta``, adding it if it is new."""
+        wid = self.known.get(word)
+        if wid is None:
+            if delta <= 0:
+                return
+            wid = self.known[word] = len(self.words)
+            if wid >> self._ID_BITS:
+                raise ValueError("vocabulary too large for a SpellingIndex")
+            self.words.append(word)
+            self.counts.append(0)
+            for key in _deletes(word[:self.PREFIX_LENGTH], self.MAX_DISTANCE):
+                self.added.setdefault(self._hash(key), []).append(wid)
+        self.counts[wid] = max(self.counts[wid] + delta, 0)
+
+    def _filed_under(self, key: str) -> Iterator[int]:
+        h = self._hash(key)
+        b = h >> (self._HASH_BITS - self._BUCKET_BITS)
+        end = self.starts[b + 1]
+        i = bisect_left(self.codes, h << self._ID_BITS, self.starts[b], end)
+        while i < end and self.codes[i] >> self._ID_BITS == h:
+            yield self.codes[i] & ((1 << self._ID_BITS) - 1)
+            i += 1
+        yield from self.added.get(h, ())
+
+    @classmethod
+    def allowed_distance(cls, word: str) -> int:
+        """How many edits a suggestion for ``word`` may be away: none below 3 letters, one below 6."""
+        return 0 if len(word) < 3 else 1 if len(word) < 6 else cls.MAX_DISTANCE
+
+    def suggest(self, word: str) -> Optional[str]:
+        """The known word closest to ``word``, most frequent first among equals, or None if none is close enough."""
+        wid = self.known.get(word)
+        if wid is not None and self.counts[wid]:
+            return word
+        limit = self.allowed_distance(word)
+        if not limit:
+            return None
+        seen = set()
+        best = None
+        for key in _deletes(word[:self.PREFIX_LENGTH], limit):
+            for wid in self._filed_under(key):
+                if wid in seen or not self.counts[wid]:
+                    continue
+                seen.add(wid)
+                distance = edit_distance(word, self.words[wid], limit)
+                if distance <= limit:
+                    rank = (distance, -self.counts[wid], self.words[wid])
+                    if best is None or rank < best:
+                        best = rank
+        return best[2] if best else None
+
+    def correct(self, query: str) -> Optional[str]:
+        """``query``'s words with the unknown ones replaced by suggestions, or None if nothing (more) can be fixed."""
+        words = tokenize(query)
+        corrected = [self.suggest(word) for word in words]
+        if not words or None in corrected or corrected == words:
+            return None
+        return " ".join(corrected)
+
+
+def _unique(ids: Iterable[int]) -> Iterator[int]:
+    last = -1
+    for doc in ids:
+        if doc != last:
+            yield doc
+            last = doc
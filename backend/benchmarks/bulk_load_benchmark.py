@@ -0,0 +1,63 @@
+"""
+Cold-load time of a BX-style catalog, parsed on one core versus by the bulk loader's process pool.
+
+A synthetic ``BX_Books.csv`` (semicolons, Latin-1, some quoted fields) is
+written to a temporary directory and loaded with ``bulk_loader.read_rows``
+once per worker count. Use it to decide whether ``BULK_LOAD_WORKERS`` is
+worth raising on a given machine; pickling the rows back often outweighs
+the parallel parse.
+
+    python -m benchmarks.bulk_load_benchmark [--rows 270000] [--workers 1 2 4 8]
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from app.repositories import bulk_loader
+
+FIELDS = ["ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher",
+          "Image-URL-S", "Image-URL-M", "Image-URL-L"]
+
+
+def _write_catalog(path: str, rows: int):
+    rng = random.Random(7)
+    words = ["the", "caf\xe9", "night", "river", "garden", "\"quoted\"", "of", "stars", "m\xfcller"]
+    with open(path, "w", newline="", encoding="latin-1") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(FIELDS)
+        for i in range(rows):
+            isbn = f"{i:010d}"
+            url = f"http://images.amazon.com/images/P/{isbn}.01.MZZZZZZZ.jpg"
+            writer.writerow([
+                isbn,
+                " ".join(rng.choice(words) for _ in range(rng.randint(2, 8))),
+                f"Author {rng.randint(1, 50000)}",
+                str(rng.randint(1900, 2004)),
+                f"Publisher; {rng.randint(1, 5000)}",
+                url, url, url,
+            ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=270000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "BX_Books.csv")
+        _write_catalog(path, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB, {os.cpu_count()} cores")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            started = time.perf_counter()
+            _, rows = bulk_loader.read_rows(path, "latin-1", ";", workers=workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"workers={workers:<3} {elapsed:7.2f}s  x{baseline / elapsed:.2f}  ({len(rows)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Read throughput of CSVRepository with reader-writer locking versus one exclusive lock.
+
+Each reader thread repeatedly looks up the reviews of a random book, the way
+``GET /reviews/{isbn}`` does, while one writer appends a review every few
+milliseconds. The same workload runs once with ``FileLock`` (shared locks for
+readers) and once with every acquisition forced to be exclusive, which is how
+the repository behaved before.
+
+    python -m benchmarks.rwlock_benchmark [--rows 20000] [--seconds 3] [--stream]
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import threading
+import time
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.file_lock import FileLock
+
+FIELDS = ["ReviewID", "UserID", "ISBN", "Text"]
+READERS = [8, 32, 64]
+
+
+class _ExclusiveFileLock(FileLock):
+    def shared(self):
+        return self.exclusive()
+
+
+class _ExclusiveRepository(CSVRepository):
+    _exclusive_locks = {}
+
+    def _get_lock(self, path):
+        key = os.path.abspath(path)
+        if key not in self._exclusive_locks:
+            self._exclusive_locks[key] = _ExclusiveFileLock(key)
+        return self._exclusive_locks[key]
+
+
+def _make_table(path: str, rows: int, books: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for i in range(rows):
+            writer.writerow([i + 1, random.randrange(1000), f"isbn{random.randrange(books)}", "x" * 40])
+
+
+def _run(repo: CSVRepository, path: str, readers: int, seconds: float, books: int) -> float:
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def reader(slot: int):
+        rng = random.Random(slot)
+        while not stop.is_set():
+            list(repo.iter_rows(path, where={"ISBN": f"isbn{rng.randrange(books)}"}))
+            counts[slot] += 1
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            n += 1
+            repo.append_row(path, FIELDS, {"ReviewID": f"w{n}", "UserID": 0, "ISBN": "isbn0", "Text": "new"})
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--stream", action="store_true", help="run with CSV_CACHE=0 behaviour (parse on every read)")
+    args = parser.parse_args()
+
+    CSVRepository.cache_tables = not args.stream
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'readers':>8} {'exclusive/s':>12} {'rwlock/s':>12} {'speedup':>8}")
+        for readers in READERS:
+            results = []
+            for repo in (_ExclusiveRepository(), CSVRepository()):
+                path = os.path.join(tmp, f"Reviews_{readers}_{type(repo).__name__}.csv")
+                _make_table(path, args.rows, args.books)
+                repo.read_all(path)
+                results.append(_run(repo, path, readers, args.seconds, args.books))
+            exclusive, shared = results
+            print(f"{readers:>8} {exclusive:>12.0f} {shared:>12.0f} {shared / exclusive:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
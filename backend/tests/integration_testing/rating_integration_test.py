@@ -1,5 +1,4 @@
 import csv
-import os
 import pytest
 from fastapi.testclient import TestClient
 
@@ -8,31 +7,17 @@ from app.routers import rating_router
 
 
 @pytest.fixture(autouse=True)
-def prepare_csv_for_testing():
+def prepare_csv_for_testing(tmp_path, monkeypatch):
     """
-    Integration fixture for ratings, will reset Ratings.csv before each test and restore it afterward.
+    Integration fixture for ratings, points the service at an empty Ratings.csv in a temporary directory for each test.
     """
-    path = rating_router.service.ratings_path
-
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            original_contents = f.read()
-    except FileNotFoundError:
-        original_contents = None
+    path = str(tmp_path / "Ratings.csv")
+    monkeypatch.setattr(rating_router.service, "ratings_path", path)
 
     with open(path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=rating_router.service.fields)
         writer.writeheader()
 
-    yield
-
-    if original_contents is None:
-        if os.path.exists(path):
-            os.remove(path)
-    else:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(original_contents)
-
 
 @pytest.fixture
 def client():
@@ -5,14 +5,10 @@ from app.main import app
 from app.routers import readinglist_router
 
 @pytest.fixture(autouse = True)
-def prepare_csv_for_testing(tmp_path):
-    path = readinglist_router.service.path
-
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            original_contents = f.read()
-    except FileNotFoundError:
-        original_contents = None 
+def prepare_csv_for_testing(tmp_path, monkeypatch):
+    path = str(tmp_path / "ReadingLists.csv")
+    monkeypatch.setattr(readinglist_router.service, "path", path)
+
     with open(path, "w", newline = "", encoding = "utf-8") as f:
         writer = csv.DictWriter(
             f,
@@ -26,16 +22,6 @@ def prepare_csv_for_testing(tmp_path):
         )
         writer.writeheader()
 
-    yield
-
-    if original_contents is None:
-        import os
-        if os.path.exists(path):
-            os.remove(path)
-    else:
-        with open(path, "w", encoding = "utf-8") as f:
-            f.write(original_contents)
-
 @pytest.fixture
 def client():
     return TestClient(app)
@@ -1,5 +1,4 @@
 import csv
-import os
 import pytest
 from fastapi.testclient import TestClient
 
@@ -8,33 +7,19 @@ from app.routers import review_router
 
 
 @pytest.fixture(autouse=True)
-def prepare_reviews_csv_for_testing():
+def prepare_reviews_csv_for_testing(tmp_path, monkeypatch):
     """
-    Reset Reviews.csv to an empty file with header before each test,
-    then restore or remove it afterward.
+    Point the review service at an empty Reviews.csv in a temporary
+    directory for each test, so the real data directory is never touched.
     """
-    path = review_router.service.path
+    path = str(tmp_path / "Reviews.csv")
+    monkeypatch.setattr(review_router.service, "path", path)
     fields = review_router.service.fields
 
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            original_contents = f.read()
-    except FileNotFoundError:
-        original_contents = None
-
     with open(path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fields)
         writer.writeheader()
 
-    yield
-
-    if original_contents is None:
-        if os.path.exists(path):
-            os.remove(path)
-    else:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(original_contents)
-
 
 @pytest.fixture
 def client():
@@ -16,3 +16,64 @@ def test_search_route_one_result():
     
 # r = client.get("/search/Nonexistent")
 # print(r.json())
+
+
+def test_search_as_you_type_route(tmp_path, monkeypatch):
+    import app.main as main
+    from app.utils.search import Autocomplete, CatalogIndex
+
+    catalog = tmp_path / "BX_Books.csv"
+    catalog.write_text(
+        "ISBN;Book-Title;Book-Author;Year-Of-Publication;Publisher\n"
+        "0156659751;The Nonexistent Knight and The Cloven Viscount;Italo Calvino;1977;Harcourt\n",
+        encoding="latin-1",
+    )
+    monkeypatch.setattr(main, "autocomplete", Autocomplete(CatalogIndex(str(catalog)), dict))
+
+    r = client.get("/search", params={"q": "nonex"})
+    assert r.status_code == 200
+    assert r.json() == {"results": [{"text": "The Nonexistent Knight and The Cloven Viscount",
+                                     "field": "title", "ratings": 0, "isbn": "0156659751"}]}
+    assert client.get("/search", params={"q": "percy"}).json() == {"result": [], "message": "No matching books found"}
+    assert client.get("/search", params={"q": "i", "limit": 0}).status_code == 422
+
+
+def test_ranked_search_route(tmp_path, monkeypatch):
+    import app.main as main
+    from app.utils.search import CatalogIndex, RankedSearch
+
+    catalog = tmp_path / "BX_Books.csv"
+    catalog.write_text(
+        "ISBN;Book-Title;Book-Author;Year-Of-Publication;Publisher\n"
+        "0195153448;Classical Mythology;Mark P. O. Morford;2002;Oxford University Press\n"
+        "0156659751;The Nonexistent Knight and The Cloven Viscount;Italo Calvino;1977;Harcourt\n",
+        encoding="latin-1",
+    )
+    monkeypatch.setattr(main, "ranked_search", RankedSearch(CatalogIndex(str(catalog))))
+
+    r = client.get("/v2/search/nonexistent knight", params={"limit": 5})
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["total"], body["offset"], body["limit"]) == (1, 0, 5)
+    assert body["results"][0]["isbn"] == "0156659751"
+    assert client.get("/v2/search/mythology", params={"offset": 1}).json()["results"] == []
+    assert client.get("/v2/search/mythologie").json()["did_you_mean"] == "mythology"
+
+    faceted = client.get("/v2/search/the", params={"year_to": 1990, "facets": True}).json()
+    assert faceted["total"] == 1
+    assert faceted["facets"]["publisher"] == [{"value": "Harcourt", "count": 1}]
+    assert client.get("/v2/search/the", params={"publisher": "Penguin"}).json()["total"] == 0
+    assert client.get("/v2/search/x", params={"offset": -1}).status_code == 422
+
+
+def test_search_cache_metrics_route():
+    response = client.get("/metrics/search-cache")
+    assert response.status_code == 200
+    assert set(response.json()) == {"search", "ranked"}
+    assert {"hits", "misses", "size", "maxsize"} <= set(response.json()["search"])
+
+
+def test_lock_metrics_route():
+    response = client.get("/metrics/locks")
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
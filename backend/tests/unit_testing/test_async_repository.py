@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.repositories import async_repository
+from app.repositories.async_repository import AsyncRepository, run_io
+from app.repositories.csv_repository import CSVRepository
+from app.services.async_service import AsyncService
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+def test_async_repository_round_trip(tmp_path):
+    path = str(tmp_path / "Ratings.csv")
+    repo = AsyncRepository(CSVRepository())
+
+    async def scenario():
+        await repo.write_all(path, FIELDS, [{"UserID": "1", "ISBN": "a", "Book-Rating": "5"}])
+        await repo.append_row(path, FIELDS, {"UserID": "2", "ISBN": "b", "Book-Rating": "3"})
+        assert await repo.update_where(path, {"ISBN": "b"}, {"Book-Rating": "4"}) == 1
+        found = await repo.iter_rows(path, where={"UserID": "2"}, columns=["Book-Rating"])
+        one = await repo.read_one(path, "ISBN", "a")
+        assert await repo.delete_where(path, {"ISBN": "a"}) == 1
+        return found, one, await repo.read_all(path)
+
+    found, one, rows = asyncio.run(scenario())
+    assert found == [{"Book-Rating": "4"}]
+    assert one["UserID"] == "1"
+    assert rows == [{"UserID": "2", "ISBN": "b", "Book-Rating": "4"}]
+
+
+def test_run_io_uses_the_io_executor_and_leaves_the_loop_free():
+    loop_thread = threading.get_ident()
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    def blocking():
+        time.sleep(0.1)
+        return threading.current_thread().name
+
+    async def scenario():
+        name, _ = await asyncio.gather(run_io(blocking), ticker())
+        return name
+
+    name = asyncio.run(scenario())
+    assert name.startswith("repo-io")
+    assert len(ticks) == 5
+    assert threading.get_ident() == loop_thread
+
+
+def test_io_executor_is_bounded(monkeypatch):
+    monkeypatch.setattr(async_repository, "IO_THREADS", 2)
+    monkeypatch.setattr(async_repository, "_executor", None)
+    running = []
+    peak = []
+    guard = threading.Lock()
+
+    def work():
+        with guard:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with guard:
+            running.pop()
+
+    async def scenario():
+        await asyncio.gather(*(run_io(work) for _ in range(6)))
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        async_repository.shutdown_io_executor()
+    assert max(peak) == 2
+
+
+class _Service:
+    def __init__(self):
+        self.path = "Ratings.csv"
+
+    def get(self, value):
+        return (value, threading.current_thread().name)
+
+    def fail(self):
+        raise ValueError("nope")
+
+
+def test_async_service_proxies_methods_and_attributes():
+    service = _Service()
+    proxy = AsyncService(service)
+
+    value, thread = asyncio.run(proxy.get(7))
+    assert value == 7
+    assert thread.startswith("repo-io")
+
+    service.path = "elsewhere.csv"
+    assert proxy.path == "elsewhere.csv"
+
+    with pytest.raises(ValueError, match="nope"):
+        asyncio.run(proxy.fail())
@@ -86,6 +86,19 @@ def test_update_book_success(percy):
     assert updated_book.author == "Updated Author"
 
 
+def test_update_book_changes_every_row_with_the_isbn(percy):
+    service.create_book(percy)
+    # The Book-Crossing catalog lists some ISBNs more than once.
+    with open(service.path, "a", encoding="latin-1", newline="") as f:
+        f.write(f"{percy.isbn};Percy Jackson (Reprint);Rick Riordan;2006;Hyperion;;;\n")
+
+    service.update_book(percy.isbn, BookUpdate(book_title="Updated Book"))
+
+    with open(service.path, encoding="latin-1", newline="") as f:
+        titles = [r["Book-Title"] for r in csv.DictReader(f, delimiter=";")]
+    assert titles == ["Updated Book", "Updated Book"]
+
+
 def test_delete_book_success(percy):
     service.create_book(percy)
 
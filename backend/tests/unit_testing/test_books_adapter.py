@@ -87,8 +87,10 @@ def test_fault_injection_corrupt_bytes(adapter, tmp_path):
 # Mocking: intercept write_all to verify semicolon behavior
 # ---------------------------------------------------------------------------
 
-def test_write_all_uses_semicolon_with_mock(monkeypatch, adapter):
-    
+def test_write_all_uses_semicolon_with_mock(monkeypatch, adapter, tmp_path):
+    # Keep the lock file the write creates out of the working tree.
+    monkeypatch.chdir(tmp_path)
+
     captured = {"text": ""}
 
     class FakeFile:
@@ -102,6 +104,8 @@ def test_write_all_uses_semicolon_with_mock(monkeypatch, adapter):
             captured["text"] = "".join(self.buffer)
 
     monkeypatch.setattr("builtins.open", lambda *a, **kw: FakeFile())
+    # write_all renames its temporary file into place; there is no real file to rename.
+    monkeypatch.setattr("os.replace", lambda *a, **kw: None)
 
     fieldnames = ["ISBN", "Book-Title"]
     rows = [{"ISBN": "123", "Book-Title": "Mocked"}]
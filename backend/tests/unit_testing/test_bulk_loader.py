@@ -0,0 +1,85 @@
+import csv
+import pytest
+from app.repositories import bulk_loader
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.csv_repository import CSVRepository
+
+BX_FIELDS = ["ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher"]
+
+
+@pytest.fixture
+def bx_path(tmp_path):
+    p = tmp_path / "BX_Books.csv"
+    with open(p, "w", newline="", encoding="latin-1") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(BX_FIELDS)
+        for i in range(200):
+            title = f"Caf\xe9 {i}; part \"{i}\"" if i % 7 else f"Line one\nline two {i}"
+            writer.writerow([f"{i:010d}", title, "Ren\xe9e", str(1950 + i % 50), "Pub"])
+        writer.writerow(["short"])
+        writer.writerow(["0000009999", "t", "a", "2000", "p", "surplus"])
+        f.write("\r\n")
+    return p
+
+
+def _dict_reader(path):
+    with open(path, newline="", encoding="latin-1") as f:
+        reader = csv.DictReader(f, delimiter=";")
+        return reader.fieldnames, list(reader)
+
+
+def test_split_ranges_never_cuts_inside_quotes(bx_path):
+    data = bx_path.read_bytes()
+    body = bulk_loader._header_end(data)
+    ranges = bulk_loader.split_ranges(data, body, 16)
+
+    assert ranges[0][0] == body and ranges[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    for start, end in ranges:
+        assert data.count(b'"', start, end) % 2 == 0
+        assert data[end - 1:end] == b"\n"
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_read_rows_matches_dict_reader(bx_path, workers):
+    assert bulk_loader.read_rows(bx_path, "latin-1", ";", workers=workers) == _dict_reader(bx_path)
+
+
+@pytest.mark.parametrize("bulk_load", [False, True])
+def test_only_bulk_load_repositories_use_the_pool(bx_path, monkeypatch, bulk_load):
+    monkeypatch.setattr(bulk_loader, "BULK_LOAD_MIN_BYTES", 0)
+    monkeypatch.setattr(bulk_loader, "BULK_LOAD_WORKERS", 2)
+    calls = []
+    real = bulk_loader.read_rows
+    monkeypatch.setattr(bulk_loader, "read_rows", lambda *a, **k: calls.append(a) or real(*a, **k))
+    CSVRepository._cache.clear()
+    repo = BXBooksCSVAdapter()
+    repo.bulk_load = bulk_load
+
+    rows = repo.read_all(str(bx_path))
+
+    assert bool(calls) == bulk_load
+    assert rows == _dict_reader(bx_path)[1]
+
+
+def test_stray_quote_in_an_unquoted_field_falls_back_to_one_worker(tmp_path, monkeypatch):
+    p = tmp_path / "BX_Books.csv"
+    with open(p, "w", newline="", encoding="latin-1") as f:
+        f.write(";".join(BX_FIELDS) + "\n")
+        for i in range(100):
+            # csv reads the 12" literally; counting quotes would cut inside the next record.
+            f.write(f'{i:010d};Vinyl 12" Edition;Ann;2000;Pub\n')
+            f.write(f'{i:010d};"Two\nlines";Bob;2001;Pub\n')
+    data = p.read_bytes()
+    assert not bulk_loader.quotes_are_structural(data, bulk_loader._header_end(data), b";")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the pool must not be used")
+
+    monkeypatch.setattr(bulk_loader, "ProcessPoolExecutor", fail)
+    assert bulk_loader.read_rows(p, "latin-1", ";", workers=4) == _dict_reader(p)
+
+
+def test_regular_quoting_is_structural(bx_path):
+    data = bx_path.read_bytes()
+    assert bulk_loader.quotes_are_structural(data, bulk_loader._header_end(data), b";")
@@ -0,0 +1,87 @@
+import csv
+import pytest
+from app.repositories import books_adapter
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.catalog_snapshot import build_snapshot, load_snapshot
+from app.services.book_service import BookService
+
+FIELDS = [
+    "ISBN", "Book-Title", "Book-Author", "Year-Of-Publication",
+    "Publisher", "Image-URL-S", "Image-URL-M", "Image-URL-L",
+]
+
+BOOKS = [
+    ["0195153448", "Classical Mythology", "Mark P. O. Morford", "2002", "Oxford University Press", "S1", "M1", "L1"],
+    ["0002005018", "Clara Callan", "Richard Bruce Wright", "2001", "HarperFlamingo Canada", "S2", "M2", "L2"],
+    ["0801319536", "Classical Mythology", "Mark P. O. Morford", "1998", "John Wiley & Sons", "S3", "M3", "L3"],
+    ["0060973129", "Caf\xe9; \"Decision\" in Normandy", "Carlo D'Este", "1991", "HarperPerennial", "", "", ""],
+]
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "BX_Books.csv")
+    with open(p, "w", encoding="latin-1", newline="") as f:
+        writer = csv.writer(f, delimiter=";", quoting=csv.QUOTE_ALL)
+        writer.writerow(FIELDS)
+        writer.writerows(BOOKS)
+    return p
+
+
+def test_snapshot_rows_match_csv(path):
+    build_snapshot(path)
+    snapshot = load_snapshot(path)
+
+    assert len(snapshot) == len(BOOKS)
+    assert list(snapshot.rows()) == BXBooksCSVAdapter().read_all(path)
+    assert snapshot.column("Book-Author")[2] == "Mark P. O. Morford"
+    snapshot.close()
+
+
+def test_snapshot_find_by_isbn(path):
+    build_snapshot(path)
+    snapshot = load_snapshot(path)
+
+    assert snapshot.get("0801319536")["Year-Of-Publication"] == "1998"
+    assert snapshot.find("0060973129") == 3
+    assert snapshot.get("9999999999") is None
+    snapshot.close()
+
+
+def test_snapshot_is_stale_after_csv_changes(path):
+    build_snapshot(path)
+    BXBooksCSVAdapter().append_row(path, FIELDS, dict(zip(FIELDS, ["1111111111", "New", "A", "", "", "", "", ""])))
+
+    assert load_snapshot(path) is None
+    assert BXBooksCSVAdapter().snapshot(path) is None
+
+
+def test_missing_snapshot_returns_none(path):
+    assert load_snapshot(path) is None
+
+
+def test_stale_snapshot_is_not_reopened_until_something_changes(path, monkeypatch):
+    adapter = BXBooksCSVAdapter()
+    build_snapshot(path)
+    adapter.append_row(path, FIELDS, dict(zip(FIELDS, ["1111111111", "New", "A", "", "", "", "", ""])))
+    opened = []
+    monkeypatch.setattr(books_adapter, "load_snapshot", lambda p: opened.append(p) or load_snapshot(p))
+
+    assert adapter.snapshot(path) is None and adapter.snapshot(path) is None
+    assert len(opened) == 1
+
+    build_snapshot(path)
+    assert len(adapter.snapshot(path)) == len(BOOKS) + 1
+
+
+def test_book_service_reads_from_snapshot(path, monkeypatch):
+    build_snapshot(path)
+    service = BookService()
+    service.path = path
+
+    monkeypatch.setattr(service.repo, "read_all", lambda p: pytest.fail("CSV was parsed"))
+    monkeypatch.setattr(service.repo, "read_one", lambda *a: pytest.fail("CSV was read"))
+
+    assert service.get_book("0002005018").book_title == "Clara Callan"
+    assert service.get_book("9999999999") is None
+    assert [b.isbn for b in service.get_all_books()] == [b[0] for b in BOOKS]
@@ -0,0 +1,104 @@
+import csv
+import pickle
+import sys
+import pytest
+from app.models.book import Book
+from app.models.rating import Rating
+from app.models.review import Review
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.compact_rows import Row, compact, row_type
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.memory_repository import InMemoryRepository
+
+FIELDS = ["ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher"]
+
+
+def _rows():
+    # Build the values at run time, the way a parser would, so equal strings are distinct objects.
+    return [
+        {f: "".join([f, "-", str(i if f in ("ISBN", "Book-Title") else i % 2)]) for f in FIELDS}
+        for i in range(4)
+    ]
+
+
+def test_row_reads_like_the_dict_it_came_from():
+    row = compact(FIELDS, _rows())[1]
+    source = _rows()[1]
+
+    assert isinstance(row, Row)
+    assert row == source and source == row
+    assert dict(row) == source
+    assert list(row) == FIELDS and len(row) == len(FIELDS)
+    assert row["ISBN"] == "ISBN-1" and row.get("missing", "x") == "x"
+    assert "Publisher" in row and None not in row
+    with pytest.raises(KeyError):
+        row["missing"]
+    assert pickle.loads(pickle.dumps(row)) == row
+    assert Book.from_dict({**row, "Book-Title": "t"}).book_title == "t"
+
+
+def test_compact_shares_repeated_values_and_keeps_irregular_rows():
+    rows = _rows() + [{"ISBN": "x", None: ["surplus"]}]
+    out = compact(FIELDS, rows)
+
+    assert out[0]["Publisher"] is out[2]["Publisher"]
+    assert out[-1] is rows[-1]
+    assert type(out[0]) is type(out[1]) is row_type(FIELDS)
+    assert compact(FIELDS, out)[0] is out[0]
+
+
+def test_row_is_smaller_than_a_dict():
+    row = compact(FIELDS, _rows())[0]
+    assert sys.getsizeof(row) + sys.getsizeof(row._values) < sys.getsizeof(dict(row))
+    assert not hasattr(row, "__dict__")
+
+
+@pytest.mark.parametrize("model", [Book("1", "t", "a"), Rating(1, "1", 5), Review(1, 1, "1", "c")])
+def test_models_have_no_instance_dict(model):
+    assert not hasattr(model, "__dict__")
+
+
+@pytest.fixture
+def bx_path(tmp_path):
+    p = tmp_path / "BX_Books.csv"
+    with open(p, "w", newline="", encoding="latin-1") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, delimiter=";")
+        writer.writeheader()
+        writer.writerows(_rows())
+    return str(p)
+
+
+def test_csv_repository_compact_mode(bx_path, monkeypatch):
+    monkeypatch.setattr(CSVRepository, "compact_tables", True)
+    CSVRepository._cache.clear()
+    repo = BXBooksCSVAdapter()
+
+    records = list(repo.iter_records(bx_path))
+    assert all(isinstance(r, Row) for r in records)
+    assert records == _rows()
+    assert isinstance(repo.read_all(bx_path)[0], dict)
+
+    repo.append_row(bx_path, FIELDS, {"ISBN": "new", "Publisher": "Publisher-1"})
+    assert repo.update_where(bx_path, {"ISBN": "ISBN-0"}, {"Book-Title": "Book-Title-9"}) == 1
+    records = list(repo.iter_records(bx_path))
+    assert all(isinstance(r, Row) for r in records)
+    assert records[0]["Book-Title"] == "Book-Title-9"
+    assert records[-1]["ISBN"] == "new"
+
+    CSVRepository._cache.clear()
+    assert repo.read_all(bx_path) == [dict(r) for r in records]
+
+
+def test_memory_repository_compact_mode(bx_path, monkeypatch):
+    monkeypatch.setattr(CSVRepository, "compact_tables", True)
+    monkeypatch.setattr(InMemoryRepository, "compact_tables", True)
+    InMemoryRepository.discard()
+    repo = InMemoryRepository(BXBooksCSVAdapter())
+    try:
+        repo.update_where(bx_path, {"ISBN": "ISBN-1"}, {"Publisher": "p"})
+        repo.append_row(bx_path, FIELDS, {"ISBN": "new"})
+        records = list(repo.iter_records(bx_path))
+        assert all(isinstance(r, Row) for r in records)
+        assert [r["Publisher"] for r in records] == ["Publisher-0", "p", "Publisher-0", "Publisher-1", ""]
+    finally:
+        InMemoryRepository.discard()
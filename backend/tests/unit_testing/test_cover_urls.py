@@ -0,0 +1,95 @@
+import csv
+import os
+import pickle
+import pytest
+from app.models.book import Book
+from app.repositories import catalog_snapshot
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.catalog_snapshot import build_snapshot, load_snapshot
+from app.repositories.compact_rows import DERIVED, compact
+from app.repositories.csv_repository import CSVRepository
+from app.utils.cover_urls import COVER_TEMPLATES, cover_url, is_standard
+
+FIELDS = [
+    "ISBN", "Book-Title", "Book-Author", "Year-Of-Publication",
+    "Publisher", "Image-URL-S", "Image-URL-M", "Image-URL-L",
+]
+
+
+def _book(isbn, s=None, m=None, l=None):
+    return [isbn, f"Title {isbn}", "Author", "2000", "Publisher",
+            s if s is not None else cover_url(isbn, "Image-URL-S"),
+            m if m is not None else cover_url(isbn, "Image-URL-M"),
+            l if l is not None else cover_url(isbn, "Image-URL-L")]
+
+
+BOOKS = [
+    _book("0195153448"),
+    _book("0002005018", m="http://example.com/cover.jpg"),
+    _book("0060973129", s="", m="", l=""),
+] + [_book(f"{i:010d}") for i in range(200)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "BX_Books.csv")
+    with open(p, "w", encoding="latin-1", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(FIELDS)
+        writer.writerows(BOOKS)
+    return p
+
+
+def _dicts():
+    return [dict(zip(FIELDS, b)) for b in BOOKS]
+
+
+def test_cover_url_pattern():
+    assert cover_url("0195153448", "Image-URL-S") == "http://images.amazon.com/images/P/0195153448.01.THUMBZZZ.jpg"
+    assert cover_url("0195153448", "Image-URL-L") == "http://images.amazon.com/images/P/0195153448.01.LZZZZZZZ.jpg"
+    assert is_standard("0195153448", "Image-URL-M", cover_url("0195153448", "Image-URL-M"))
+    assert not is_standard("0195153448", "Image-URL-M", cover_url("0195153448", "Image-URL-S"))
+    assert not is_standard("", "Image-URL-M", "http://images.amazon.com/images/P/.01.MZZZZZZZ.jpg")
+
+
+def test_book_stores_a_flag_for_standard_urls():
+    standard, custom = Book.from_dict(_dicts()[0]), Book.from_dict(_dicts()[1])
+
+    assert standard._image_url_m is True
+    assert custom._image_url_m == "http://example.com/cover.jpg"
+    assert custom._image_url_s is True
+    assert standard.to_api_dict()["image_url_m"] == BOOKS[0][6]
+    assert custom.to_csv_dict() == _dicts()[1]
+    assert Book("1", "t", "a").to_csv_dict()["Image-URL-S"] == ""
+
+
+def test_compact_rows_rebuild_derived_values():
+    rows = compact(FIELDS, _dicts(), COVER_TEMPLATES)
+
+    assert rows == _dicts()
+    assert rows[0]._values[5:] == (DERIVED, DERIVED, DERIVED)
+    assert rows[1]._values[6] == "http://example.com/cover.jpg"
+    assert rows[2]._values[5:] == ("", "", "")
+    assert pickle.loads(pickle.dumps(rows[0]))._values[5] is DERIVED
+
+
+def test_catalog_cache_keeps_only_non_standard_urls(path):
+    CSVRepository._cache.clear()
+    repo = BXBooksCSVAdapter()
+
+    assert repo.read_all(path) == _dicts()
+    cached = CSVRepository._cache[repo._cache_key(path)].rows
+    assert cached[0]._values[5] is DERIVED
+    assert repo.read_one(path, "ISBN", "0002005018")["Image-URL-M"] == "http://example.com/cover.jpg"
+
+
+def test_snapshot_stores_only_non_standard_urls(path, monkeypatch):
+    build_snapshot(path)
+    snapshot = load_snapshot(path)
+    assert list(snapshot.rows()) == _dicts()
+    derived_size = os.path.getsize(catalog_snapshot.snapshot_path(path))
+    snapshot.close()
+
+    monkeypatch.setattr(catalog_snapshot, "DERIVED_COLUMNS", {})
+    build_snapshot(path)
+    assert derived_size * 2 < os.path.getsize(catalog_snapshot.snapshot_path(path))
@@ -0,0 +1,120 @@
+import csv
+import os
+import threading
+import pytest
+from app.repositories.csv_repository import CSVRepository
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+@pytest.fixture
+def repo():
+    return CSVRepository()
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "Ratings.csv")
+    with open(p, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerow({"UserID": 1, "ISBN": "111", "Book-Rating": 5})
+    return p
+
+
+# ---------------------------------------------------------------------------
+# Table cache
+# ---------------------------------------------------------------------------
+
+def test_read_all_parses_file_once(repo, path, monkeypatch):
+    repo.read_all(path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("table was parsed again")
+
+    monkeypatch.setattr(csv, "DictReader", fail)
+    assert repo.read_all(path) == [{"UserID": "1", "ISBN": "111", "Book-Rating": "5"}]
+
+
+def test_read_all_returns_copies(repo, path):
+    rows = repo.read_all(path)
+    rows[0]["Book-Rating"] = "9"
+    assert repo.read_all(path)[0]["Book-Rating"] == "5"
+
+
+def test_writes_update_cache_like_a_reparse(repo, path):
+    repo.read_all(path)
+    repo.write_all(path, FIELDS, [{"UserID": 2, "ISBN": "222", "Book-Rating": None}])
+    repo.append_row(path, FIELDS, {"UserID": 3, "ISBN": "333", "Book-Rating": 7})
+
+    cached = repo.read_all(path)
+    CSVRepository._cache.clear()
+    assert cached == repo.read_all(path)
+    assert cached == [
+        {"UserID": "2", "ISBN": "222", "Book-Rating": ""},
+        {"UserID": "3", "ISBN": "333", "Book-Rating": "7"},
+    ]
+
+
+def test_external_change_is_picked_up(repo, path):
+    repo.read_all(path)
+
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(["4", "444", "1"])
+
+    rows = repo.read_all(path)
+    assert [r["ISBN"] for r in rows] == ["111", "444"]
+
+
+def test_read_all_missing_file_returns_empty(repo, tmp_path):
+    assert repo.read_all(str(tmp_path / "missing.csv")) == []
+
+
+# ---------------------------------------------------------------------------
+# Streaming reads
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_iter_rows_filters_and_projects(repo, path, monkeypatch, cached):
+    monkeypatch.setattr(CSVRepository, "cache_tables", cached)
+    repo.append_row(path, FIELDS, {"UserID": 2, "ISBN": "222", "Book-Rating": 3})
+    repo.append_row(path, FIELDS, {"UserID": 1, "ISBN": "333", "Book-Rating": 8})
+
+    assert [r["ISBN"] for r in repo.iter_rows(path)] == ["111", "222", "333"]
+    assert list(repo.iter_rows(path, where={"UserID": "1"}, columns=["ISBN"])) == [
+        {"ISBN": "111"}, {"ISBN": "333"},
+    ]
+    assert list(repo.iter_rows(path, where=lambda r: int(r["Book-Rating"]) < 5)) == [
+        {"UserID": "2", "ISBN": "222", "Book-Rating": "3"},
+    ]
+    assert repo.read_one(path, "ISBN", "333")["UserID"] == "1"
+    assert list(repo.iter_rows(path, where={"Missing": "x"})) == []
+
+
+def test_iter_rows_yields_copies_of_cached_rows(repo, path):
+    row = next(repo.iter_rows(path))
+    row["Book-Rating"] = "9"
+    assert repo.read_all(path)[0]["Book-Rating"] == "5"
+
+
+def test_abandoned_stream_does_not_block_writers(repo, path, monkeypatch):
+    monkeypatch.setattr(CSVRepository, "cache_tables", False)
+    monkeypatch.setattr(CSVRepository, "stream_batch_rows", 1)
+    repo.append_row(path, FIELDS, {"UserID": 2, "ISBN": "222", "Book-Rating": 3})
+    assert [r["ISBN"] for r in repo.iter_rows(path)] == ["111", "222"]
+
+    rows = repo.iter_rows(path)
+    for row in rows:
+        break
+    writer = threading.Thread(target=repo.append_row, daemon=True,
+                              args=(path, FIELDS, {"UserID": 3, "ISBN": "333", "Book-Rating": 1}))
+    writer.start()
+    writer.join(5)
+    assert not writer.is_alive()
+    assert [r["ISBN"] for r in rows] == ["222", "333"]
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_iter_rows_missing_file_yields_nothing(repo, tmp_path, monkeypatch, cached):
+    monkeypatch.setattr(CSVRepository, "cache_tables", cached)
+    assert list(repo.iter_rows(str(tmp_path / "missing.csv"))) == []
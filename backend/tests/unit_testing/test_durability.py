@@ -0,0 +1,92 @@
+import os
+import threading
+import pytest
+from app.repositories import durability
+from app.repositories.csv_repository import CSVRepository
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    calls = []
+    real = os.fsync
+    test_thread = threading.get_ident()
+
+    def fsync(fd):
+        # The batched flusher may be syncing files left by earlier tests in the background.
+        if threading.get_ident() == test_thread:
+            calls.append(fd)
+        return real(fd)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+    return calls
+
+
+def test_write_all_replaces_the_file_atomically(tmp_path):
+    path = str(tmp_path / "Users.csv")
+    repo = CSVRepository()
+    repo.write_all(path, FIELDS, [{"UserID": 1, "ISBN": "111", "Book-Rating": 5}])
+    os.chmod(path, 0o640)
+
+    with open(path, encoding="utf-8") as reader:
+        before = os.fstat(reader.fileno()).st_ino
+        repo.write_all(path, FIELDS, [])
+        # A reader that opened the old file still sees all of it.
+        assert reader.read().splitlines() == ["UserID,ISBN,Book-Rating", "1,111,5"]
+
+    st = os.stat(path)
+    assert st.st_ino != before
+    assert st.st_mode & 0o777 == 0o640
+    assert not any(n.endswith(".tmp") for n in os.listdir(tmp_path))
+
+
+def test_failed_write_leaves_the_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "Users.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("old\n")
+
+    def fail(*args):
+        raise OSError("rename failed")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        durability.atomic_write(path, "new\n", "utf-8")
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "old\n"
+    assert not any(n.endswith(".tmp") for n in os.listdir(tmp_path))
+
+
+def test_always_policy_fsyncs_before_returning(tmp_path, monkeypatch, fsyncs):
+    monkeypatch.setattr(durability, "FSYNC_POLICY", "always")
+    path = str(tmp_path / "Ratings.csv")
+    repo = CSVRepository()
+    repo.write_all(path, FIELDS, [])
+    repo.append_row(path, FIELDS, {"UserID": 1, "ISBN": "111", "Book-Rating": 5})
+    # The temporary file, its directory, then the appended file.
+    assert len(fsyncs) == 3
+
+
+def test_batched_policy_defers_fsync_to_the_flusher(tmp_path, monkeypatch):
+    monkeypatch.setattr(durability, "FSYNC_POLICY", "batched")
+    monkeypatch.setattr(durability, "flusher", durability._Flusher(3600))
+    synced = []
+    monkeypatch.setattr(durability, "_fsync_path", synced.append)
+    path = str(tmp_path / "Ratings.csv")
+    repo = CSVRepository()
+    repo.write_all(path, FIELDS, [])
+    repo.append_row(path, FIELDS, {"UserID": 1, "ISBN": "111", "Book-Rating": 5})
+    assert synced == []
+
+    durability.flusher.flush()
+    assert synced == [path, str(tmp_path)]
+
+
+def test_never_policy_does_not_fsync(tmp_path, monkeypatch, fsyncs):
+    monkeypatch.setattr(durability, "FSYNC_POLICY", "never")
+    monkeypatch.setattr(durability, "flusher", durability._Flusher(3600))
+    path = str(tmp_path / "Ratings.csv")
+    CSVRepository().write_all(path, FIELDS, [])
+    durability.flusher.flush()
+    assert fsyncs == []
@@ -0,0 +1,90 @@
+import fcntl
+import multiprocessing
+import os
+import threading
+import pytest
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.file_lock import FileLock, lock_for, lock_metrics
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+def test_lock_for_returns_one_lock_per_file(tmp_path):
+    path = str(tmp_path / "Ratings.csv")
+    locks = []
+    threads = [threading.Thread(target=lambda: locks.append(lock_for(path))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(lock) for lock in locks}) == 1
+    assert lock_for(os.path.relpath(path)) is locks[0]
+
+
+def test_exclusive_lock_waits_for_another_process(tmp_path):
+    lock = FileLock(str(tmp_path / "Ratings.csv"))
+    # A separate open file description conflicts with ours just like another process would.
+    fd = os.open(lock.lock_path, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(fd, fcntl.LOCK_SH)
+    entered = threading.Event()
+
+    def writer():
+        with lock.exclusive():
+            entered.set()
+
+    t = threading.Thread(target=writer)
+    t.start()
+    assert not entered.wait(0.1)
+    os.close(fd)
+    t.join(5)
+    assert entered.is_set()
+
+    stats = lock.stats.to_dict()["exclusive"]
+    assert stats["acquired"] == 1
+    assert stats["contended"] == 1
+    assert stats["wait_ms_max"] >= 50
+
+
+def test_shared_locks_do_not_block_each_other_across_processes(tmp_path):
+    lock = FileLock(str(tmp_path / "Ratings.csv"))
+    fd = os.open(lock.lock_path, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(fd, fcntl.LOCK_SH)
+    try:
+        with lock.shared():
+            pass
+    finally:
+        os.close(fd)
+    assert lock.stats.to_dict()["shared"]["contended"] == 0
+
+
+def test_metrics_are_reported_per_file(tmp_path):
+    path = str(tmp_path / "Ratings.csv")
+    repo = CSVRepository()
+    repo.append_row(path, FIELDS, {"UserID": 1, "ISBN": "111", "Book-Rating": 5})
+    repo.read_all(path)
+
+    metrics = lock_metrics()[os.path.abspath(path)]
+    assert metrics["exclusive"]["acquired"] == 1
+    assert metrics["shared"]["acquired"] == 1
+
+
+def _append_many(path, worker, count):
+    repo = CSVRepository()
+    for i in range(count):
+        repo.append_row(path, FIELDS, {"UserID": worker, "ISBN": str(i), "Book-Rating": 1})
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_appends_from_several_processes_are_not_lost(tmp_path):
+    path = str(tmp_path / "Ratings.csv")
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_many, args=(path, w, 50)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(30)
+
+    rows = CSVRepository().read_all(path)
+    assert len(rows) == 200
+    with open(path, encoding="utf-8") as f:
+        assert f.read().count("UserID") == 1
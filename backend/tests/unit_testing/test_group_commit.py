@@ -0,0 +1,108 @@
+import threading
+import pytest
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.group_commit import GroupCommitter
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+def _together(count, target):
+    start = threading.Barrier(count)
+    errors = []
+
+    def run(i):
+        start.wait()
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return errors
+
+
+def test_committer_merges_concurrent_submits():
+    committer = GroupCommitter()
+    batches = []
+    errors = _together(10, lambda i: committer.submit("k", i, batches.append, 0.1))
+
+    assert errors == []
+    assert sorted(op for batch in batches for op in batch) == list(range(10))
+    assert len(batches) < 10
+
+
+def test_committer_raises_commit_error_in_every_caller():
+    committer = GroupCommitter()
+
+    def commit(ops):
+        raise OSError("disk full")
+
+    errors = _together(4, lambda i: committer.submit("k", i, commit, 0.1))
+    assert len(errors) == 4
+    assert all(isinstance(e, OSError) for e in errors)
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    monkeypatch.setattr(CSVRepository, "group_commit_ms", 50)
+    return CSVRepository()
+
+
+def test_concurrent_appends_are_batched(repo, tmp_path, monkeypatch):
+    path = str(tmp_path / "Ratings.csv")
+    writes = []
+    append_locked = CSVRepository._append_locked
+
+    def counting(self, path, fieldnames, rows, sync=False):
+        writes.append(len(rows))
+        return append_locked(self, path, fieldnames, rows, sync)
+
+    monkeypatch.setattr(CSVRepository, "_append_locked", counting)
+    errors = _together(20, lambda i: repo.append_row(path, FIELDS, {"UserID": i, "ISBN": "111", "Book-Rating": 5}))
+
+    assert errors == []
+    assert sum(writes) == 20
+    assert len(writes) < 20
+    assert sorted(int(r["UserID"]) for r in repo.read_all(path)) == list(range(20))
+
+
+def test_commit_groups_appends_by_fieldnames(repo, tmp_path):
+    path = str(tmp_path / "Ratings.csv")
+    repo._commit(path, [
+        (FIELDS, {"UserID": 1, "ISBN": "111", "Book-Rating": 1}),
+        (FIELDS, {"UserID": 3, "ISBN": "333", "Book-Rating": 3}),
+        (["UserID", "ISBN"], {"UserID": 4, "ISBN": "444"}),
+    ])
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read().splitlines() == ["UserID,ISBN,Book-Rating", "1,111,1", "3,333,3", "4,444"]
+
+
+def test_concurrent_rewrites_are_each_written(repo, tmp_path, monkeypatch):
+    path = str(tmp_path / "Ratings.csv")
+    written = []
+    write_locked = CSVRepository._write_locked
+
+    def recording(self, path, fieldnames, rows, sync=False):
+        written.append(rows[0]["UserID"])
+        return write_locked(self, path, fieldnames, rows, sync)
+
+    monkeypatch.setattr(CSVRepository, "_write_locked", recording)
+    # A rewrite acknowledged to its caller must not be dropped in favour of a later one.
+    errors = _together(5, lambda i: repo.write_all(path, FIELDS, [{"UserID": i, "ISBN": "111", "Book-Rating": 5}]))
+
+    assert errors == []
+    assert sorted(written) == list(range(5))
+    assert repo.read_all(path)[0]["UserID"] == str(written[-1])
+
+
+def test_bad_row_fails_only_its_caller(repo, tmp_path):
+    path = str(tmp_path / "Ratings.csv")
+    with pytest.raises(ValueError):
+        repo.append_row(path, FIELDS, {"UserID": 1, "Unknown": "x"})
+    repo.append_row(path, FIELDS, {"UserID": 1, "ISBN": "111", "Book-Rating": 5})
+    assert len(repo.read_all(path)) == 1
@@ -0,0 +1,124 @@
+import csv
+import os
+import threading
+import pytest
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.journal_repository import JournaledRepository
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+def rating(user_id, isbn, value):
+    return {"UserID": str(user_id), "ISBN": isbn, "Book-Rating": str(value)}
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "Ratings.csv")
+    CSVRepository().write_all(p, FIELDS, [rating(1, "111", 5), rating(2, "222", 6), rating(3, "333", 7)])
+    return p
+
+
+@pytest.fixture
+def repo():
+    return JournaledRepository(compact_bytes=1024 * 1024)
+
+
+def read_base(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_update_goes_to_journal_not_base(repo, path):
+    base_before = read_base(path)
+
+    rows = repo.read_all(path)
+    rows[1]["Book-Rating"] = "9"
+    repo.write_all(path, FIELDS, rows)
+
+    assert read_base(path) == base_before
+    assert os.path.exists(path + ".journal")
+    assert repo.read_all(path)[1]["Book-Rating"] == "9"
+
+
+def test_fresh_instance_replays_journal(repo, path):
+    rows = repo.read_all(path)
+    repo.write_all(path, FIELDS, [r for r in rows if r["ISBN"] != "222"])
+    repo.append_row(path, FIELDS, rating(4, "444", 1))
+
+    JournaledRepository._states.clear()
+    assert [r["ISBN"] for r in JournaledRepository().read_all(path)] == ["111", "333", "444"]
+
+
+def test_compact_folds_journal_into_base(repo, path):
+    repo.append_row(path, FIELDS, rating(4, "444", 1))
+    repo.compact(path)
+
+    assert not os.path.exists(path + ".journal")
+    assert [r["ISBN"] for r in read_base(path)] == ["111", "222", "333", "444"]
+    assert repo.read_all(path) == read_base(path)
+
+
+def test_journal_is_ignored_after_base_is_rewritten(repo, path):
+    repo.append_row(path, FIELDS, rating(4, "444", 1))
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.DictWriter(f, fieldnames=FIELDS).writeheader()
+
+    assert repo.read_all(path) == []
+
+
+def test_stale_journal_is_left_by_readers_and_removed_by_writers(repo, path):
+    repo.append_row(path, FIELDS, rating(4, "444", 1))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.DictWriter(f, fieldnames=FIELDS).writeheader()
+
+    JournaledRepository._states.clear()
+    assert repo.read_all(path) == []
+    assert list(repo.iter_rows(path)) == []
+    assert os.path.exists(path + ".journal")
+
+    repo.append_row(path, FIELDS, rating(5, "555", 2))
+    JournaledRepository._states.clear()
+    assert [r["ISBN"] for r in repo.read_all(path)] == ["555"]
+
+
+def test_torn_record_is_ignored_by_readers_and_dropped_by_writers(repo, path):
+    repo.append_row(path, FIELDS, rating(4, "444", 1))
+    with open(path + ".journal", "ab") as f:
+        f.write(b'{"start": 0, "stop"')
+    size = os.path.getsize(path + ".journal")
+
+    JournaledRepository._states.clear()
+    assert [r["ISBN"] for r in repo.read_all(path)] == ["111", "222", "333", "444"]
+    assert os.path.getsize(path + ".journal") == size
+
+    repo.append_row(path, FIELDS, rating(5, "555", 2))
+    JournaledRepository._states.clear()
+    assert [r["ISBN"] for r in repo.read_all(path)][-1] == "555"
+
+
+def test_background_compaction_after_threshold(path):
+    repo = JournaledRepository(compact_bytes=1)
+    repo.append_row(path, FIELDS, rating(4, "444", 1))
+
+    for thread in threading.enumerate():
+        if thread.name == "journal-compaction":
+            thread.join(timeout=5)
+
+    assert [r["ISBN"] for r in read_base(path)] == ["111", "222", "333", "444"]
+
+
+def test_appends_extend_the_rows_in_place(repo, path):
+    repo.read_all(path)
+    rows = JournaledRepository._states[os.path.abspath(path)].rows
+
+    repo.append_row(path, FIELDS, rating(4, "444", 1))
+    assert JournaledRepository._states[os.path.abspath(path)].rows is rows
+    assert [r["ISBN"] for r in rows] == ["111", "222", "333", "444"]
+
+
+def test_each_table_has_its_own_replay_guard(repo, tmp_path):
+    first, second = str(tmp_path / "Ratings.csv"), str(tmp_path / "Reviews.csv")
+    assert repo._replay_guard(first) is repo._replay_guard(first)
+    assert repo._replay_guard(first) is not repo._replay_guard(second)
@@ -0,0 +1,122 @@
+import csv
+import os
+import pytest
+from app.repositories import factory, memory_repository
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.memory_repository import InMemoryRepository
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_tables():
+    InMemoryRepository.discard()
+    yield
+    InMemoryRepository.discard()
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "Ratings.csv")
+    with open(p, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerow({"UserID": 1, "ISBN": "111", "Book-Rating": 5})
+    return p
+
+
+def test_seeds_from_csv_and_never_writes_it(path):
+    repo = InMemoryRepository()
+    before = os.stat(path).st_mtime_ns
+
+    repo.append_row(path, FIELDS, {"UserID": 2, "ISBN": "222", "Book-Rating": 7})
+    repo.update_where(path, {"ISBN": "111"}, {"Book-Rating": 6})
+
+    assert repo.read_all(path) == [
+        {"UserID": "1", "ISBN": "111", "Book-Rating": "6"},
+        {"UserID": "2", "ISBN": "222", "Book-Rating": "7"},
+    ]
+    assert os.stat(path).st_mtime_ns == before
+    assert CSVRepository().read_all(path) == [{"UserID": "1", "ISBN": "111", "Book-Rating": "5"}]
+
+
+def test_seeding_drops_the_seed_copy_and_holds_no_global_lock(path, monkeypatch):
+    repo = InMemoryRepository()
+    load = CSVRepository._load
+
+    def checked(self, p):
+        assert not InMemoryRepository._tables_guard.locked()
+        return load(self, p)
+
+    monkeypatch.setattr(CSVRepository, "_load", checked)
+    assert len(repo.read_all(path)) == 1
+    assert repo.seed._cache_key(path) not in CSVRepository._cache
+
+
+def test_update_replaces_only_the_changed_rows(path):
+    repo = InMemoryRepository()
+    repo.append_row(path, FIELDS, {"UserID": 2, "ISBN": "222", "Book-Rating": 7})
+    rows = repo._table(path).rows
+    first = rows[0]
+
+    assert repo.update_where(path, {"ISBN": "222"}, {"Book-Rating": 8}) == 1
+    assert repo._table(path).rows is rows and rows[0] is first
+    assert repo.lookup(path, {"ISBN": "222"}) == [{"UserID": "2", "ISBN": "222", "Book-Rating": "8"}]
+
+
+def test_matches_csv_semantics(tmp_path):
+    memory, csv_repo = InMemoryRepository(), CSVRepository()
+    rows = [{"UserID": 1, "ISBN": "111", "Book-Rating": None}, {"UserID": 2, "ISBN": "222"}]
+    results = []
+    for repo, name in ((memory, "mem.csv"), (csv_repo, "disk.csv")):
+        p = str(tmp_path / name)
+        repo.write_all(p, FIELDS, rows)
+        repo.append_row(p, ["ISBN", "UserID", "Book-Rating"], {"ISBN": "333", "UserID": 3, "Book-Rating": 1})
+        with pytest.raises(ValueError):
+            repo.append_row(p, FIELDS, {"Unknown": 1})
+        results.append((repo.read_all(p), list(repo.iter_rows(p, where={"UserID": "2"}, columns=["ISBN"]))))
+    assert results[0] == results[1]
+
+
+def test_tables_are_shared_between_instances(tmp_path):
+    p = str(tmp_path / "Shared.csv")
+    InMemoryRepository().write_all(p, FIELDS, [{"UserID": 1}])
+    assert InMemoryRepository().read_all(p)[0]["UserID"] == "1"
+
+
+def test_snapshot_writes_only_changed_tables(path, tmp_path):
+    repo = InMemoryRepository()
+    untouched = str(tmp_path / "Untouched.csv")
+    with open(untouched, "w", encoding="utf-8") as f:
+        f.write("a,b\n1,2\n")
+    repo.read_all(untouched)
+
+    repo.delete_where(path, {"ISBN": "111"})
+    repo.append_row(path, FIELDS, {"UserID": 4, "ISBN": "444", "Book-Rating": 2})
+
+    assert InMemoryRepository.snapshot() == [os.path.abspath(path)]
+    assert CSVRepository().read_all(path) == [{"UserID": "4", "ISBN": "444", "Book-Rating": "2"}]
+    assert InMemoryRepository.snapshot() == []
+
+
+def test_snapshot_on_shutdown_respects_setting(path, monkeypatch):
+    InMemoryRepository().update_where(path, {"ISBN": "111"}, {"Book-Rating": 1})
+
+    monkeypatch.setattr(memory_repository, "SNAPSHOT_ON_SHUTDOWN", False)
+    memory_repository.snapshot_on_shutdown()
+    assert CSVRepository().read_all(path)[0]["Book-Rating"] == "5"
+
+    monkeypatch.setattr(memory_repository, "SNAPSHOT_ON_SHUTDOWN", True)
+    memory_repository.snapshot_on_shutdown()
+    assert CSVRepository().read_all(path)[0]["Book-Rating"] == "1"
+
+
+def test_factory_selects_memory_per_service(monkeypatch):
+    monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+    monkeypatch.delenv("STORAGE_BACKEND_RATINGS", raising=False)
+    monkeypatch.setenv("STORAGE_BACKEND_BOOKS", "memory")
+    repo = factory.get_repository("books", BXBooksCSVAdapter)
+    assert isinstance(repo, InMemoryRepository)
+    assert isinstance(repo.seed, BXBooksCSVAdapter)
+    assert isinstance(factory.get_repository("ratings"), CSVRepository)
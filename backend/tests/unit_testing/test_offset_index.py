@@ -0,0 +1,106 @@
+import csv
+import pytest
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.offset_index import OffsetIndex
+
+FIELDS = [
+    "ISBN", "Book-Title", "Book-Author", "Year-Of-Publication",
+    "Publisher", "Image-URL-S", "Image-URL-M", "Image-URL-L",
+]
+
+
+def book(isbn, title, author="Author"):
+    return {"ISBN": isbn, "Book-Title": title, "Book-Author": author,
+            "Year-Of-Publication": "2000", "Publisher": "P",
+            "Image-URL-S": "", "Image-URL-M": "", "Image-URL-L": ""}
+
+
+@pytest.fixture
+def adapter():
+    return BXBooksCSVAdapter()
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "BX_Books.csv")
+    with open(p, "w", encoding="latin-1", newline="") as f:
+        writer = csv.writer(f, delimiter=";", quoting=csv.QUOTE_ALL)
+        writer.writerow(FIELDS)
+        writer.writerow(["0195153448", "Classical Mythology", "Mark P. O. Morford", "2002",
+                         "Oxford University Press", "S", "M", "L"])
+        writer.writerow(["0002005018", "Clara Callan", "Richard Bruce Wright", "2001",
+                         "HarperFlamingo Canada", "S", "M", "L"])
+        writer.writerow(["0060973129", "Line\nBreak; \"Quoted\"", "Caf\xe9 Author", "1991",
+                         "HarperPerennial", "S", "M", "L"])
+    return p
+
+
+def test_read_one_matches_full_parse(adapter, path):
+    for row in adapter.read_all(path):
+        assert adapter.read_one(path, "ISBN", row["ISBN"]) == row
+    assert adapter.read_one(path, "ISBN", "0000000000") is None
+
+
+def test_sidecar_is_reused_by_a_fresh_process(adapter, path, monkeypatch):
+    adapter.read_one(path, "ISBN", "0195153448")
+    BXBooksCSVAdapter._offset_indexes.clear()
+
+    monkeypatch.setattr(OffsetIndex, "build", lambda self: pytest.fail("index was rebuilt"))
+    assert adapter.read_one(path, "ISBN", "0002005018")["Book-Title"] == "Clara Callan"
+
+
+def test_writes_update_index_without_rescanning(adapter, path, monkeypatch):
+    adapter.read_one(path, "ISBN", "0195153448")
+    monkeypatch.setattr(OffsetIndex, "build", lambda self: pytest.fail("index was rebuilt"))
+
+    adapter.append_row(path, FIELDS, book("1111111111", "Appended"))
+    assert adapter.read_one(path, "ISBN", "1111111111")["Book-Title"] == "Appended"
+
+    rows = [r for r in adapter.read_all(path) if r["ISBN"] != "0195153448"]
+    rows[0]["Book-Title"] = "Renamed"
+    adapter.write_all(path, FIELDS, rows)
+
+    assert adapter.read_one(path, "ISBN", "0195153448") is None
+    assert adapter.read_one(path, "ISBN", "0002005018")["Book-Title"] == "Renamed"
+    assert adapter.read_one(path, "ISBN", "1111111111")["Book-Title"] == "Appended"
+
+
+def test_external_change_rebuilds_index(adapter, path):
+    adapter.read_one(path, "ISBN", "0195153448")
+
+    with open(path, "w", encoding="latin-1", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(FIELDS)
+        writer.writerow(["2222222222", "Other", "Someone", "1999", "P", "", "", ""])
+
+    assert adapter.read_one(path, "ISBN", "0195153448") is None
+    assert adapter.read_one(path, "ISBN", "2222222222")["Book-Title"] == "Other"
+
+
+def test_read_one_missing_file(adapter, tmp_path):
+    assert adapter.read_one(str(tmp_path / "missing.csv"), "ISBN", "0195153448") is None
+
+
+def test_stray_quote_in_an_unquoted_title(adapter, tmp_path):
+    p = str(tmp_path / "BX_Books.csv")
+    with open(p, "w", encoding="latin-1", newline="") as f:
+        f.write(";".join(FIELDS) + "\n")
+        f.write('1;Vinyl 12" Edition;A;2000;P;;;\n')
+        f.write("2;Second;B;2001;P;;;\n")
+        f.write('3;"Quoted; Title";C;2002;P;;;\n')
+
+    rows = adapter.read_all(p)
+    assert len(rows) == 3
+    for row in rows:
+        assert adapter.read_one(p, "ISBN", row["ISBN"]) == row
+
+
+def test_lookups_decode_the_row_outside_the_index_guard(adapter, path, monkeypatch):
+    get = OffsetIndex.get
+
+    def checked(self, key, data=None):
+        assert not BXBooksCSVAdapter._index_guard.locked()
+        return get(self, key, data)
+
+    monkeypatch.setattr(OffsetIndex, "get", checked)
+    assert adapter.read_one(path, "ISBN", "0002005018")["Book-Title"] == "Clara Callan"
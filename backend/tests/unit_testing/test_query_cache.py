@@ -0,0 +1,171 @@
+import csv
+import threading
+import pytest
+from app.routers import book_router
+from app.schemas.book import BookCreate, BookUpdate
+from app.services.book_service import BookService
+from app.utils.catalog_events import bump_catalog_version, catalog_version, subscribe, unsubscribe
+from app.utils.query_cache import QueryCache, normalize_query
+from app.utils.search import CatalogIndex, RankedSearch
+
+FIELDS = ["ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher",
+          "Image-URL-S", "Image-URL-M", "Image-URL-L"]
+
+
+def test_normalize_query():
+    assert normalize_query("  Harry \t POTTER\n") == "harry potter"
+    assert normalize_query("   ") == ""
+
+
+def test_lru_eviction_and_counters():
+    cache = QueryCache(maxsize=2)
+    assert cache.get("a", 1) is None
+    cache.put("a", [1], 1)
+    cache.put("b", [2], 1)
+    assert cache.get("a", 1) == [1]
+    cache.put("c", [3], 1)
+
+    assert cache.get("b", 1) is None
+    assert cache.get("c", 1) == [3]
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 2, "hit_ratio": 0.5,
+                             "evictions": 1, "invalidations": 0}
+
+
+def test_new_version_empties_the_cache():
+    cache = QueryCache(maxsize=4)
+    cache.get("a", 1)
+    cache.put("a", [], 1)
+    assert cache.get("a", 1) == []
+
+    assert cache.get("a", 2) is None
+    cache.put("b", ["stale"], 1)
+    assert cache.get("b", 2) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_zero_size_caches_nothing():
+    cache = QueryCache(maxsize=0)
+    cache.get("a", 1)
+    cache.put("a", [1], 1)
+    assert cache.get("a", 1) is None
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "BX_Books.csv")
+    with open(p, "w", encoding="latin-1", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(FIELDS)
+        writer.writerow(["0195153448", "Classical Mythology", "Mark P. O. Morford", "2002", "Oxford University Press",
+                         "", "", ""])
+    return p
+
+
+def test_search_results_are_cached_by_normalized_query(path):
+    catalog = CatalogIndex(path)
+    first = catalog.search("Classical  Mythology")
+    assert catalog.search(" classical mythology ") is first
+    assert catalog.cache.stats()["hits"] == 1
+
+    bump_catalog_version()
+    assert catalog.search("classical mythology") is not first
+    assert catalog.cache.stats()["invalidations"] == 1
+
+    ranked = RankedSearch(catalog)
+    page = ranked.search("MYTHOLOGY")
+    assert ranked.search("mythology") is page
+    assert ranked.search("mythology", limit=5) is not page
+
+
+@pytest.fixture
+def book_service(path, monkeypatch):
+    service = book_router.service
+    monkeypatch.setattr(service, "path", path)
+    return service
+
+
+def test_book_changes_bump_the_catalog_version(book_service):
+    version = catalog_version()
+    book_service.create_book(BookCreate(isbn="0000000001", book_title="New", author="Someone",
+                                        year_of_publication="2000", publisher="Press"))
+    assert catalog_version() == version + 1
+
+    book_service.update_book("0000000001", BookUpdate(book_title="Newer"))
+    book_service.update_book("missing", BookUpdate(book_title="x"))
+    assert catalog_version() == version + 2
+
+    assert book_service.delete_book("0000000001")
+    assert not book_service.delete_book("0000000001")
+    assert catalog_version() == version + 3
+
+
+def test_book_changes_are_published(book_service):
+    changes = []
+    subscribe(changes.append)
+    try:
+        book_service.create_book(BookCreate(isbn="0000000001", book_title="New", author="Someone"))
+        book_service.update_book("0000000001", BookUpdate(book_title="Newer"))
+        book_service.update_book("missing", BookUpdate(book_title="x"))
+        book_service.delete_book("0000000001")
+        book_service.delete_book("0000000001")
+    finally:
+        unsubscribe(changes.append)
+
+    assert [(c.kind, c.isbn) for c in changes] == [
+        ("created", "0000000001"), ("updated", "0000000001"), ("deleted", "0000000001")]
+    assert changes[0].values["Book-Title"] == "New" and changes[0].values["Publisher"] == ""
+    assert changes[1].values == {"Book-Title": "Newer"}
+    assert changes[2].values == {}
+
+
+def test_concurrent_book_writes_are_each_applied(book_service):
+    catalog = CatalogIndex(book_service.path)
+    books = catalog.load()[1]
+    start = threading.Barrier(4)
+
+    def create(i):
+        start.wait()
+        book_service.create_book(BookCreate(isbn=f"000000000{i}", book_title=f"Sequel {i}", author="Someone"))
+
+    subscribe(catalog.apply)
+    try:
+        threads = [threading.Thread(target=create, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+    finally:
+        unsubscribe(catalog.apply)
+
+    assert catalog.load()[1] is books
+    assert sorted(b["isbn"] for b in catalog.search("sequel")) == [f"000000000{i}" for i in range(4)]
+
+
+def test_a_store_backend_is_indexed_from_the_store(path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND_BOOKS", "memory")
+    service = BookService()
+    monkeypatch.setattr(service, "path", path)
+    catalog = CatalogIndex(path)
+    ranked = RankedSearch(catalog)
+    assert catalog.repo is service.repo and not catalog.file_backed
+    books = catalog.load()[1]
+    with open(path, encoding="latin-1") as f:
+        on_disk = f.read()
+
+    subscribe(catalog.apply)
+    try:
+        service.create_book(BookCreate(isbn="0000000001", book_title="Kept In Memory", author="Someone"))
+        assert [b["isbn"] for b in catalog.search("in memory")] == ["0000000001"]
+        service.update_book("0000000001", BookUpdate(book_title="Still In Memory"))
+        assert catalog.search("kept") == [] and ranked.search("still")["total"] == 1
+        service.create_book(BookCreate(isbn="0000000002", book_title="Also In Memory", author="Someone"))
+        service.delete_book("0000000001")
+    finally:
+        unsubscribe(catalog.apply)
+
+    assert catalog.load()[1] is books
+    assert [b["isbn"] for b in catalog.search("in memory")] == ["0000000002"]
+    # The file was never written; a rebuild reads the books from the store.
+    with open(path, encoding="latin-1") as f:
+        assert f.read() == on_disk
+    assert CatalogIndex(path).search("in memory") == catalog.search("in memory")
@@ -1,6 +1,6 @@
 import csv
 import pytest
-from app.services.rating_service import RatingService
+from app.services.rating_service import RatingService, ratings_version
 from app.schemas.rating import RatingRead
 
 
@@ -59,3 +59,15 @@ def test_get_ratings_by_isbn_empty_for_unknown(service):
 def test_get_all_ratings_initially_empty(service):
     all_ratings = service.get_all_ratings()
     assert all_ratings == []
+
+
+def test_rating_writes_move_the_ratings_version(service):
+    version = ratings_version()
+    service.create_rating(3, "2222222222", 7)
+    service.create_rating(3, "2222222222", 8)
+    assert ratings_version() == version + 2
+
+    assert service.delete_rating(3, "NOPE") is False
+    assert ratings_version() == version + 2
+    service.delete_rating(3, "2222222222")
+    assert ratings_version() == version + 3
@@ -59,4 +59,17 @@ def test_create_review_twice_same_user_and_book_raises(service):
     service.create_review(user_id = 1, data = content, isbn = "034545104X")
 
     with pytest.raises(ValueError):
-        service.create_review(user_id = 1, data = content, isbn = "034545104X")
\ No newline at end of file
+        service.create_review(user_id = 1, data = content, isbn = "034545104X")
+
+def test_edit_review_deleted_meanwhile_raises(service, monkeypatch):
+    created = service.create_review(user_id = 1, data = ReviewCreate(comment = "Soon gone"), isbn = "034545104X")
+    update_where = service.repo.update_where
+
+    def update_then_delete(path, key, changes):
+        count = update_where(path, key, changes)
+        service.delete_review(created.review_id)
+        return count
+
+    monkeypatch.setattr(service.repo, "update_where", update_then_delete)
+    with pytest.raises(ValueError):
+        service.edit_review(created.review_id, ReviewUpdate(comment = "Edited"))
@@ -0,0 +1,138 @@
+import os
+import pytest
+from app.repositories.base_repository import BaseRepository
+from app.repositories.books_adapter import BXBooksCSVAdapter
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.journal_repository import JournaledRepository
+from app.repositories.memory_repository import InMemoryRepository
+from app.repositories.sqlite_repository import SQLiteRepository
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+ROWS = [
+    {"UserID": "1", "ISBN": "111", "Book-Rating": "5"},
+    {"UserID": "2", "ISBN": "111", "Book-Rating": "3"},
+    {"UserID": "1", "ISBN": "222", "Book-Rating": "8"},
+]
+
+
+class ListRepository(BaseRepository):
+    """Minimal backend that relies on the BaseRepository fallbacks."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def read_all(self, path):
+        return [dict(r) for r in self.tables.get(path, [])]
+
+    def write_all(self, path, fieldnames, rows):
+        self.tables[path] = [{f: str(r.get(f, "")) for f in fieldnames} for r in rows]
+
+    def append_row(self, path, fieldnames, row):
+        self.tables.setdefault(path, []).append({f: str(row.get(f, "")) for f in fieldnames})
+
+
+@pytest.fixture(params=["csv", "journal", "sqlite", "memory", "fallback"])
+def repo(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteRepository(str(tmp_path / "app.db"))
+    if request.param == "journal":
+        return JournaledRepository()
+    if request.param == "fallback":
+        return ListRepository()
+    if request.param == "memory":
+        return InMemoryRepository()
+    return CSVRepository()
+
+
+@pytest.fixture
+def path(repo, tmp_path):
+    p = str(tmp_path / "Ratings.csv")
+    repo.declare_indexes(p, [("UserID", "ISBN")])
+    repo.write_all(p, FIELDS, ROWS)
+    return p
+
+
+def test_update_where_changes_only_matching_rows(repo, path):
+    assert repo.update_where(path, {"UserID": "1", "ISBN": "222"}, {"Book-Rating": 9}) == 1
+    assert repo.update_where(path, {"ISBN": "111"}, {"Book-Rating": "1"}) == 2
+    assert repo.update_where(path, {"UserID": "7", "ISBN": "111"}, {"Book-Rating": "1"}) == 0
+
+    assert [r["Book-Rating"] for r in repo.read_all(path)] == ["1", "1", "9"]
+    assert repo.lookup(path, {"UserID": "1", "ISBN": "222"})[0]["Book-Rating"] == "9"
+
+
+def test_update_where_ignores_unknown_columns(repo, path):
+    assert repo.update_where(path, {"ISBN": "111"}, {"Book-Rating": "2", "Unknown": "x"}) == 2
+
+    assert repo.read_all(path)[:2] == [{"UserID": "1", "ISBN": "111", "Book-Rating": "2"},
+                                       {"UserID": "2", "ISBN": "111", "Book-Rating": "2"}]
+
+
+def test_delete_where_accepts_mappings_and_predicates(repo, path):
+    assert repo.delete_where(path, {"UserID": "2", "ISBN": "111"}) == 1
+    assert repo.delete_where(path, lambda r: r["Book-Rating"] == "8") == 1
+    assert repo.delete_where(path, {"ISBN": "999"}) == 0
+
+    assert repo.read_all(path) == [ROWS[0]]
+    repo.append_row(path, FIELDS, {"UserID": "2", "ISBN": "111", "Book-Rating": "4"})
+    assert [r["UserID"] for r in repo.lookup(path, {"UserID": "2", "ISBN": "111"})] == ["2"]
+
+
+def test_missing_table_changes_nothing(repo, tmp_path):
+    missing = str(tmp_path / "Missing.csv")
+    assert repo.update_where(missing, {"ISBN": "111"}, {"Book-Rating": "1"}) == 0
+    assert repo.delete_where(missing, {"ISBN": "111"}) == 0
+
+
+BOOK_FIELDS = ["ISBN", "Book-Title", "Book-Author"]
+
+
+@pytest.fixture
+def books(tmp_path):
+    path = str(tmp_path / "BX_Books.csv")
+    adapter = BXBooksCSVAdapter()
+    adapter.write_all(path, BOOK_FIELDS, [
+        {"ISBN": "0001", "Book-Title": "Caf\xe9", "Book-Author": "Ann"},
+        {"ISBN": "0002", "Book-Title": "Tea", "Book-Author": "Bob"},
+    ])
+    return adapter, path
+
+
+def test_same_length_book_update_is_patched_in_place(books, monkeypatch):
+    adapter, path = books
+    inode = os.stat(path).st_ino
+    adapter.read_all(path)
+
+    def fail(*args):
+        raise AssertionError("the whole table was copied")
+
+    monkeypatch.setattr(BXBooksCSVAdapter, "_writable", fail)
+    monkeypatch.setattr(BXBooksCSVAdapter, "_remember", fail)
+    assert adapter.update_where(path, {"ISBN": "0002"}, {"Book-Title": "Tee"}) == 1
+
+    assert os.stat(path).st_ino == inode
+    assert adapter.read_one(path, "ISBN", "0002")["Book-Title"] == "Tee"
+    assert BXBooksCSVAdapter().read_all(path)[1]["Book-Title"] == "Tee"
+
+
+def test_longer_book_update_rewrites_the_file(books):
+    adapter, path = books
+    inode = os.stat(path).st_ino
+
+    assert adapter.update_where(path, {"ISBN": "0001"}, {"Book-Title": "Caf\xe9 Society"}) == 1
+
+    assert os.stat(path).st_ino != inode
+    assert adapter.read_one(path, "ISBN", "0001")["Book-Title"] == "Caf\xe9 Society"
+    assert adapter.read_one(path, "ISBN", "0002")["Book-Title"] == "Tea"
+
+
+def test_fallbacks_write_malformed_lines_back_with_the_header(tmp_path):
+    path = str(tmp_path / "Ratings.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("UserID,ISBN,Book-Rating\n1,111,5,surplus\n2,222\n3,333,7\n")
+    repo = CSVRepository()
+
+    assert BaseRepository.update_where(repo, path, {"ISBN": "333"}, {"Book-Rating": "8"}) == 1
+    assert BaseRepository.delete_where(repo, path, {"ISBN": "111"}) == 1
+    with open(path, encoding="utf-8") as f:
+        assert f.read().splitlines() == ["UserID,ISBN,Book-Rating", "2,222,", "3,333,8"]
@@ -0,0 +1,56 @@
+import threading
+from app.repositories.rwlock import RWLock
+
+
+def test_readers_hold_the_lock_together():
+    lock = RWLock()
+    inside = threading.Barrier(4, timeout=5)
+
+    def reader():
+        with lock.read():
+            inside.wait()
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert not inside.broken
+
+
+def test_writer_excludes_readers_and_writers():
+    lock = RWLock()
+    lock.acquire_write()
+    assert not lock.acquire_read(blocking=False)
+    assert not lock.acquire_write(blocking=False)
+    lock.release_write()
+    assert lock.acquire_read(blocking=False)
+    assert not lock.acquire_write(blocking=False)
+    lock.release_read()
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = RWLock()
+    lock.acquire_read()
+    order = []
+
+    def writer():
+        with lock.write():
+            order.append("writer")
+
+    def reader():
+        with lock.read():
+            order.append("reader")
+
+    w = threading.Thread(target=writer)
+    w.start()
+    while not lock._writers_waiting:
+        pass
+    assert not lock.acquire_read(blocking=False)
+
+    r = threading.Thread(target=reader)
+    r.start()
+    lock.release_read()
+    w.join(5)
+    r.join(5)
+    assert order == ["writer", "reader"]
@@ -0,0 +1,559 @@
+import csv
+import os
+import random
+import threading
+import pytest
+from app.repositories.offset_index import OffsetIndex
+from app.utils.catalog_events import CREATED, DELETED, UPDATED, CatalogChange, write_in_progress, writing
+from app.utils.query_cache import normalize_query
+from app.utils.search import Autocomplete, CatalogIndex, RankedSearch, scan_books
+from app.utils.search_index import FacetIndex, RankedIndex, SearchIndex, SpellingIndex, edit_distance, TrigramIndex, has_terms, intersect, split_query, tokenize, trigrams
+
+FIELDS = ["ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher"]
+
+BOOKS = [
+    ["0195153448", "Classical Mythology", "Mark P. O. Morford", "2002", "Oxford University Press"],
+    ["0002005018", "Clara Callan", "Richard Bruce Wright", "2001", "HarperFlamingo Canada"],
+    ["0156659751", "The Nonexistent Knight and The Cloven Viscount", "Italo Calvino", "1977", "Harcourt"],
+    ["0801319536", "Classical Mythology", "Mark P. O. Morford", "1998", "John Wiley & Sons"],
+    ["0439064872", "Harry Potter and the Chamber of Secrets", "J. K. Rowling", "2000", "Scholastic"],
+    ["059035342X", "Harry Potter and the Sorcerer's Stone", "J. K. Rowling", "1999", "Arthur A. Levine Books"],
+    ["0195153448", "Classical Mythology", "Mark P. O. Morford", "2002", "Duplicate ISBN"],
+] + [[f"{i:010d}", f"Volume {i} of Classics", f"Author {i % 7}", "1990", "Press"] for i in range(40)]
+
+
+def _write(path, books):
+    with open(path, "w", encoding="latin-1", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(FIELDS)
+        writer.writerows(books)
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = str(tmp_path / "BX_Books.csv")
+    _write(p, BOOKS)
+    return p
+
+
+def test_tokenize():
+    assert tokenize("Mark P. O. Morford") == ["mark", "p", "o", "morford"]
+    assert tokenize("Sorcerer's Stone!") == ["sorcerer", "s", "stone"]
+    assert tokenize(" .. ") == []
+
+
+def test_intersect_keeps_ascending_order():
+    assert list(intersect([[1, 3, 5, 7, 9], [3, 4, 5, 9], [0, 3, 9, 12]])) == [3, 9]
+    assert list(intersect([[1, 2], []])) == []
+    assert list(intersect([])) == []
+
+
+def test_candidates():
+    index = SearchIndex.build([("Harry Potter",), ("Harry Hole",), ("Potted Plants",)])
+
+    assert list(index.candidates("harry potter ")) == [0]
+    assert list(index.candidates("harry potter")) == [0, 1]
+    assert list(index.candidates("pot")) == [0, 2]
+    assert list(index.candidates("harry ")) == [0, 1]
+    assert list(index.candidates("hogwarts")) == []
+    assert index.candidates("--") is None
+
+
+def test_split_query():
+    assert split_query("Harry Pot") == (["harry"], "pot")
+    assert split_query("harry pot ") == (["harry", "pot"], None)
+    assert split_query("") == ([], None)
+    assert has_terms("Harry Potter", ["harry"], "pot")
+    assert has_terms("Harry Potter", [], "harr")
+    assert not has_terms("Harry Potter", ["potter"], "hog")
+    assert not has_terms("Harry Potter", ["pot"], None)
+
+
+def test_trigram_candidates():
+    index = TrigramIndex.build([("harry potter",), ("harry hole",), ("potted plants",)])
+
+    assert trigrams("pott") == {"pot", "ott"}
+    assert list(index.candidates("arry")) == [0, 1]
+    assert list(index.candidates("otte")) == [0, 2]
+    assert list(index.candidates("y pot")) == [0]
+    assert list(index.candidates("hogwarts")) == []
+    assert index.candidates("ha") is None
+
+
+@pytest.mark.parametrize("query", [
+    "Mark P. O. Morford", "classical mythology", "Nonexistent", "harry potter", "harry pot",
+    "rowling", "0195153448", "059035342", "classics", "author 3", "volume", "the", "percy jackson", "&", "",
+    "existent", "orford", "15344", "5342x", "5342X", "otter and", "k. r", "a", "s ", "ss",
+])
+def test_index_answers_like_the_scan(path, query):
+    assert CatalogIndex(path).search(query) == scan_books(normalize_query(query), path)
+
+
+def test_index_answers_like_the_scan_for_sampled_fragments(path):
+    rng = random.Random(0)
+    catalog = CatalogIndex(path)
+    for _ in range(300):
+        text = rng.choice(rng.choice(BOOKS)[:3])
+        start = rng.randrange(len(text))
+        query = text[start:start + rng.randint(1, 12)]
+        if rng.random() < 0.2:
+            query = query.swapcase()
+        assert catalog.search(query) == scan_books(normalize_query(query), path), query
+
+
+def test_index_is_rebuilt_when_the_catalog_changes(path):
+    catalog = CatalogIndex(path)
+    assert catalog.search("percy") == []
+    first = catalog.load()
+    assert catalog.load() is first
+
+    _write(path, BOOKS + [["0786838655", "Percy Jackson", "Rick Riordan", "2005", "Hyperion"]])
+    os.utime(path, ns=(1, 1))
+    assert [b["isbn"] for b in catalog.search("percy")] == ["0786838655"]
+
+
+def test_missing_catalog_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        CatalogIndex(str(tmp_path / "missing.csv")).search("x")
+
+
+RATINGS = {"059035342X": 5, "0439064872": 2, "0195153448": 3, "0801319536": 1, "0000000011": 4}
+
+
+def test_autocomplete_ranks_by_ratings(path):
+    complete = Autocomplete(CatalogIndex(path), lambda: RATINGS).complete
+
+    assert [c["text"] for c in complete("harry")] == [
+        "Harry Potter and the Sorcerer's Stone", "Harry Potter and the Chamber of Secrets"]
+    assert complete("Mark P. O. Morf") == [
+        {"text": "Mark P. O. Morford", "field": "author", "ratings": 4, "isbn": None}]
+    assert complete("classical m")[0] == {
+        "text": "Classical Mythology", "field": "title", "ratings": 4, "isbn": "0195153448"}
+    assert [c["text"] for c in complete("rowl")] == ["J. K. Rowling"]
+    assert [c["text"] for c in complete("potter harr")] == [
+        "Harry Potter and the Sorcerer's Stone", "Harry Potter and the Chamber of Secrets"]
+    assert complete("sorcerer potter")[0]["isbn"] == "059035342X"
+    assert complete("otter") == [] and complete("") == [] and complete("  ") == []
+
+
+def test_autocomplete_limit_and_short_prefixes(path):
+    complete = Autocomplete(CatalogIndex(path), lambda: RATINGS).complete
+
+    first = complete("v", limit=3)
+    assert [c["text"] for c in first] == [
+        "Volume 11 of Classics", "The Nonexistent Knight and The Cloven Viscount", "Volume 0 of Classics"]
+    assert len(complete("volume")) == 10
+    assert len(complete("volume", limit=50)) == 40
+
+
+def test_autocomplete_follows_the_catalog(path):
+    autocomplete = Autocomplete(CatalogIndex(path), lambda: {})
+    assert autocomplete.stale()
+    assert autocomplete.complete("percy") == []
+    assert not autocomplete.stale()
+
+    _write(path, BOOKS + [["0786838655", "Percy Jackson", "Rick Riordan", "2005", "Hyperion"]])
+    os.utime(path, ns=(1, 1))
+    assert autocomplete.stale()
+    assert [c["text"] for c in autocomplete.complete("percy")] == ["Percy Jackson"]
+
+
+def test_autocomplete_recounts_ratings_once_they_change(path):
+    counts, version = dict(RATINGS), [0]
+    autocomplete = Autocomplete(CatalogIndex(path), lambda: counts, lambda: version[0], refresh=0)
+    assert autocomplete.complete("harry")[0]["isbn"] == "059035342X"
+
+    counts["0439064872"] = 9
+    assert not autocomplete.stale()
+    version[0] += 1
+    assert autocomplete.stale()
+    assert autocomplete.complete("harry")[0] == {
+        "text": "Harry Potter and the Chamber of Secrets", "field": "title", "ratings": 9, "isbn": "0439064872"}
+
+    autocomplete.refresh = 3600
+    counts["059035342X"] = 20
+    version[0] += 1
+    assert not autocomplete.stale()
+    assert autocomplete.complete("harry")[0]["isbn"] == "0439064872"
+
+
+def test_ranked_index_prefers_short_weighted_fields():
+    index = RankedIndex.build([
+        ("Tales of the Sea and Other Stories of the Sea", "Sea Author", "Press"),
+        ("The Sea", "Somebody", "Press"),
+        ("Mountains", "Anne Sea", "Press"),
+        ("Lakes", "Somebody", "Sea Press"),
+        ("Forests", "Nobody", "Press"),
+    ], [3.0, 2.0, 1.0])
+
+    total, page = index.search("sea")
+    assert total == 4
+    assert [doc for doc, _ in page] == [1, 0, 2, 3]
+    assert index.search("sea somebody")[0] == 2
+    assert index.search("sea whales") == (0, [])
+    assert index.search("") == (0, [])
+
+
+def test_ranked_index_pages_follow_the_full_ranking():
+    index = RankedIndex.build([(f"common {'word ' * (i % 5)}",) for i in range(40)], [1.0])
+    total, everything = index.search("common", limit=40)
+    assert total == 40
+
+    pages = [index.search("common", offset, 7)[1] for offset in range(0, 40, 7)]
+    assert [doc for page in pages for doc, _ in page] == [doc for doc, _ in everything]
+    assert [s for _, s in everything] == sorted((s for _, s in everything), reverse=True)
+    # Equal scores keep document order.
+    assert [doc for doc, _ in everything[:8]] == [0, 5, 10, 15, 20, 25, 30, 35]
+    assert index.search("common", offset=40) == (40, [])
+
+
+def test_ranked_index_ordered_postings_match_the_heap(monkeypatch):
+    documents = [(f"common {'word ' * (i % 5)}",) for i in range(40)]
+    heap = RankedIndex.build(documents, [1.0])
+    monkeypatch.setattr(RankedIndex, "ORDERED_POSTINGS", 10)
+    ordered = RankedIndex.build(documents, [1.0])
+
+    assert heap.postings["common"][2] is None and ordered.postings["common"][2] is not None
+    for offset, limit in ((0, 10), (7, 7), (35, 10), (40, 5)):
+        assert ordered.search("common", offset, limit) == heap.search("common", offset, limit)
+
+
+def test_ranked_search_over_the_catalog(path):
+    ranked = RankedSearch(CatalogIndex(path))
+
+    found = ranked.search("classical mythology")
+    assert found["total"] == 2
+    assert [r["isbn"] for r in found["results"]] == ["0195153448", "0801319536"]
+    assert set(found["results"][0]) == {"isbn", "title", "author", "year", "publisher", "score"}
+
+    assert ranked.search("harry potter", limit=1)["results"][0]["isbn"] == "0439064872"
+    assert ranked.search("harry potter", offset=1)["results"][0]["isbn"] == "059035342X"
+    assert ranked.search("scholastic rowling")["total"] == 1
+    assert ranked.search("classics", offset=35, limit=10)["results"][-1]["isbn"] == "0000000039"
+    assert ranked.search("percy") == {"total": 0, "offset": 0, "limit": 10, "did_you_mean": None, "results": []}
+
+
+def test_edit_distance():
+    assert edit_distance("tolkein", "tolkien", 2) == 1
+    assert edit_distance("rowlling", "rowling", 2) == 1
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("kitten", "sitting", 1) == 2
+    assert edit_distance("a", "abcd", 2) == 3
+
+
+def test_spelling_index_suggestions():
+    speller = SpellingIndex.build([
+        ("rowling", 5), ("bowling", 50), ("tolkien", 3), ("harry", 9), ("potter", 7), ("hobbit", 2), ("cat", 4),
+    ])
+
+    assert speller.suggest("rowling") == "rowling"
+    assert speller.suggest("rowlling") == "rowling"
+    assert speller.suggest("tolkein") == "tolkien"
+    assert speller.suggest("owling") == "bowling"
+    assert speller.suggest("hobit") == "hobbit"
+    assert speller.suggest("cta") == "cat"
+    assert speller.suggest("ct") is None
+    assert speller.suggest("tlkn") is None
+    assert speller.correct("Hary Poter") == "harry potter"
+    assert speller.correct("harry potter") is None
+    assert speller.correct("harry qwxzv") is None
+
+
+def test_ranked_search_falls_back_to_spelling_suggestions(path):
+    ranked = RankedSearch(CatalogIndex(path))
+
+    found = ranked.search("Rowlling")
+    assert found["did_you_mean"] == "rowling"
+    assert found["total"] == 2
+    assert ranked.search("mythology morfrod")["results"][0]["isbn"] == "0195153448"
+    assert ranked.search("rowling")["did_you_mean"] is None
+
+
+def test_facet_index():
+    facet = FacetIndex.build(["Penguin", "", "Tor", "Penguin", None, "Tor", "Penguin"])
+
+    assert list(facet.ids("Penguin")) == [0, 3, 6]
+    assert list(facet.ids("Nobody")) == []
+    assert facet.count(range(7)) == [("Penguin", 3), ("Tor", 2)]
+    assert facet.count([1, 2, 3], top=1) == [("Penguin", 1)]
+
+
+def test_ranked_index_restrict_accept_and_matched():
+    index = RankedIndex.build([("sea",), ("sea sea",), ("lake",), ("sea",)], [1.0])
+    matched = []
+
+    assert index.search("sea", restrict=[[1, 2, 3]], matched=matched)[0] == 2
+    assert matched == [1, 3]
+    total, page = index.search("sea", accept=lambda doc: doc != 1)
+    assert total == 2 and [doc for doc, _ in page] == [0, 3]
+    assert index.search("sea", restrict=[[]]) == (0, [])
+
+
+def test_ranked_search_filters(path):
+    ranked = RankedSearch(CatalogIndex(path))
+
+    assert ranked.search("classical mythology", year_to=2000)["results"][0]["isbn"] == "0801319536"
+    assert ranked.search("classical mythology", year_from=2000)["total"] == 1
+    assert ranked.search("harry potter", publisher="Scholastic")["results"][0]["isbn"] == "0439064872"
+    assert ranked.search("harry potter", publisher="scholastic")["total"] == 0
+    assert ranked.search("classics", author="Author 3")["total"] == 6
+    assert ranked.search("classics", year_from=1991)["total"] == 0
+    assert "facets" not in ranked.search("classics")
+
+
+def test_ranked_search_facet_counts(path):
+    ranked = RankedSearch(CatalogIndex(path))
+
+    facets = ranked.search("mythology", facets=True)["facets"]
+    assert facets["decade"] == [{"value": "1990", "count": 1}, {"value": "2000", "count": 1}]
+    assert facets["author"] == [{"value": "Mark P. O. Morford", "count": 2}]
+    assert {f["value"] for f in facets["publisher"]} == {"Oxford University Press", "John Wiley & Sons"}
+
+    classics = ranked.search("classics", limit=1, facets=True)
+    assert classics["total"] == 40 and len(classics["results"]) == 1
+    assert classics["facets"]["decade"] == [{"value": "1990", "count": 40}]
+    assert len(classics["facets"]["author"]) == 7
+    assert classics["facets"]["author"][0] == {"value": "Author 0", "count": 6}
+
+    narrowed = ranked.search("classics", author="Author 1", facets=True)["facets"]
+    assert narrowed["author"] == [{"value": "Author 1", "count": 6}]
+
+
+def test_word_and_trigram_indexes_add_and_remove_documents():
+    words = SearchIndex.build([("Harry Potter",), ("Harry Hole",)])
+    words.add(2, ("Potted Plants",))
+    assert list(words.candidates("pot")) == [0, 2]
+    words.remove(0, ("Harry Potter",))
+    assert list(words.candidates("harry ")) == [1]
+    assert "potter" not in words.postings and "potter" not in words.tokens
+
+    grams = TrigramIndex.build([("abcd",), ("bcde",)])
+    grams.add(2, ("xbcdx",))
+    grams.remove(0, ("abcd",))
+    assert list(grams.candidates("bcd")) == [1, 2]
+    assert "abc" not in grams.postings
+
+
+def test_ranked_index_add_scores_like_a_build(monkeypatch):
+    monkeypatch.setattr(RankedIndex, "ORDERED_POSTINGS", 1)
+    docs = [("Tales of the Sea", "Sea Author", "Press"), ("Lake Stories", "Lake Author", "Press"),
+            ("Sea and Lake", "Other", "Sea Press")]
+    built = RankedIndex.build(docs, [3.0, 2.0, 1.0])
+    grown = RankedIndex.build(docs[:2], [3.0, 2.0, 1.0])
+    grown.add(2, docs[2])
+
+    assert grown.totals == built.totals and grown.size == 3
+    # The added document is scored with the statistics a full build would use.
+    assert grown.postings["lake"][1][-1] == pytest.approx(built.postings["lake"][1][-1])
+    assert grown.postings["sea"][2] is None
+    assert [doc for doc, _ in grown.search("sea")[1]] == [doc for doc, _ in built.search("sea")[1]]
+
+    grown.remove(0, docs[0])
+    assert grown.search("tales") == (0, [])
+    assert [doc for doc, _ in grown.search("sea")[1]] == [2]
+
+
+def test_spelling_index_adjust():
+    speller = SpellingIndex.build([("rowling", 5), ("hobbit", 2)])
+    speller.adjust("riordan", 1)
+    assert speller.suggest("riordon") == "riordan"
+
+    speller.adjust("rowling", -5)
+    assert speller.suggest("rowling") is None and speller.suggest("rowlling") is None
+    speller.adjust("rowling", 1)
+    assert speller.suggest("rowlling") == "rowling"
+
+
+def test_facet_index_set():
+    facet = FacetIndex.build(["Penguin", "Tor"])
+    facet.set(2, "Tor")
+    facet.set(0, "Orbit")
+    facet.set(1, None)
+
+    assert list(facet.ids("Tor")) == [2] and list(facet.ids("Penguin")) == []
+    assert facet.count(range(3)) == [("Tor", 1), ("Orbit", 1)]
+
+
+PERCY = ["0786838655", "Percy Jackson", "Rick Riordan", "2005", "Hyperion"]
+
+
+def _rewrite(path, books, mtime):
+    """Rewrite the catalog and return its signature before and after, as a writer publishes them."""
+    before = OffsetIndex.signature_of(path)
+    _write(path, books)
+    os.utime(path, ns=(mtime, mtime))
+    return before, OffsetIndex.signature_of(path)
+
+
+def test_catalog_changes_are_applied_without_a_rebuild(path):
+    catalog = CatalogIndex(path)
+    autocomplete = Autocomplete(catalog, lambda: RATINGS)
+    ranked = RankedSearch(catalog)
+    autocomplete.load()
+    ranked.load()
+    books = catalog.load()[1]
+
+    source = _rewrite(path, BOOKS + [PERCY], 1)
+    catalog.apply(CatalogChange(CREATED, PERCY[0], dict(zip(FIELDS, PERCY)), source))
+    assert catalog.load()[1] is books
+    assert not autocomplete.stale()
+    assert [b["isbn"] for b in catalog.search("percy")] == [PERCY[0]]
+    assert [c["text"] for c in autocomplete.complete("pe")] == ["Percy Jackson"]
+    assert [c["text"] for c in autocomplete.complete("riord")] == ["Rick Riordan"]
+    assert ranked.search("jackson", facets=True)["facets"]["publisher"] == [{"value": "Hyperion", "count": 1}]
+    assert ranked.search("jakson")["did_you_mean"] == "jackson"
+
+    source = _rewrite(path, BOOKS + [PERCY[:1] + ["The Lightning Thief"] + PERCY[2:]], 2)
+    catalog.apply(CatalogChange(UPDATED, PERCY[0], {"Book-Title": "The Lightning Thief"}, source))
+    assert catalog.search("percy") == [] and catalog.search("lightning")[0]["author"] == "Rick Riordan"
+    assert autocomplete.complete("percy") == [] and autocomplete.complete("pe") == []
+    assert ranked.search("thief riordan")["total"] == 1 and ranked.search("percy")["total"] == 0
+
+    source = _rewrite(path, BOOKS, 3)
+    catalog.apply(CatalogChange(DELETED, PERCY[0], source=source))
+    assert catalog.search("lightning") == [] and autocomplete.complete("rick") == []
+    assert ranked.search("riordan")["total"] == 0
+
+    # Both copies of a duplicated ISBN go, and the title's completion falls back to the other edition.
+    source = _rewrite(path, [b for b in BOOKS if b[0] != "0195153448"], 4)
+    catalog.apply(CatalogChange(DELETED, "0195153448", source=source))
+    assert catalog.load()[1] is books
+    assert autocomplete.complete("classical m") == [
+        {"text": "Classical Mythology", "field": "title", "ratings": 1, "isbn": "0801319536"}]
+    assert ranked.search("mythology")["total"] == 1
+
+    rebuilt = CatalogIndex(path)
+    for query in ("classical", "volume 1", "rowling", "0195153448", "morford"):
+        assert catalog.search(query) == rebuilt.search(query)
+    fresh = Autocomplete(rebuilt, lambda: RATINGS)
+    # Ranks stay as built, so only completions whose order the edits left alone are compared.
+    for prefix in ("mark", "rowl", "harry pot", "volume 3", "percy"):
+        assert autocomplete.complete(prefix) == fresh.complete(prefix)
+
+
+def test_changes_already_loaded_from_the_file_are_not_applied_twice(path):
+    catalog = CatalogIndex(path)
+    catalog.load()
+    source = _rewrite(path, BOOKS + [PERCY], 1)
+    assert len(catalog.search("percy")) == 1
+    books = catalog.load()[1]
+
+    catalog.apply(CatalogChange(CREATED, PERCY[0], dict(zip(FIELDS, PERCY)), source))
+    assert catalog.load()[1] is books and len(books) == len(BOOKS) + 1
+
+
+def test_changes_written_back_to_back_are_applied_in_turn(path):
+    catalog = CatalogIndex(path)
+    books = catalog.load()[1]
+    percy = CatalogChange(CREATED, PERCY[0], dict(zip(FIELDS, PERCY)), _rewrite(path, BOOKS + [PERCY], 1))
+    sequel = ["0786856297", "The Sea of Monsters", "Rick Riordan", "2006", "Hyperion"]
+    sea = CatalogChange(CREATED, sequel[0], dict(zip(FIELDS, sequel)), _rewrite(path, BOOKS + [PERCY, sequel], 2))
+
+    # Both writes land before either is published: each still applies on top of the one before it.
+    catalog.apply(percy)
+    catalog.apply(sea)
+    assert catalog.load()[1] is books
+    assert [b["isbn"] for b in catalog.search("riordan")] == [PERCY[0], sequel[0]]
+
+
+def test_a_change_on_top_of_an_unseen_write_falls_back_to_a_rebuild(path):
+    catalog = CatalogIndex(path)
+    books = catalog.load()[1]
+    _rewrite(path, BOOKS + [PERCY], 1)
+    source = _rewrite(path, BOOKS, 2)
+
+    catalog.apply(CatalogChange(DELETED, PERCY[0], source=source))
+    assert catalog._state is None
+    assert catalog.load()[1] is not books and catalog.search("percy") == []
+
+
+def test_a_rebuild_during_a_write_is_not_trusted(path):
+    catalog = CatalogIndex(path)
+    with writing(path):
+        _rewrite(path, BOOKS + [PERCY], 1)
+        assert len(catalog.search("percy")) == 1
+        books = catalog.load()[1]
+
+    assert catalog.load()[1] is not books
+    assert len(catalog.search("percy")) == 1
+
+
+def test_a_write_does_not_wait_for_a_rebuild(path, monkeypatch):
+    catalog = CatalogIndex(path)
+    ranked = RankedSearch(catalog)
+    catalog.load()
+    started, finish = threading.Event(), threading.Event()
+    build = ranked._build
+
+    def slow(books):
+        started.set()
+        finish.wait(5)
+        return build(books)
+
+    monkeypatch.setattr(ranked, "_build", slow)
+    reader = threading.Thread(target=ranked.load, daemon=True)
+    reader.start()
+    assert started.wait(5)
+
+    source = _rewrite(path, BOOKS + [PERCY], 1)
+    writer = threading.Thread(target=catalog.apply, args=(CatalogChange(CREATED, PERCY[0], dict(zip(FIELDS, PERCY)), source),), daemon=True)
+    writer.start()
+    writer.join(5)
+    finished = not writer.is_alive()
+    finish.set()
+    reader.join(5)
+
+    assert finished
+    assert ranked.search("percy jackson")["total"] == 1
+    assert [b["isbn"] for b in catalog.search("percy")] == [PERCY[0]]
+
+
+def test_a_rebuild_drops_the_changes_it_reads(path):
+    catalog = CatalogIndex(path)
+    catalog.load()
+    source = _rewrite(path, BOOKS + [PERCY], 1)
+    catalog.lock.acquire_read()
+    try:
+        catalog.apply(CatalogChange(CREATED, PERCY[0], dict(zip(FIELDS, PERCY)), source))
+        catalog._drop()
+        books = catalog._load()[1]
+    finally:
+        catalog.lock.release_read()
+
+    assert catalog._pending == []
+    assert catalog.load()[1] is books
+    assert [b[0] for b in books if b is not None].count(PERCY[0]) == 1
+
+
+def test_writers_of_different_catalogs_do_not_wait_for_each_other(path, tmp_path):
+    other = str(tmp_path / "Other.csv")
+    entered, leave = threading.Event(), threading.Event()
+
+    def write():
+        with writing(other):
+            entered.set()
+            leave.wait(5)
+
+    with writing(path):
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        assert entered.wait(5)
+        assert write_in_progress(path) and write_in_progress(other)
+        leave.set()
+    writer.join(5)
+    assert not write_in_progress(path) and not write_in_progress(other)
+
+
+def test_a_failed_change_falls_back_to_a_rebuild(path, monkeypatch):
+    catalog = CatalogIndex(path)
+    ranked = RankedSearch(catalog)
+    ranked.load()
+
+    def fail(*args):
+        raise RuntimeError("broken index")
+
+    monkeypatch.setattr(ranked, "_update", fail)
+    source = _rewrite(path, BOOKS + [PERCY], 1)
+    catalog.apply(CatalogChange(CREATED, PERCY[0], dict(zip(FIELDS, PERCY)), source))
+    assert ranked._state is None
+    assert ranked.search("percy jackson")["total"] == 1
@@ -0,0 +1,79 @@
+import pytest
+from app.repositories.csv_repository import CSVRepository
+from app.repositories.journal_repository import JournaledRepository
+from app.repositories.secondary_index import IndexSet
+from app.repositories.sqlite_repository import SQLiteRepository
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+ROWS = [
+    {"UserID": "1", "ISBN": "111", "Book-Rating": "5"},
+    {"UserID": "2", "ISBN": "111", "Book-Rating": "3"},
+    {"UserID": "1", "ISBN": "222", "Book-Rating": "8"},
+]
+
+
+def test_index_set_positions_and_extend():
+    rows = list(ROWS)
+    indexes = IndexSet()
+    declared = {("ISBN",), ("UserID", "ISBN")}
+
+    assert indexes.positions(declared, rows, {"ISBN": "111"}) == [0, 1]
+    assert indexes.positions(declared, rows, {"UserID": "1", "ISBN": "222"}) == [2]
+    assert indexes.positions(declared, rows, {"UserID": "1"}) is None
+
+    rows.append({"UserID": "3", "ISBN": "111", "Book-Rating": "1"})
+    indexes.extend(rows, 3)
+    assert indexes.positions(declared, rows, {"ISBN": "111"}) == [0, 1, 3]
+
+
+@pytest.fixture(params=["csv", "journal", "sqlite"])
+def repo(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteRepository(str(tmp_path / "app.db"))
+    if request.param == "journal":
+        return JournaledRepository()
+    return CSVRepository()
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "Indexed.csv")
+
+
+def test_lookups_stay_correct_through_writes(repo, path):
+    repo.write_all(path, FIELDS, ROWS)
+    repo.declare_indexes(path, ["ISBN", ("UserID", "ISBN")])
+
+    assert [r["UserID"] for r in repo.lookup(path, {"ISBN": "111"})] == ["1", "2"]
+
+    repo.append_row(path, FIELDS, {"UserID": "3", "ISBN": "111", "Book-Rating": "1"})
+    assert [r["UserID"] for r in repo.lookup(path, {"ISBN": "111"})] == ["1", "2", "3"]
+    assert repo.lookup(path, {"UserID": "3", "ISBN": "111"}, columns=["Book-Rating"]) == [{"Book-Rating": "1"}]
+
+    repo.write_all(path, FIELDS, ROWS[1:])
+    assert [r["UserID"] for r in repo.lookup(path, {"ISBN": "111"})] == ["2"]
+    assert repo.lookup(path, {"UserID": "9", "ISBN": "111"}) == []
+
+
+def test_csv_lookup_uses_the_declared_index(path, monkeypatch):
+    repo = CSVRepository()
+    repo.write_all(path, FIELDS, ROWS)
+    repo.declare_indexes(path, ["ISBN"])
+    repo.lookup(path, {"ISBN": "111"})
+
+    def scan(*args):
+        raise AssertionError("table was scanned")
+
+    # The index exists now; later lookups and appends must not scan the table again.
+    monkeypatch.setattr(IndexSet, "_build", staticmethod(scan))
+    repo.append_row(path, FIELDS, {"UserID": "3", "ISBN": "111", "Book-Rating": "1"})
+    assert len(repo.lookup(path, {"ISBN": "111"})) == 3
+
+
+def test_sqlite_declared_index_is_created(tmp_path):
+    repo = SQLiteRepository(str(tmp_path / "app.db"))
+    repo.write_all("Lists.csv", ["ListID", "Name"], [])
+    repo.declare_indexes("Lists.csv", [("ListID", "Name")])
+
+    indexes = {r[1] for r in repo._connect().execute("PRAGMA index_list(Lists)")}
+    assert "ix_Lists_ListID_Name" in indexes
@@ -0,0 +1,95 @@
+import csv
+import pytest
+from app.deps import get_user_service
+from app.repositories.factory import get_repository
+from app.repositories.sqlite_repository import SQLiteRepository, import_csv_directory
+
+FIELDS = ["UserID", "ISBN", "Book-Rating"]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return SQLiteRepository(str(tmp_path / "app.db"))
+
+
+def test_read_all_missing_table_returns_empty(repo):
+    assert repo.read_all("app/data/Ratings.csv") == []
+
+
+def test_write_all_and_append_row_round_trip(repo):
+    repo.write_all("app/data/Ratings.csv", FIELDS, [
+        {"UserID": 1, "ISBN": "111", "Book-Rating": 5},
+        {"UserID": 2, "ISBN": "222", "Book-Rating": None},
+    ])
+    repo.append_row("app/data/Ratings.csv", FIELDS, {"UserID": 3, "ISBN": "333", "Book-Rating": 7})
+
+    assert repo.read_all("/elsewhere/Ratings.csv") == [
+        {"UserID": "1", "ISBN": "111", "Book-Rating": "5"},
+        {"UserID": "2", "ISBN": "222", "Book-Rating": ""},
+        {"UserID": "3", "ISBN": "333", "Book-Rating": "7"},
+    ]
+
+
+def test_write_all_replaces_rows(repo):
+    repo.write_all("Ratings.csv", FIELDS, [{"UserID": 1, "ISBN": "111", "Book-Rating": 5}])
+    repo.write_all("Ratings.csv", FIELDS, [])
+    assert repo.read_all("Ratings.csv") == []
+
+
+def test_iter_rows_pushes_down_filters_and_columns(repo):
+    repo.write_all("Ratings.csv", FIELDS, [
+        {"UserID": 1, "ISBN": "111", "Book-Rating": 5},
+        {"UserID": 2, "ISBN": "222", "Book-Rating": 3},
+        {"UserID": 1, "ISBN": "333", "Book-Rating": 8},
+    ])
+
+    assert list(repo.iter_rows("Ratings.csv", where={"UserID": "1"}, columns=["ISBN"])) == [
+        {"ISBN": "111"}, {"ISBN": "333"},
+    ]
+    assert [r["ISBN"] for r in repo.iter_rows("Ratings.csv", where=lambda r: r["Book-Rating"] == "3")] == ["222"]
+    assert list(repo.iter_rows("Ratings.csv", where={"Missing": "x"})) == []
+    assert repo.read_one("Ratings.csv", "ISBN", "333")["UserID"] == "1"
+    assert list(repo.iter_rows("Other.csv")) == []
+
+
+def test_tables_are_indexed_and_use_wal(repo):
+    repo.write_all("Ratings.csv", FIELDS, [])
+    conn = repo._connect()
+
+    indexes = {r[1] for r in conn.execute("PRAGMA index_list(Ratings)")}
+    assert {"ix_Ratings_ISBN", "ix_Ratings_UserID", "ix_Ratings_UserID_ISBN"} <= indexes
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_import_csv_directory(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    with open(data_dir / "Ratings.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        writer.writerow(["1", "111", "5"])
+    with open(data_dir / "BX_Books.csv", "w", newline="", encoding="latin-1") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["ISBN", "Book-Title"])
+        writer.writerow(["0195153448", "Caf\xe9 Stories"])
+
+    db = str(tmp_path / "app.db")
+    assert import_csv_directory(str(data_dir), db) == {"BX_Books": 1, "Ratings": 1}
+
+    repo = SQLiteRepository(db)
+    assert repo.read_all("BX_Books.csv") == [{"ISBN": "0195153448", "Book-Title": "Caf\xe9 Stories"}]
+
+
+def test_factory_selects_sqlite_from_environment(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND_RATINGS", "sqlite")
+    assert isinstance(get_repository("ratings"), SQLiteRepository)
+    assert not isinstance(get_repository("reviews"), SQLiteRepository)
+
+
+def test_factory_shares_one_repository_per_backend(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND_USERS", "sqlite")
+    monkeypatch.setenv("STORAGE_BACKEND_RATINGS", "sqlite")
+    repo = get_repository("users")
+    assert get_repository("users") is repo
+    assert get_repository("ratings") is repo
+    assert get_user_service().repo is repo